@@ -1,4 +1,5 @@
 import io
+import multiprocessing
 import numpy as np
 import tensorflow as tf
 from jarbas_models.tf_tacotron.hparams import hparams
@@ -6,11 +7,28 @@ from jarbas_models.tf_tacotron.models import create_model
 from jarbas_models.tf_tacotron.util import audio, textinput
 
 
+def spectrogram_to_wav(spec):
+    '''Runs Griffin-Lim on a [T_out, F] linear spectrogram, returns wav bytes.
+
+    Module level so it can run on the process pool.
+    '''
+    wav = audio.inv_spectrogram(spec.T)
+    # batched outputs are decoded for as long as the longest item,
+    # drop the trailing silence
+    wav = wav[:audio.find_endpoint(wav)]
+    out = io.BytesIO()
+    audio.save_wav(wav, out)
+    return out.getvalue()
+
+
 class Synthesizer:
-    def load(self, checkpoint_path, model_name='tacotron'):
+    def load(self, checkpoint_path, model_name='tacotron', workers=None):
+        # fork the Griffin-Lim workers before tensorflow starts its threads
+        self.pool = multiprocessing.Pool(workers)
+
         print('Constructing model: %s' % model_name)
-        inputs = tf.placeholder(tf.int32, [1, None], 'inputs')
-        input_lengths = tf.placeholder(tf.int32, [1], 'input_lengths')
+        inputs = tf.placeholder(tf.int32, [None, None], 'inputs')
+        input_lengths = tf.placeholder(tf.int32, [None], 'input_lengths')
         with tf.variable_scope('model') as scope:
             self.model = create_model(model_name, hparams)
             self.model.initialize(inputs, input_lengths)
@@ -21,23 +39,43 @@ class Synthesizer:
         saver = tf.train.Saver()
         saver.restore(self.session, checkpoint_path)
 
-    def synthesize(self, text, save_path=None):
-        seq = textinput.to_sequence(text,
-                                    force_lowercase=hparams.force_lowercase,
-                                    expand_abbreviations=hparams.expand_abbreviations)
+    def warm_up(self):
+        '''Runs the graph once, the first session.run is much slower.'''
+        self.spectrograms(['hello'])
+
+    def spectrograms(self, texts):
+        '''Runs the model on a padded batch, returns [T_out, F] spectrograms'''
+        seqs = [textinput.to_sequence(
+            text, force_lowercase=hparams.force_lowercase,
+            expand_abbreviations=hparams.expand_abbreviations)
+            for text in texts]
+        lengths = [len(seq) for seq in seqs]
+        # 0 is the padding symbol
+        batch = np.zeros((len(seqs), max(lengths)), dtype=np.int32)
+        for i, seq in enumerate(seqs):
+            batch[i, :len(seq)] = seq
         feed_dict = {
-            self.model.inputs: [np.asarray(seq, dtype=np.int32)],
-            self.model.input_lengths: np.asarray([len(seq)], dtype=np.int32)
+            self.model.inputs: batch,
+            self.model.input_lengths: np.asarray(lengths, dtype=np.int32)
         }
+        return list(self.session.run(self.model.linear_outputs,
+                                     feed_dict=feed_dict))
+
+    def synthesize_batch(self, texts):
+        '''Synthesizes texts in one session.run, returns wav bytes per text.
 
-        spec = self.session.run(self.model.linear_outputs[0],
-                                feed_dict=feed_dict)
+        The inverse spectrograms run in parallel on the process pool.
+        '''
+        return self.pool.map(spectrogram_to_wav, self.spectrograms(texts))
 
+    def synthesize(self, text, save_path=None):
+        wav = self.synthesize_batch([text])[0]
         if save_path is not None:
-            out = save_path
-            audio.save_wav(audio.inv_spectrogram(spec.T), out)
-            return out
-        else:
-            out = io.BytesIO()
-            audio.save_wav(audio.inv_spectrogram(spec.T), out)
-            return out.getvalue()
+            with open(save_path, 'wb') as f:
+                f.write(wav)
+            return save_path
+        return wav
+
+    def close(self):
+        self.pool.terminate()
+        self.session.close()
@@ -27,6 +27,16 @@ def inv_spectrogram(spectrogram):
     return _inv_preemphasis(_griffin_lim(S ** 1.5))  # Reconstruct phase
 
 
+def find_endpoint(wav, threshold_db=-40, min_silence_sec=0.8):
+    window_length = int(hparams.sample_rate * min_silence_sec)
+    hop_length = int(window_length / 4)
+    threshold = _db_to_amp(threshold_db)
+    for x in range(hop_length, len(wav) - window_length, hop_length):
+        if np.max(wav[x:x + window_length]) < threshold:
+            return x + hop_length
+    return len(wav)
+
+
 def melspectrogram(y):
     D = _stft(_preemphasis(y))
     S = _amp_to_db(_linear_to_mel(np.abs(D)))
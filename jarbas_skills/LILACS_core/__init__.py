@@ -448,6 +448,13 @@ class LilacsCoreSkill(FallbackSkill):
 
     # questions methods
 
+    def knows(self, node, source, answer):
+        """ True if a knowledge source answer has data about node """
+        data = answer.get(source)
+        if source == "dbpedia":
+            return isinstance(data, dict) and node in data
+        return bool(data)
+
     def get_wordnik(self, node):
 
         # check wordnik backend for more related nodes
@@ -779,42 +786,34 @@ class LilacsCoreSkill(FallbackSkill):
             self.log.info("no node data available")
             if self.debug:
                 self.speak("seaching dbpedia")
-            self.log.info("adquiring dbpedia")
-            try:
-                dbpedia = self.service.adquire(node, "dbpedia")["dbpedia"][node]
-            except:
+            # all sources are asked at once, the first in this order that
+            # knows about node is used
+            self.log.info("adquiring dbpedia, wikidata and wikipedia")
+            source, answer = self.service.adquire_first(
+                node, ["dbpedia", "wikidata", "wikipedia"],
+                accept=lambda source, answer: self.knows(node, source,
+                                                         answer))
+            if source == "dbpedia":
+                dbpedia = answer["dbpedia"][node]
+            elif source == "wikidata":
+                wikidata = answer["wikidata"]
+            elif source == "wikipedia":
+                wikipedia = answer["wikipedia"]
+            else:
                 if self.debug:
-                    self.speak("no results from dbpedia")
-                self.log.info("no results from dbpedia")
-
+                    self.speak("no results from dbpedia, wikidata or "
+                               "wikipedia")
+                self.log.info("no results from dbpedia, wikidata or "
+                              "wikipedia")
                 if self.debug:
-                    self.speak("seaching wikidata")
-                self.log.info("adquiring wikidata")
+                    self.speak("seaching wordnik")
+                self.log.info("adquiring wordnik")
                 try:
-                    wikidata = self.service.adquire(node, "wikidata")["wikidata"]
+                    wordnik = self.get_wordnik(node)
                 except:
                     if self.debug:
-                        self.speak("no results from wikidata")
-                    self.log.info("no results from wikidata")
-
-                    if self.debug:
-                        self.speak("seaching wikipedia")
-                    self.log.info("adquiring wikipedia")
-                    try:
-                        wikipedia = self.service.adquire(node, "wikipedia")["wikipedia"]
-                    except:
-                        if self.debug:
-                            self.speak("no results from wikipedia")
-                        self.log.info("no results from wikipedia")
-                        if self.debug:
-                            self.speak("seaching wordnik")
-                        self.log.info("adquiring wordnik")
-                        try:
-                            wordnik = self.get_wordnik(node)
-                        except:
-                            if self.debug:
-                                self.speak("no results from wordnik")
-                            self.log.info("no results from wordnik")
+                        self.speak("no results from wordnik")
+                    self.log.info("no results from wordnik")
 
            # debug available data
 
@@ -92,6 +92,11 @@ class ClientUser():
         self.photo = self.settings[self.client_id].get("photo")
         self.user_type = self.settings[self.client_id].get("user_type",
                                                            "client")
+        self.saved_permissions = self.get_permissions()
+
+    def get_permissions(self):
+        return (list(self.forbidden_skills), list(self.forbidden_messages),
+                list(self.forbidden_intents))
 
     def save_user(self):
         self.settings[self.client_id]["name"] = self.name
@@ -112,6 +117,13 @@ class ClientUser():
         self.settings[self.client_id][
             "forbidden_messages"] = self.forbidden_messages
         self.settings.store()
+        # let the server drop cached permissions of this user
+        if self.get_permissions() != self.saved_permissions:
+            self.saved_permissions = self.get_permissions()
+            self.emitter.emit(Message("user.permissions.updated",
+                                      {"id": self.client_id,
+                                       "sock": getattr(self, "current_sock",
+                                                       None)}))
 
     def add_new_ip(self, ip, emit=True):
         if ip not in self.known_ips:
@@ -74,6 +74,13 @@ import pyaudio
 import pyprel
 import shijian
 
+from mycroft.util.lru import LRUCache
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 name = "deep throat"
 version = "2017-02-05T0145Z"
 logo = None
@@ -4483,6 +4490,102 @@ rules_English_to_phonemes_regex = [
 ]
 
 
+def make_rule_matcher(
+        rule_text=None
+):
+    """
+    Compile a rule to a tuple of the character string, a regex matching the
+    character string and its right context at a position, a regex matching
+    the left context at the end of the text before a position, the phonemes
+    and the original rule.
+    """
+    character_string, left_context, right_context, phoneme = rule_text.split(
+        "/")
+    right = re.escape(character_string)
+    if right_context:
+        right += \
+            r"(?=" + \
+            make_regex_fragment_from_rules_English_to_phonemes_special_symbols(
+                rule_pattern=right_context
+            ) + \
+            ")"
+    left = None
+    if left_context:
+        left = re.compile(
+            r"(?:" +
+            make_regex_fragment_from_rules_English_to_phonemes_special_symbols(
+                rule_pattern=left_context
+            ) +
+            r")\Z"
+        )
+    return character_string, re.compile(right), left, phoneme, rule_text
+
+
+def make_rules_index(
+        rules=None
+):
+    """
+    Group compiled rules by the first character of their character string,
+    keeping the rules order within a group.
+    """
+    index = {}
+    for rule_text in rules:
+        matcher = make_rule_matcher(rule_text=rule_text)
+        index.setdefault(matcher[0][0], []).append(matcher)
+    return index
+
+
+rules_English_to_phonemes_index = make_rules_index(
+    rules=rules_English_to_phonemes
+)
+
+# phonemes of recently translated words
+words_phonemes_cache = LRUCache(max_size=4096)
+
+
+def word_to_phonemes(
+        word=None,
+        explain=False
+):
+    """
+    Translate an upper-case word to phonemes in a single pass. At each
+    position the first rule of the current character whose string and
+    contexts match is applied, then the position moves past the string.
+    """
+    phonemes = words_phonemes_cache.get(word)
+    if phonemes is not None and not explain:
+        return phonemes
+    # Add space around the word for compatibility with rules containing
+    # spaces.
+    text = " {word} ".format(word=word)
+    position = 1
+    end = len(text) - 1
+    result = []
+    while position < end:
+        for character_string, right, left, phoneme, rule_text in \
+                rules_English_to_phonemes_index.get(text[position], ()):
+            if right.match(text, position) is None:
+                continue
+            if left is not None and left.search(text, 0, position) is None:
+                continue
+            if explain:
+                print("{word}: {found} ---> {phoneme} [rule: {rule}]".format(
+                    word=word,
+                    found=character_string,
+                    phoneme=phoneme,
+                    rule=rule_text
+                ))
+            if phoneme:
+                result.append(phoneme)
+            position += len(character_string)
+            break
+        else:
+            position += 1
+    phonemes = "-".join(result)
+    words_phonemes_cache.put(word, phonemes)
+    return phonemes
+
+
 def text_to_phonemes(
         text=None,
         explain=False,
@@ -4497,6 +4600,45 @@ def text_to_phonemes(
 
     text = ensure_text_alphanumeric(text=text)
 
+    # remove junk
+    acceptable_phonemes = set(phonemes_dictionary)
+    result_cleaning = []
+    for word in text.upper().split(" "):
+        tmp_word = []
+        for word_phoneme in word_to_phonemes(
+                word=word,
+                explain=explain
+        ).split("-"):
+            if word_phoneme in acceptable_phonemes:
+                tmp_word.append(word_phoneme)
+            if word_phoneme == "I":
+                tmp_word.append("AH-EE")
+            if word_phoneme == "EEH":
+                tmp_word.append("EH")
+        result_cleaning.append("-".join(tmp_word))
+
+    result = " ".join(result_cleaning).strip()
+    if explain:
+        print("result: {result}\n".format(result=result))
+    return result
+
+
+def text_to_phonemes_sequential(
+        text=None,
+        explain=False,
+        phonemes_dictionary=phonemes_dictionary
+):
+    """
+    Extract phonemes from words by applying every rule to the whole text,
+    one rule after the other. This is slower than text_to_phonemes and is
+    kept for comparison.
+    """
+    if explain:
+        print("\ntranslation printout:")
+        print("text: {text}".format(text=text))
+
+    text = ensure_text_alphanumeric(text=text)
+
     # Add space around words for compatibility with rules containing spaces.
     result = " {text} ".format(text=text.upper())
     step = 0
@@ -4730,6 +4872,190 @@ def speak_phonemes_words(
         )
 
 
+###############################################################################
+#                                                                             #
+# NumPy synthesis                                                             #
+#                                                                             #
+###############################################################################
+
+# resampled phoneme waveforms, keyed by (phoneme, length)
+phonemes_arrays = {}
+
+
+def phoneme_array(
+        phoneme=None,
+        length=2000
+):
+    """
+    Return the waveform of a phoneme resampled to length samples.
+
+    Waveforms are computed once per length and cached, the returned arrays
+    are read-only.
+    """
+    key = (phoneme, length)
+    array = phonemes_arrays.get(key)
+    if array is None:
+        data = numpy.array(phonemes_dictionary[phoneme], dtype=numpy.float64)
+        if length != len(data):
+            data = numpy.interp(
+                numpy.linspace(0, len(data) - 1, length),
+                numpy.arange(len(data)),
+                data
+            )
+        data.flags.writeable = False
+        array = phonemes_arrays[key] = data
+    return array
+
+
+def precompute_phoneme_arrays(
+        length=2000
+):
+    """
+    Resample every phoneme waveform ahead of synthesis.
+    """
+    for phoneme in phonemes_dictionary:
+        phoneme_array(phoneme=phoneme, length=length)
+
+
+def phonemes_words_array(
+        phonemes_words=None,
+        change_waveform_to_rectangle_waveform=True,
+        length=2000
+):
+    """
+    This function converts sentences in phoneme form to an array of amplitude
+    values, the array is allocated once and filled with the cached phoneme
+    waveforms.
+    """
+    phonemes = []
+    for phonemes_string in phonemes_words.split(" "):
+        phonemes.extend(
+            phoneme for phoneme in phonemes_string.split("-")
+            if phoneme in phonemes_dictionary
+        )
+        phonemes.append("space")
+    phonemes.append("space")
+    values = numpy.empty(len(phonemes) * length, dtype=numpy.float64)
+    for index, phoneme in enumerate(phonemes):
+        values[index * length:(index + 1) * length] = phoneme_array(
+            phoneme=phoneme,
+            length=length
+        )
+    if change_waveform_to_rectangle_waveform is True:
+        # Same output as shijian.change_waveform_to_rectangle_waveform on the
+        # list of phonemes_words_values: a list indexed with the booleans
+        # "values >= 0" and "values < 0" only gets its second and first
+        # values replaced before all values are scaled.
+        fraction_amplitude = 0.01
+        values[1] = fraction_amplitude * values.max()
+        values[0] = fraction_amplitude * values.min()
+        values *= 1 / fraction_amplitude
+    return values
+
+
+def normalize_array(
+        values=None,
+        minimum=-1,
+        maximum=1
+):
+    """
+    Scale an array linearly to the range [minimum, maximum].
+    """
+    values_minimum = values.min()
+    values_range = values.max() - values_minimum
+    if values_range == 0:
+        return numpy.zeros(len(values), dtype=numpy.float64)
+    return (values - values_minimum) * ((maximum - minimum) / values_range) + \
+        minimum
+
+
+def array_to_binary_data(
+        values=None
+):
+    values = normalize_array(values, minimum=-1, maximum=1)
+    return (values * 127 + 128).astype(numpy.uint8).tobytes()
+
+
+def play_array(
+        values=None,
+        bitrate=15300
+):
+    binary_data = array_to_binary_data(values)
+    with propyte.silence():
+        stream = pyaudio.PyAudio().open(
+            format=pyaudio.PyAudio().get_format_from_width(1),
+            channels=1,
+            rate=bitrate,
+            output=True
+        )
+    stream.write(binary_data)
+    stream.stop_stream()
+    stream.close()
+    pyaudio.PyAudio().terminate()
+
+
+def save_array_to_wave_file(
+        values=None,
+        filename=None,
+        maximum_amplitude=65535,
+        # maximum value of unsigned short 16 bit number
+        sample_rate=44100,  # Hz
+        number_of_channels=1
+):
+    values = normalize_array(
+        values,
+        minimum=-(maximum_amplitude / 2),
+        maximum=maximum_amplitude / 2
+    )
+    file_output = wave.open(filename, "w")
+    file_output.setnchannels(number_of_channels)
+    file_output.setsampwidth(2)
+    file_output.setframerate(sample_rate)
+    file_output.writeframes(values.astype("<i2").tobytes())
+    file_output.close()
+
+
+def phonemes_words_data(
+        phonemes_words=None
+):
+    """
+    Amplitude values of sentences in phoneme form, a NumPy array when NumPy
+    is available.
+    """
+    if numpy is None:
+        return phonemes_words_values(phonemes_words=phonemes_words)
+    return phonemes_words_array(phonemes_words=phonemes_words)
+
+
+def play_data(
+        values=None,
+        bitrate=15300
+):
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        play_array(values=values, bitrate=bitrate)
+    else:
+        play_values(values=values, bitrate=bitrate)
+
+
+def save_data_to_wave_file(
+        values=None,
+        filename=None,
+        sample_rate=44100
+):
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        save_array_to_wave_file(
+            values=values,
+            filename=filename,
+            sample_rate=sample_rate
+        )
+    else:
+        save_values_to_wave_file(
+            values=values,
+            filename=filename,
+            sample_rate=sample_rate
+        )
+
+
 def say(
         text=None,
         phonemes=None,
@@ -4759,10 +5085,10 @@ def say(
                         text=sentence,
                         explain=explain
                     )
-                    _data = phonemes_words_values(
+                    _data = phonemes_words_data(
                         phonemes_words=_phonemes
                     )
-                    play_values(
+                    play_data(
                         values=_data
                     )
             else:
@@ -4770,10 +5096,10 @@ def say(
                     text=text,
                     explain=explain
                 )
-                _data = phonemes_words_values(
+                _data = phonemes_words_data(
                     phonemes_words=_phonemes
                 )
-                play_values(
+                play_data(
                     values=_data
                 )
         else:
@@ -4781,10 +5107,10 @@ def say(
                 text=text,
                 explain=explain
             )
-            _data = phonemes_words_values(
+            _data = phonemes_words_data(
                 phonemes_words=_phonemes
             )
-            save_values_to_wave_file(
+            save_data_to_wave_file(
                 values=_data,
                 filename=filename_output,
                 sample_rate=15300
@@ -4792,18 +5118,18 @@ def say(
     elif text is None and phonemes is not None:
         if save_to_file is not True:
             _phonemes = phonemes
-            _data = phonemes_words_values(
+            _data = phonemes_words_data(
                 phonemes_words=_phonemes
             )
-            play_values(
+            play_data(
                 values=_data
             )
         else:
             _phonemes = phonemes
-            _data = phonemes_words_values(
+            _data = phonemes_words_data(
                 phonemes_words=_phonemes
             )
-            save_values_to_wave_file(
+            save_data_to_wave_file(
                 values=_data,
                 filename=filename_output,
                 sample_rate=15300
@@ -1,6 +1,8 @@
 from mycroft.messagebus.api import BusQuery, BusResponder
+from mycroft.messagebus.message import Message
 from mycroft.util.log import getLogger
 import time
+from concurrent.futures import wait, FIRST_COMPLETED
 from mycroft.configuration import ConfigurationManager
 from mycroft.messagebus.client.ws import WebsocketClient
 from threading import Thread
@@ -256,77 +258,76 @@ class QueryBackend(object):
                 response_messages (list) : list of extra messages to end wait
                 cipher (str) : cipher to use in encryption for server/client
         """
-        if response_messages is None:
-            response_messages = []
-        # generate reply messages
-        self.waiting_messages = response_messages
-        if ".request" in message_type:
-            response = message_type.replace(".request", ".reply")
-            if response not in self.waiting_messages:
-                self.waiting_messages.append(response)
-            response = message_type.replace(".request", ".response")
-            if response not in self.waiting_messages:
-                self.waiting_messages.append(response)
-            response = message_type.replace(".request", ".result")
-            if response not in self.waiting_messages:
-                self.waiting_messages.append(response)
-        else:
-            response = message_type + ".reply"
-            if response not in self.waiting_messages:
-                self.waiting_messages.append(response)
-            response = message_type + ".response"
-            if response not in self.waiting_messages:
-                self.waiting_messages.append(response)
-            response = message_type + ".result"
-            if response not in self.waiting_messages:
-                self.waiting_messages.append(response)
-
-        # update message context
-        if message_context is None:
-            message_context = {}
-        message_context["source"] = self.name
-        message_context["waiting_for"] = self.waiting_messages
+        self.waiting_messages = self._get_response_types(message_type,
+                                                         response_messages)
+        request = self._get_request(message_type, message_data,
+                                    message_context, self.waiting_messages,
+                                    cipher)
         start = time.time()
         self.elapsed_time = 0
-        if not self.server:
-            if not self.client:
-                result = self._send_internal_request(message_type, message_data,
-                                                   message_context)
-            else:
-                result = self._send_client_request(message_type, message_data,
-                                                 message_context, cipher)
-        else:
-            result = self._send_server_request(message_type, message_data,
-                                             message_context, cipher)
+        self.query = BusQuery(self.emitter, request.type, request.data,
+                              request.context)
+        for message in self.waiting_messages[1:]:
+            self.query.add_response_type(message)
+        result = self.query.send(self.waiting_messages[0], self.timeout)
         self.elapsed_time = time.time() - start
         return result
 
-    def _send_server_request(self, message_type, message_data,
-                             message_context, cipher="aes"):
-        if message_data is None:
-            message_data = {}
-        file_fields = ["file", "path", "dream_source", "file_path",
-                       "pic_path", "picture_path", "PicturePath"]
-        type = "bus"
-        for field in file_fields:
-            if field in message_data.keys():
-                type = "file"
-                message_data["file"] = message_data[field]
-                break
+    def send_request_async(self, message_type, message_data=None,
+                           message_context=None, response_messages=None,
+                           cipher="aes"):
+        """
+          send query without waiting for the answer, same args as
+          send_request
 
-        data = {"requester": self.name,
-                "message_type": message_type,
-                "message_data": message_data, "cipher": cipher,
-                "request_type": type}
+          use gather / first_completed to wait for the returned futures
 
-        self.query = BusQuery(self.emitter, self.server_request_message, data,
-                              message_context)
-        for message in self.waiting_messages[1:]:
-            self.query.add_response_type(message)
-        return self.query.send(self.waiting_messages[0], self.timeout)
+          returns: Future, result() is the response Message
+        """
+        response_types = self._get_response_types(message_type,
+                                                  response_messages)
+        request = self._get_request(message_type, message_data,
+                                    message_context, response_types, cipher)
+        return self.emitter.send_request(request, response_types)
+
+    def _get_response_types(self, message_type, response_messages=None):
+        """
+            generate the list of messages that answer message_type
+        """
+        if response_messages is None:
+            response_messages = []
+        response_types = list(response_messages)
+        for ending in [".reply", ".response", ".result"]:
+            if ".request" in message_type:
+                response = message_type.replace(".request", ending)
+            else:
+                response = message_type + ending
+            if response not in response_types:
+                response_types.append(response)
+        return response_types
 
-    def _send_client_request(self, message_type, message_data,
-                             message_context, cipher="aes"):
+    def _get_request(self, message_type, message_data, message_context,
+                     response_types, cipher="aes"):
+        """
+            build the Message to send internally, to server or to client
+        """
+        # update message context
+        if message_context is None:
+            message_context = {}
+        message_context["source"] = self.name
+        message_context["waiting_for"] = response_types
+        if self.server:
+            return self._get_remote_request(self.server_request_message,
+                                            message_type, message_data,
+                                            message_context, cipher)
+        if self.client:
+            return self._get_remote_request(self.client_request_message,
+                                            message_type, message_data,
+                                            message_context, cipher)
+        return Message(message_type, message_data, message_context)
+
+    def _get_remote_request(self, request_message, message_type,
+                            message_data, message_context, cipher="aes"):
         if message_data is None:
             message_data = {}
         file_fields = ["file", "path", "dream_source", "file_path",
@@ -342,21 +343,7 @@ class QueryBackend(object):
                 "message_type": message_type,
                 "message_data": message_data, "cipher": cipher,
                 "request_type": type}
-
-        self.query = BusQuery(self.emitter, self.client_request_message,
-                              data,
-                              message_context)
-        for message in self.waiting_messages[1:]:
-            self.query.add_response_type(message)
-        return self.query.send(self.waiting_messages[0], self.timeout)
-
-    def _send_internal_request(self, message_type, message_data,
-                               message_context):
-        self.query = BusQuery(self.emitter, message_type, message_data,
-                              message_context)
-        for message in self.waiting_messages[1:]:
-            self.query.add_response_type(message)
-        return self.query.send(self.waiting_messages[0], self.timeout)
+        return Message(request_message, data, message_context)
 
     def get_result(self, context=False, type=False):
         """
@@ -369,3 +356,49 @@ class QueryBackend(object):
         if context:
             return self.query.get_response_context()
         return self.query.get_response_data()
+
+
+def _response_data(future):
+    if future.done() and not future.cancelled():
+        return future.result().data
+    return None
+
+
+def gather(futures, timeout=None):
+    """
+        wait for all futures returned by QueryBackend.send_request_async
+
+        Args:
+            futures (list): futures to wait for
+            timeout (float): max seconds to wait, None waits forever
+
+        Returns:
+            list: response data of each future, None for unanswered ones
+    """
+    wait(futures, timeout)
+    results = [_response_data(future) for future in futures]
+    for future in futures:
+        future.cancel()
+    return results
+
+
+def first_completed(futures, timeout=None):
+    """
+        wait for the first answer to futures returned by
+        QueryBackend.send_request_async, remaining queries are cancelled
+
+        Args:
+            futures (list): futures to wait for
+            timeout (float): max seconds to wait, None waits forever
+
+        Returns:
+            tuple: (index of the answered future, response data), or
+                   (None, None) on timeout
+    """
+    done, not_done = wait(futures, timeout, return_when=FIRST_COMPLETED)
+    for future in not_done:
+        future.cancel()
+    for index, future in enumerate(futures):
+        if future in done:
+            return index, _response_data(future)
+    return None, None
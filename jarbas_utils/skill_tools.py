@@ -1,7 +1,9 @@
+import time
 from time import asctime
 import urllib
 from os.path import dirname
-from jarbas_utils.skill_dev_tools import QueryBackend
+from concurrent.futures import wait
+from jarbas_utils.skill_dev_tools import QueryBackend, gather
 
 __author__ = 'jarbas'
 
@@ -155,6 +157,15 @@ class LILACSstorageQuery(QueryBackend):
 
 
 class KnowledgeQuery(QueryBackend):
+    # knowledge source -> request message
+    SOURCES = {"wikipedia": "wikipedia.request",
+               "wikidata": "wikidata.request",
+               "dbpedia": "dbpedia.request",
+               "wordnik": "wordnik.request",
+               "wikihow": "wikihow.request",
+               "wolfram alpha": "wolframalpha.request",
+               "conceptnet": "conceptnet.request"}
+
     def __init__(self, name=None, emitter=None, timeout=120, logger=None,
                  server=False, client=False, override=True):
         super(KnowledgeQuery, self).__init__(name=name, emitter=emitter,
@@ -179,6 +190,79 @@ class KnowledgeQuery(QueryBackend):
         if "concept" in where:
             return self.ask_conceptnet(subject)
 
+    def adquire_all(self, subject, sources=None, needed=None, timeout=None):
+        """
+            query several knowledge sources in parallel
+
+            Args:
+                subject (str): what to ask about
+                sources (list): source names from SOURCES, default all
+                needed (list): return as soon as these sources answered,
+                               default all sources, they are queried even
+                               if missing from sources
+                timeout (float): max seconds to wait, default self.timeout
+
+            Returns:
+                dict: source -> answer data, None if it did not answer
+        """
+        if sources is None:
+            sources = self.SOURCES.keys()
+        if needed is None:
+            needed = sources
+        if timeout is None:
+            timeout = self.timeout
+        sources = list(sources) + [source for source in needed
+                                   if source not in sources]
+        futures = self._ask_all(subject, sources)
+        wait([futures[source] for source in needed], timeout)
+        results = gather([futures[source] for source in sources], 0)
+        return dict(zip(sources, results))
+
+    def adquire_first(self, subject, sources, accept=None, timeout=None):
+        """
+            query several knowledge sources in parallel, the answer of the
+            first source in sources that knows about subject is used, later
+            sources only matter if the previous ones had nothing
+
+            Args:
+                subject (str): what to ask about
+                sources (list): source names from SOURCES, by preference
+                accept (callable): accept(source, data) is True if data is
+                                   a useful answer, default data has an
+                                   entry for source
+                timeout (float): max seconds to wait, default self.timeout
+
+            Returns:
+                tuple: (source, answer data), (None, None) if no source knew
+        """
+        if accept is None:
+            def accept(source, data):
+                return bool(data.get(source))
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.time() + timeout
+        futures = self._ask_all(subject, sources)
+        try:
+            for source in sources:
+                remaining = max(0, deadline - time.time())
+                data = gather([futures[source]], remaining)[0]
+                if data is not None and accept(source, data):
+                    return source, data
+        finally:
+            for future in futures.values():
+                future.cancel()
+        return None, None
+
+    def _ask_all(self, subject, sources):
+        unknown = [source for source in sources if source not in self.SOURCES]
+        if unknown:
+            raise ValueError("Unknown knowledge sources: " + str(unknown))
+        futures = {}
+        for source in sources:
+            futures[source] = self.send_request_async(
+                self.SOURCES[source], {"TargetKeyword": subject})
+        return futures
+
     def ask_wikipedia(self, subject):
         return self.send_request("wikipedia.request", {"TargetKeyword":
                                                            subject})
@@ -189,7 +273,7 @@ class KnowledgeQuery(QueryBackend):
 
     def ask_dbpedia(self, subject):
         return self.send_request("dbpedia.request",
-                                 {"TargetKeywordt": subject})
+                                 {"TargetKeyword": subject})
 
     def ask_wolfram(self, subject):
         return self.send_request("wolframalpha.request", {"TargetKeyword":
@@ -221,6 +305,11 @@ class UserManagerQuery(QueryBackend):
         return self.send_request(message_type="user.from_sock.request",
                                  message_data={"sock": sock_num})
 
+    def user_from_sock_async(self, sock_num):
+        """ user_from_sock without waiting, returns a Future """
+        return self.send_request_async(message_type="user.from_sock.request",
+                                       message_data={"sock": sock_num})
+
     def user_from_facebook_id(self, fb_id):
         return self.send_request(message_type="user.from_facebook.request",
                                  message_data={"id": fb_id})
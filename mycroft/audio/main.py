@@ -452,7 +452,7 @@ def connect():
 def main():
     global ws
     global config
-    ws = WebsocketClient()
+    ws = WebsocketClient(filtered=True)
     ConfigurationManager.init(ws)
     config = ConfigurationManager.get()
     speech.init(ws)
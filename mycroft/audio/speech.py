@@ -5,7 +5,8 @@ from mycroft.configuration import ConfigurationManager
 from mycroft.messagebus.message import Message
 from mycroft.util.log import getLogger
 
-from threading import Lock
+from Queue import Queue, Empty
+from threading import Lock, Thread
 import time
 import re
 
@@ -14,11 +15,12 @@ logger = getLogger("Audio speech")
 ws = None
 config = None
 tts = None
-tts_hash = None
+tts_version = None
 lock = Lock()
 
 _last_stop_signal = 0
 speak_flag = True
+synthesis = None
 
 
 def set_speak_flag(event):
@@ -31,6 +33,60 @@ def unset_speak_flag(event):
     speak_flag = False
 
 
+class SynthesisThread(Thread):
+    """
+        Synthesizes queued sentence chunks in order. The tts blocks while
+        its playback queue is full, so synthesis runs ahead of playback by
+        the configured tts lookahead. Engines with batched synthesis get up
+        to tts.batch_size chunks at once.
+    """
+
+    def __init__(self):
+        super(SynthesisThread, self).__init__()
+        self.daemon = True
+        self.queue = Queue()
+        self._terminated = False
+
+    def speak(self, chunks):
+        """
+            Queue the chunks of an utterance for synthesis
+
+            Args:
+                chunks: list of sentences
+        """
+        self.queue.put((chunks, time.time()))
+
+    def clear_queue(self):
+        """
+            Remove all pending utterances
+        """
+        while not self.queue.empty():
+            try:
+                self.queue.get_nowait()
+            except Empty:
+                break
+
+    def run(self):
+        while not self._terminated:
+            try:
+                chunks, start = self.queue.get(timeout=2)
+            except Empty:
+                continue
+            while chunks and _last_stop_signal < start:
+                batch_size = max(1, tts.batch_size)
+                try:
+                    mute_and_speak(chunks[:batch_size])
+                except Exception:
+                    logger.error('Error in mute_and_speak', exc_info=True)
+                chunks = chunks[batch_size:]
+                if check_for_signal('buttonPress'):
+                    break
+
+    def stop(self):
+        self._terminated = True
+        self.clear_queue()
+
+
 def _trigger_expect_response(message):
     """
         Makes mycroft start listening on 'recognizer_loop:audio_output_end'
@@ -43,7 +99,6 @@ def handle_speak(event):
         Handle "speak" message
     """
     config = ConfigurationManager.get()
-    ConfigurationManager.init(ws)
     global _last_stop_signal
 
     utterance = event.data['utterance']
@@ -68,20 +123,11 @@ def handle_speak(event):
         # when TTS is happening.  See mycroft.util.is_speaking()
         create_signal("isSpeaking")
         if not config.get('enclosure', {}).get('platform') == "picroft":
-            start = time.time()
             chunks = re.split(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?)\s',
                               utterance)
-            for chunk in chunks:
-                try:
-                    mute_and_speak(chunk)
-                except KeyboardInterrupt:
-                    raise
-                except:
-                    logger.error('Error in mute_and_speak', exc_info=True)
-                if _last_stop_signal > start or check_for_signal('buttonPress'):
-                    break
+            synthesis.speak(chunks)
         else:
-            mute_and_speak(utterance)
+            synthesis.speak([utterance])
 
 
 def mute_and_speak(utterance):
@@ -89,14 +135,14 @@ def mute_and_speak(utterance):
         Mute mic and start speaking the utterance using selected tts backend.
 
         Args:
-            utterance: The sentence to be spoken
+            utterance: The sentence to be spoken, or a list of sentences
     """
-    global tts_hash
+    global tts_version
     global speak_flag
 
     lock.acquire()
-    # update TTS object if configuration has changed
-    if tts_hash != hash(str(config.get('tts', ''))):
+    # update TTS object if the tts configuration section has changed
+    if tts_version != ConfigurationManager.version('tts'):
         global tts
         # Stop tts playback thread
         tts.playback.stop()
@@ -104,12 +150,14 @@ def mute_and_speak(utterance):
         # Create new tts instance
         tts = TTSFactory.create()
         tts.init(ws)
-        tts_hash = hash(str(config.get('tts', '')))
+        tts_version = ConfigurationManager.version('tts')
 
-    logger.info("Speak: " + utterance)
+    if not isinstance(utterance, list):
+        utterance = [utterance]
+    logger.info("Speak: " + " ".join(utterance))
     try:
         if speak_flag:
-            tts.validate_and_execute(utterance)
+            tts.validate_and_execute_batch(utterance)
     finally:
         lock.release()
 
@@ -120,6 +168,7 @@ def handle_stop(event):
     """
     global _last_stop_signal
     _last_stop_signal = time.time()
+    synthesis.clear_queue()
     tts.playback.clear_queue()
     tts.playback.clear_visimes()
     stop_speaking()
@@ -132,8 +181,9 @@ def init(websocket):
 
     global ws
     global tts
-    global tts_hash
+    global tts_version
     global config
+    global synthesis
 
     ws = websocket
     ConfigurationManager.init(ws)
@@ -145,11 +195,16 @@ def init(websocket):
 
     tts = TTSFactory.create()
     tts.init(ws)
-    tts_hash = config.get('tts')
+    tts_version = ConfigurationManager.version('tts')
+
+    synthesis = SynthesisThread()
+    synthesis.start()
 
 
 def shutdown():
     global tts
+    if synthesis:
+        synthesis.stop()
     if tts:
         tts.playback.stop()
         tts.playback.join()
@@ -1,15 +1,18 @@
 from twisted.python import log
+from twisted.python.failure import Failure
 from twisted.internet import reactor, ssl
 
 from autobahn.twisted.websocket import WebSocketClientFactory, \
     WebSocketClientProtocol, \
     connectWS
 from twisted.internet.protocol import ReconnectingClientFactory
+from twisted.protocols.basic import FileSender
 
 # sys and crypto
 import sys, json, time
+import hashlib
 from threading import Thread
-from os.path import dirname
+from os.path import dirname, splitext
 from Crypto.Cipher import AES
 from Crypto import Random
 import logging
@@ -21,6 +24,7 @@ from mycroft.messagebus.message import Message
 from mycroft.util.log import getLogger
 from mycroft.client.client.pgp import get_own_keys, encrypt_string, decrypt_string, generate_client_key, export_key, import_key_from_ascii
 from mycroft.configuration import ConfigurationManager
+from mycroft.client.server.upload import pack_chunk
 
 config = ConfigurationManager.get()
 config = config.get("jarbas_client", {})
@@ -36,6 +40,43 @@ gpglog = logging.getLogger("gnupg")
 gpglog.setLevel("WARNING")
 
 
+def file_digest(path):
+    """ size and sha256 hex digest of a file, read in chunks """
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), ""):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+class ChunkConsumer(object):
+    """
+    Consumer of a FileSender, every chunk is sent AES encrypted with its
+    sequence number. The websocket transport pulls the next chunk once the
+    previous ones were flushed, so the file is never buffered whole.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.seq = 0
+
+    def registerProducer(self, producer, streaming):
+        self.factory.client.transport.registerProducer(producer, streaming)
+
+    def unregisterProducer(self):
+        self.factory.client.transport.unregisterProducer()
+
+    def write(self, data):
+        self.factory.sendRaw(pack_chunk(self.seq, data))
+        self.seq += 1
+
+    def end(self):
+        """ an empty chunk ends the file """
+        self.write("")
+
+
 class MyClientProtocol(WebSocketClientProtocol):
 
     def onConnect(self, response):
@@ -237,23 +278,42 @@ class MyClientFactory(WebSocketClientFactory, ReconnectingClientFactory):
         logger.info("Received request to message server from " + requester + " with type: " + str(
             message_type) + " with data: " + str(message_data))
         # TODO more types, type handling
+        message_data["source"] = requester
         if stype == "file":
             logger.info("File requested, sending first")
-            bin_file = open(message_data["file"], "rb")
-            # message_data["file"] = bin_file.read()
-            self.sendMessage("incoming_file", {"target": "server"})
-            i = 0
-            while True:
-                i += 1
-                chunk = bin_file.read(4096)
-                logger.info("sending chunk " + str(i))
-                if not chunk:
-                    logger.info("Sending end_of_file")
-                    self.sendRaw("end_of_file")
-                    bin_file.close()
-                    break  # EOF
-                self.sendRaw(chunk)
-        message_data["source"] = requester
+            path = message_data["file"]
+            size, sha256 = file_digest(path)
+            # the request is sent once the file was uploaded
+            reactor.callFromThread(self.send_file, path, size, sha256,
+                                   message_type, message_data,
+                                   message_context)
+            return
+        logger.info("sending message with type: " + message_type)
+        self.sendMessage(message_type, message_data, message_context)
+
+    def send_file(self, path, size, sha256, message_type, message_data,
+                  message_context):
+        if self.client is None or self.status != "connected":
+            logger.error("Key exchange was not completed")
+            return
+        self.sendMessage("incoming_file",
+                         {"target": "server",
+                          "extension": splitext(path)[1] or ".jpg",
+                          "size": size, "sha256": sha256})
+        consumer = ChunkConsumer(self)
+        bin_file = open(path, "rb")
+        d = FileSender().beginFileTransfer(bin_file, consumer)
+        d.addBoth(self._file_sent, bin_file, consumer, message_type,
+                  message_data, message_context)
+
+    def _file_sent(self, result, bin_file, consumer, message_type,
+                   message_data, message_context):
+        bin_file.close()
+        if isinstance(result, Failure):
+            logger.error("Could not send file: " + result.getErrorMessage())
+            return
+        logger.info("Sending end of file")
+        consumer.end()
         logger.info("sending message with type: " + message_type)
         self.sendMessage(message_type, message_data, message_context)
 
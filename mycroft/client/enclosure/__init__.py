@@ -238,7 +238,7 @@ class Enclosure(object):
     _last_internet_notification = 0
 
     def __init__(self):
-        self.ws = WebsocketClient()
+        self.ws = WebsocketClient(filtered=True)
         ConfigurationManager.init(self.ws)
         self.config = ConfigurationManager.instance().get("enclosure")
         self.__init_serial()
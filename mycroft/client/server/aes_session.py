@@ -0,0 +1,60 @@
+import base64
+
+from Crypto import Random
+from Crypto.Cipher import AES
+
+__author__ = 'jarbas'
+
+
+class AESSession(object):
+    """
+    AES-CFB session of a connected client
+
+    The raw key and IV are kept for the lifetime of the connection, so
+    they are not base64 decoded for every message. Every encrypted
+    message is prefixed with the IV it was encrypted with, messages sent
+    by the server also carry the IV of the next one in their context.
+
+    Args:
+        key (str): raw 32 byte key, random if None
+        iv (str): raw IV, random if None
+    """
+    KEY_SIZE = 32
+
+    def __init__(self, key=None, iv=None):
+        self.key = key or Random.get_random_bytes(self.KEY_SIZE)
+        self.iv = iv or self.generate_iv()
+
+    @staticmethod
+    def generate_iv():
+        return Random.get_random_bytes(AES.block_size)
+
+    @property
+    def b64_key(self):
+        return base64.b64encode(self.key)
+
+    @property
+    def b64_iv(self):
+        return base64.b64encode(self.iv)
+
+    def cipher(self, iv=None):
+        # CFB ciphers are streams, a new one is needed for every IV
+        return AES.new(self.key, AES.MODE_CFB, iv or self.iv)
+
+    def decrypt(self, payload):
+        """ Decrypt an IV prefixed payload received from the client """
+        return self.cipher().decrypt(payload)[AES.block_size:]
+
+    def encrypt(self, data, next_iv):
+        """
+        Encrypt data with the current IV and switch to next_iv
+
+        Args:
+            data (str): plaintext, must announce next_iv to the client
+            next_iv (str): raw IV of the next message
+        Returns:
+            str: IV prefixed ciphertext
+        """
+        iv = self.iv
+        self.iv = next_iv
+        return iv + self.cipher(iv).encrypt(data)
@@ -0,0 +1,56 @@
+from threading import Lock
+
+__author__ = 'jarbas'
+
+
+class UserCache(object):
+    """
+    Permission records of connected users, by socket number.
+
+    A lookup takes a token before asking the user manager, the answer is
+    only cached if the socket was not invalidated in the meantime, so a
+    late reply can not bring back permissions that already changed.
+    """
+
+    def __init__(self):
+        self.users = {}
+        self.generations = {}
+        self.epoch = 0
+        self.lock = Lock()
+
+    def get(self, sock):
+        """ Cached user data of sock, None if not cached """
+        with self.lock:
+            return self.users.get(sock)
+
+    def token(self, sock):
+        """ Token to pass to put once the user data of sock arrives """
+        with self.lock:
+            return self.epoch, self.generations.get(sock, 0)
+
+    def put(self, sock, user_data, token):
+        """
+        Cache user data of sock unless it was invalidated after token
+
+        Returns:
+            bool: True if the data was cached
+        """
+        with self.lock:
+            if token != (self.epoch, self.generations.get(sock, 0)):
+                return False
+            self.users[sock] = user_data
+            return True
+
+    def invalidate(self, sock=None):
+        """ Drop the cached user of sock, or of every socket if None """
+        with self.lock:
+            if sock is None:
+                self.epoch += 1
+                self.users.clear()
+                self.generations.clear()
+            else:
+                self.generations[sock] = self.generations.get(sock, 0) + 1
+                self.users.pop(sock, None)
+
+    def __len__(self):
+        return len(self.users)
@@ -6,13 +6,13 @@ from Crypto import Random
 import logging
 import base64
 import json
-import time
+from collections import deque
 from os.path import dirname, exists
 from threading import Thread
 
 # websocket libs
 
-from twisted.internet import reactor, ssl
+from twisted.internet import reactor, ssl, defer, threads
 from twisted.python import log
 from twisted.internet import reactor
 
@@ -24,6 +24,7 @@ from autobahn.twisted.websocket import WebSocketServerProtocol, \
 from mycroft.messagebus.client.ws import WebsocketClient
 from mycroft.messagebus.message import Message
 from mycroft.util.log import getLogger
+from mycroft.util.lru import LRUCache
 from jarbas_utils.skill_tools import UserManagerQuery
 
 from mycroft.skills.intent_service import IntentParser
@@ -31,6 +32,11 @@ from mycroft.client.server.pgp import get_own_keys, encrypt_string, decrypt_stri
     import_key_from_ascii
 from mycroft.configuration import ConfigurationManager
 from mycroft.client.server.self_signed import create_self_signed_cert
+from mycroft.client.server.aes_session import AESSession
+from mycroft.client.server.outbound import OutboundQueue
+from mycroft.client.server.cache import UserCache
+from mycroft.client.server.upload import UploadSpool, UploadError, \
+    unpack_chunk
 config = ConfigurationManager.get()
 config = config.get("jarbas_server", {})
 
@@ -41,6 +47,36 @@ logger = getLogger(NAME)
 gpglog = logging.getLogger("gnupg")
 gpglog.setLevel("WARNING")
 
+# request fields replaced by the path of a file uploaded just before
+FILE_FIELDS = ["file", "file_path", "picture", "picture_path", "pic_path",
+               "feed", "feed_path", "dream_source", "dream_seed", "path"]
+
+
+def deferred_from_future(future, timeout):
+    """
+    Deferred fired on the reactor thread with the result of a bus request
+
+    Args:
+        future (Future): returned by WebsocketClient.send_request
+        timeout (float): seconds to wait before cancelling the request
+    Returns:
+        Deferred: fires with the reply Message, None on timeout
+    """
+    d = defer.Deferred()
+    timer = reactor.callLater(timeout, future.cancel)
+
+    def fire(future):
+        if timer.active():
+            timer.cancel()
+        if future.cancelled():
+            d.callback(None)
+        else:
+            d.callback(future.result())
+
+    future.add_done_callback(
+        lambda future: reactor.callFromThread(fire, future))
+    return d
+
 
 # how to react to messages
 class MyServerProtocol(WebSocketServerProtocol):
@@ -101,12 +137,22 @@ class MyServerFactory(WebSocketServerFactory):
         self.parser = IntentParser(self.emitter)
         self.user_manager = UserManagerQuery(name="server_ClientManager",
                                              emitter=self.emitter)
-
-        # messages to send queue
-        self.message_queue = []
-        self.queue_thread = Thread(target=self._queue)
-        self.queue_thread.setDaemon(True)
-        self.queue_thread.start()
+        # permission records by sock and intents by utterance, looked up
+        # without blocking the reactor
+        self.user_cache = UserCache()
+        self.intent_cache = LRUCache(config.get("intent_cache_size", 1024))
+
+        # messages to send, queued from the bus and sent on the reactor
+        self.outbound = OutboundQueue(self._send_queued,
+                                      reactor.callFromThread)
+
+        # client uploads, spooled to disk off the reactor thread, reading
+        # from a client pauses while upload_buffer bytes wait for the disk
+        self.uploads = UploadSpool(config.get("upload_dir"),
+                                   config.get("max_upload_size",
+                                              20 * 1024 * 1024),
+                                   config.get("upload_max_age", 3600))
+        self.upload_buffer = config.get("upload_buffer", 1024 * 1024)
 
         # allowed data
         self.ip_list = config.get("ip_list", [])
@@ -170,6 +216,13 @@ class MyServerFactory(WebSocketServerFactory):
         self.emitter.on('complete_intent_failure', self.handle_failure)
         self.emitter.on('client.message.request',
                         self.handle_message_to_sock_request)
+        for message_type in ["user.connect", "user.connected",
+                             "user.disconnect", "user.permissions.updated"]:
+            self.emitter.on(message_type, self.handle_user_changed)
+        for message_type in ["register_intent", "detach_intent",
+                             "detach_skill", "enable_intent",
+                             "disable_intent"]:
+            self.emitter.on(message_type, self.handle_intents_changed)
 
     def request_client_pgp(self, client, cipher="none"):
         type, ip, sock_num = client.peer.split(":")
@@ -206,8 +259,10 @@ class MyServerFactory(WebSocketServerFactory):
             #  if not whitelisted kick
             self.unregister_client(client, reason=u"Unknown ip")
             return
-        self.clients[client.peer] = {"object": client, "status": "waiting pgp", "aes_key": None, "aes_iv": None,
-                                     "user_object": None, "pgp": None, "fingerprint": None}
+        self.clients[client.peer] = {"object": client, "status": "waiting pgp", "aes": None,
+                                     "user_object": None, "pgp": None, "fingerprint": None,
+                                     "pending": None, "backlog": deque(),
+                                     "upload": None, "paused": False}
 
     def unregister_client(self, client, code=3078, reason=u"unregister client request"):
         """
@@ -225,27 +280,60 @@ class MyServerFactory(WebSocketServerFactory):
                          "pub_key": client_data.get("pgp", None), "nicknames":
                              client_data.get("names",[])},
                         context))
+            if client_data.get("upload") is not None:
+                client_data["upload"].abort()
             client.sendClose(code, reason)
             self.clients.pop(client.peer)
+            self.outbound.remove(client.peer)
 
     # internals
-    def _queue(self):
-        while True:
-            for msg in self.message_queue:
-                logger.debug("Processing queue")
-                if msg[4] == "none" and "cipher" in msg[2].keys():
-                    msg[4] = msg[2]["cipher"]
-                logger.debug("Encryption: " + msg[4])
-                self.send_message(msg[0], msg[1], msg[2], msg[3], msg[4])
-                self.message_queue.remove(msg)
-                logger.debug("Sucessfully sent encrypted data")
-            time.sleep(0.1)
+    def _send_queued(self, client, type, data, context, cipher):
+        # called on the reactor thread by the outbound queue
+        if client.peer not in self.clients:
+            logger.debug("Dropping message for disconnected client " +
+                         client.peer)
+            return
+        if cipher == "none" and "cipher" in data:
+            cipher = data["cipher"]
+        self.send_message(client, type, data, context, cipher)
 
     def process_message(self, client, payload, isBinary):
         """
-       Process message from client
+       Process message from client, messages arriving while a previous one
+       is being authorized wait for it so their order is kept
        """
-        logger.info("processing message from client: " + str(client.peer))
+        client_data = self.clients.get(client.peer)
+        if client_data is None:
+            return
+        client_data["backlog"].append((payload, isBinary))
+        if client_data["pending"] is None:
+            self._process_backlog(None, client)
+
+    def _process_backlog(self, result, client):
+        client_data = self.clients.get(client.peer)
+        if client_data is None:
+            return
+        client_data["pending"] = None
+        backlog = client_data["backlog"]
+        while backlog and client_data["pending"] is None:
+            payload, isBinary = backlog.popleft()
+            d = self._process_message(client, payload, isBinary)
+            if not isinstance(d, defer.Deferred):
+                continue
+            d.addErrback(self._authorization_failed, client)
+            finished = []
+            d.addBoth(finished.append)
+            if not finished:
+                # wait for the lookups before processing the next message
+                client_data["pending"] = d
+                d.addCallback(self._process_backlog, client)
+
+    def _authorization_failed(self, failure, client):
+        logger.error("Could not process message from " + client.peer + ": " +
+                     failure.getErrorMessage())
+
+    def _process_message(self, client, payload, isBinary):
+        logger.debug("processing message from client: " + str(client.peer))
         client_data = self.clients[client.peer]
         client_type, ip, sock_num = client.peer.split(":")
         if client_data["status"] == "waiting pgp":
@@ -280,13 +368,11 @@ class MyServerFactory(WebSocketServerFactory):
             logger.info("fingerprint: " + str(fp))
             self.clients[client.peer]["user"] = client_data.get("user")
             # generate and send aes key to client
-            iv, key = self.aes_generate_pair()
-            iv = base64.b64encode(iv)
-            key = base64.b64encode(key)
-            self.clients[client.peer]["aes_key"] = key
-            self.clients[client.peer]["aes_iv"] = iv
+            session = AESSession()
+            self.clients[client.peer]["aes"] = session
             message_type = "client.aes.key"
-            message_data = {"aes_key": key, "iv": iv, "cipher": "pgp"}
+            message_data = {"aes_key": session.b64_key, "iv": session.b64_iv,
+                            "cipher": "pgp"}
             message_context = {"sock_num": sock_num}
             logger.info("Sending AES session key to client")
             self.clients[client.peer]["status"] = "waiting AES"
@@ -297,12 +383,7 @@ class MyServerFactory(WebSocketServerFactory):
             self.unregister_client(client, reason=u"Plaintext received, binary data always expected after pgp exchange")
             return
         if client_data["status"] == "waiting AES":
-            key = self.clients[client.peer]["aes_key"]
-            iv = self.clients[client.peer]["aes_iv"]
-            iv = base64.b64decode(iv)
-            key = base64.b64decode(key)
-            cipher = AES.new(key, AES.MODE_CFB, iv)
-            message = cipher.decrypt(payload)[len(iv):]
+            message = client_data["aes"].decrypt(payload)
             deserialized_message = Message.deserialize(message)
             if deserialized_message.data.get("status", "failed") == "success":
                 logger.debug("Secure connection ready")
@@ -316,35 +397,15 @@ class MyServerFactory(WebSocketServerFactory):
                 self.unregister_client(client, reason=u"Secure connection failed")
         elif client_data["status"] == "connected":
             # decypt AES
-            key = self.clients[client.peer]["aes_key"]
-            iv = self.clients[client.peer]["aes_iv"]
-            iv = base64.b64decode(iv)
-            key = base64.b64decode(key)
-            cipher = AES.new(key, AES.MODE_CFB, iv)
-            message = cipher.decrypt(payload)[len(iv):]
+            message = client_data["aes"].decrypt(payload)
             deserialized_message = Message.deserialize(message)
             logger.debug(message)
             # parse message type
-            self.process_message_type(client, deserialized_message)
+            return self.process_message_type(client, deserialized_message)
         elif client_data["status"] == "receiving file":
             # decypt AES
-            key = self.clients[client.peer]["aes_key"]
-            iv = self.clients[client.peer]["aes_iv"]
-            iv = base64.b64decode(iv)
-            key = base64.b64decode(key)
-            cipher = AES.new(key, AES.MODE_CFB, iv)
-            message = cipher.decrypt(payload)[len(iv):]
-            # close open file
-            if message == "end_of_file":
-                self.clients[client.peer]["status"] = "connected"
-                logger.info("file received for " + client.peer)
-                self.clients[client.peer]["file"].close()
-                self.clients[client.peer].pop("extension")
-                self.clients[client.peer].pop("file")
-            # write file chunk
-            else:
-                logger.info("file chunk received for " + client.peer)
-                self.clients[client.peer]["file"].write(message)
+            message = client_data["aes"].decrypt(payload)
+            return self.receive_chunk(client, message)
         else:
             # not supposed to happen
             logger.error("someone is doing something wrong, client status seems to be invalid: " + client_data["status"])
@@ -354,7 +415,6 @@ class MyServerFactory(WebSocketServerFactory):
         logger.debug("Message type: " + deserialized_message.type)
         if (deserialized_message.type not in self.bus_message_list and self.message_blacklist) or \
                 (deserialized_message.type in self.bus_message_list and not self.message_blacklist):
-            data = deserialized_message.data
             logger.debug("Message data: " + str(deserialized_message.data))
             ctype, ip, sock_num = client.peer.split(":")
             # build context
@@ -372,70 +432,239 @@ class MyServerFactory(WebSocketServerFactory):
             context["ip"] = ip
             logger.debug("Message context: " + str(context))
             # authorize user message_type
-            # get user from sock
-            user_data = self.user_manager.user_from_sock(sock_num)
-            logger.debug("user data: " + str(user_data))
-            # see if this user can perform this action
-            if deserialized_message.type in user_data.get("forbidden_messages", []):
-                logger.warning("This user is not allowed to perform this action " + str(sock_num))
-                self.send_message(client, "speak", {"utterance": "Messages of type " + deserialized_message.type + " are not allowed for your account"}, context)
-                return
-            user = user_data.get("id", sock_num)
-            logger.debug("user data: " + str(user_data))
-            context["user"] = user
-            try:
-                context["user_name"] = user_data.get("nicknames", ["unknown "
-                                                                "name"])[0]
-            except:
-                context["user_name"] = "unknown name"
-            logger.debug(context)
-            # check if message also sent files
-            # TODO file formats
-            if self.clients[client.peer].get("file_path"):
-                fields = ["file", "file_path", "picture", "picture_path",
-                          "pic_path", "feed", "feed_path", "dream_source",
-                          "dream_seed", "path"]
-                for field in fields:
-                    if field in deserialized_message.data.keys():
-                        deserialized_message.data[field] = self.clients[
-                            client.peer]["file_path"]
-
-            # pre-process message type
-            if deserialized_message.type == "recognizer_loop:utterance":
-                utterance = data["utterances"][0]
-                # validate user utterance
-                self.validate_user_utterance(utterance, user_data, context,
-                                             client)
-            elif deserialized_message.type == "incoming_file":
-                logger.info("started receiving file for " + client.peer)
-                self.clients[client.peer]["status"] = "receiving file"
-                extension = deserialized_message.data.get("extension", ".jpg")
-                path = "../" + client.peer + extension
-                self.clients[client.peer]["extension"] = extension
-                self.clients[client.peer]["file_path"] = path
-                self.clients[client.peer]["file"] = open(path, 'wb')
-            else:
-                logger.info("no special handling provided for " + deserialized_message.type)
-                # message is whitelisted and no special handling was provided
-                self.emitter.emit(Message(deserialized_message.type, deserialized_message.data, context))
-            # notify user action
-            client_data = self.clients[client.peer]
-            context = {"user": client_data["names"][0], "source": ip + ":" + str(sock_num)}
-            try:
-                self.emitter.emit(
-                Message("user.request",
-                        {"ip": ip, "sock": sock_num, "pub_key": client_data["pgp"], "nicknames": client_data["names"]},
-                        context))
-            except Exception as e:
-                logger.error(e)
+            # get user from sock without blocking the reactor
+            d = self.get_user_data(sock_num)
+            d.addCallback(self._process_authorized, client,
+                          deserialized_message, context)
+            return d
         else:
             logger.warning("message type not allowed: " +
                            deserialized_message.type)
 
-    def validate_user_utterance(self, utterance, user_data, context, client):
+    def _process_authorized(self, user_data, client, deserialized_message,
+                            context):
+        if client.peer not in self.clients:
+            # disconnected while waiting for the user manager
+            return
+        data = deserialized_message.data
+        ctype, ip, sock_num = client.peer.split(":")
+        logger.debug("user data: " + str(user_data))
+        # see if this user can perform this action
+        if deserialized_message.type in user_data.get("forbidden_messages", []):
+            logger.warning("This user is not allowed to perform this action " + str(sock_num))
+            self.send_message(client, "speak", {"utterance": "Messages of type " + deserialized_message.type + " are not allowed for your account"}, context, cipher="aes")
+            return
+        user = user_data.get("id", sock_num)
+        logger.debug("user data: " + str(user_data))
+        context["user"] = user
+        try:
+            context["user_name"] = user_data.get("nicknames", ["unknown "
+                                                            "name"])[0]
+        except:
+            context["user_name"] = "unknown name"
+        logger.debug(context)
+        # a received file replaces the client side path in the request
+        # that follows it
+        file_path = self.clients[client.peer].pop("file_path", None)
+        if file_path:
+            for field in FILE_FIELDS:
+                if field in data:
+                    data[field] = file_path
+
+        # pre-process message type
+        d = None
+        if deserialized_message.type == "recognizer_loop:utterance":
+            utterance = data["utterances"][0]
+            # validate user utterance
+            d = self.validate_user_utterance(utterance, user_data, context,
+                                             client, data.get("lang", "en-us"))
+        elif deserialized_message.type == "incoming_file":
+            self.start_upload(client, data)
+        else:
+            logger.info("no special handling provided for " + deserialized_message.type)
+            # message is whitelisted and no special handling was provided
+            self.emitter.emit(Message(deserialized_message.type, deserialized_message.data, context))
+        # notify user action
+        client_data = self.clients[client.peer]
+        context = {"user": client_data["names"][0], "source": ip + ":" + str(sock_num)}
+        try:
+            self.emitter.emit(
+            Message("user.request",
+                    {"ip": ip, "sock": sock_num, "pub_key": client_data["pgp"], "nicknames": client_data["names"]},
+                    context))
+        except Exception as e:
+            logger.error(e)
+        return d
+
+    # file uploads
+    def start_upload(self, client, data):
+        """
+       Chunks following an incoming_file message are spooled to disk,
+       until the empty end of file chunk
+       """
+        client_data = self.clients[client.peer]
+        ctype, ip, sock_num = client.peer.split(":")
+        client_data["status"] = "receiving file"
+        try:
+            upload = self.uploads.start(sock_num,
+                                        data.get("extension", ".jpg"),
+                                        data.get("size"), data.get("sha256"))
+        except (UploadError, IOError, OSError) as e:
+            # chunks are discarded until the end of file
+            self.upload_failed(client, None, e)
+            return
+        logger.info("started receiving file for " + client.peer)
+        client_data["upload"] = upload
+        client_data["writes"] = defer.succeed(None)
+        client_data["buffered"] = 0
+
+    def receive_chunk(self, client, message):
+        client_data = self.clients[client.peer]
+        upload = client_data["upload"]
+        try:
+            seq, chunk = unpack_chunk(message)
+        except UploadError as e:
+            self.upload_failed(client, upload, e)
+            return
+        if not chunk:
+            client_data["status"] = "connected"
+            client_data["upload"] = None
+        if upload is None:
+            # the upload failed, discard chunks until the end of file
+            return
+        try:
+            upload.accept(seq, chunk)
+        except UploadError as e:
+            self.upload_failed(client, upload, e)
+            return
+        if chunk:
+            client_data["buffered"] += len(chunk)
+            if client_data["buffered"] > self.upload_buffer and \
+                    not client_data["paused"]:
+                # stop reading from this client until the disk catches up
+                client_data["paused"] = True
+                client.transport.pauseProducing()
+            d = self._spool(client, upload, upload.write, chunk)
+            d.addCallback(self._chunk_spooled, client, len(chunk))
+            return
+        # the next message waits for the file to be complete
+        d = self._spool(client, upload, upload.finish)
+        d.addCallback(self._upload_finished, client, upload)
+        return d
+
+    def _spool(self, client, upload, f, *args):
+        # disk operations of an upload run in order on the thread pool
+        def run(result):
+            if not upload.aborted:
+                return threads.deferToThread(f, *args)
+
+        d = self.clients[client.peer]["writes"]
+        d.addCallback(run)
+        d.addErrback(self._spool_failed, client, upload)
+        return d
+
+    def _spool_failed(self, failure, client, upload):
+        if not upload.aborted:
+            self.upload_failed(client, upload, failure.value)
+
+    def _chunk_spooled(self, result, client, size):
+        client_data = self.clients.get(client.peer)
+        if client_data is None:
+            return
+        client_data["buffered"] -= size
+        if client_data["paused"] and \
+                client_data["buffered"] <= self.upload_buffer // 2:
+            client_data["paused"] = False
+            client.transport.resumeProducing()
+
+    def _upload_finished(self, result, client, upload):
+        client_data = self.clients.get(client.peer)
+        if client_data is None or upload.aborted:
+            return
+        logger.info("file received for " + client.peer)
+        client_data["file_path"] = upload.path
+        self.send_message(client, "incoming_file.received",
+                          {"size": upload.received,
+                           "sha256": upload.sha256}, None, "aes")
+
+    def upload_failed(self, client, upload, error):
+        logger.error("Upload from " + client.peer + " failed: " + str(error))
+        if upload is not None:
+            upload.abort()
+        client_data = self.clients.get(client.peer)
+        if client_data is None:
+            return
+        if client_data["upload"] is upload:
+            client_data["upload"] = None
+        self.send_message(client, "incoming_file.failed",
+                          {"reason": str(error)}, None, "aes")
+
+    def get_user_data(self, sock_num):
+        """
+        Permission record of the user connected at sock_num
+
+        Returns:
+            Deferred: fires with the user data, immediately if cached
+        """
+        user_data = self.user_cache.get(sock_num)
+        if user_data is not None:
+            return defer.succeed(user_data)
+        token = self.user_cache.token(sock_num)
+        future = self.user_manager.user_from_sock_async(sock_num)
+
+        def received(response):
+            user_data = response.data if response is not None else None
+            if not user_data or user_data.get("id") is None:
+                # unknown users and timeouts are not cached
+                logger.warning("No user data for sock " + str(sock_num))
+                return user_data or {}
+            self.user_cache.put(sock_num, user_data, token)
+            return user_data
+
+        d = deferred_from_future(future, self.user_manager.timeout)
+        return d.addCallback(received)
+
+    def get_intent(self, utterance, lang="en-us"):
+        """
+        Intent that will handle utterance
+
+        Returns:
+            Deferred: fires with (intent name, skill id), immediately if
+                      cached
+        """
+        key = (lang, utterance.strip().lower())
+        intent = self.intent_cache.get(key)
+        if intent is not None:
+            return defer.succeed(intent)
+        # intents registered while waiting make the answer stale
+        generation = self.intent_cache.generation
+        future = self.parser.determine_intent_async(utterance, lang)
+
+        def received(response):
+            if response is None:
+                return "", 0
+            intent = (response.data.get("intent_name", ""),
+                      response.data.get("skill_id", 0))
+            self.intent_cache.put(key, intent, generation)
+            return intent
+
+        d = deferred_from_future(future, self.parser.time_out)
+        return d.addCallback(received)
+
+    def validate_user_utterance(self, utterance, user_data, context, client,
+                                lang="en-us"):
         # check if skill/intent that will trigger is authorized for this user
         logger.info("Authorizing utterance for user")
-        intent, skill = self.parser.determine_intent(utterance)
+        d = self.get_intent(utterance, lang)
+        d.addCallback(self._authorize_utterance, utterance, user_data,
+                      context, client)
+        return d
+
+    def _authorize_utterance(self, intent, utterance, user_data, context,
+                             client):
+        if client.peer not in self.clients:
+            return
+        intent, skill = intent
         if int(skill) == 0:
             # TODO intent failure, authorize fallback
             pass
@@ -451,9 +680,9 @@ class MyServerFactory(WebSocketServerFactory):
 
         if skill in user_data.get("forbidden_skills", config.get(
                 "forbidden_skills", [])):
-            logger.warning("Skill " + skill + " is not allowed for " + user_data.get("nicknames", [client.peer])[0])
+            logger.warning("Skill " + str(skill) + " is not allowed for " + user_data.get("nicknames", [client.peer])[0])
             self.send_message(client, "speak", {
-                "utterance": skill + " is not allowed for your account"},
+                "utterance": str(skill) + " is not allowed for your account"},
                               context, cipher="aes")
 
             return
@@ -474,8 +703,19 @@ class MyServerFactory(WebSocketServerFactory):
     def send_message(self, client, type="speak", data=None, context=None, cipher="none"):
         if data is None:
             data = {}
-        logger.info("Sending message to " + str(client.peer))
-        logger.info("cipher: " + cipher + " context: " + str(context) + " data: " + str(data))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sending message to " + str(client.peer) + " cipher: " + cipher +
+                         " context: " + str(context) + " data: " + str(data))
+        if cipher == "aes":
+            session = self.clients[client.peer]["aes"]
+            # the message announces the iv of the next one
+            next_iv = AESSession.generate_iv()
+            context = dict(context or {})
+            context["aes_iv"] = base64.b64encode(next_iv)
+            message = self.Message_to_raw_data(Message(type, data, context))
+            message = session.encrypt(message, next_iv)
+            client.sendMessage(message, isBinary=True)
+            return message
         message = self.Message_to_raw_data(Message(type, data, context))
         if cipher == "pgp":
             logger.debug("target pgp fingerprint: " + self.clients[client.peer].get("fingerprint"))
@@ -486,23 +726,6 @@ class MyServerFactory(WebSocketServerFactory):
             else:
                 message = str(message)
                 logger.debug(message)
-        if cipher == "aes":
-            # start encryptor
-            iv = self.clients[client.peer]["aes_iv"]
-            iv = base64.b64decode(iv)
-            key = self.clients[client.peer]["aes_key"]
-            key = base64.b64decode(key)
-            cipher = AES.new(key, AES.MODE_CFB, iv)
-            # generate new iv
-            new_iv, key = self.aes_generate_pair()
-            new_iv = base64.b64encode(new_iv)
-            self.clients[client.peer]["aes_iv"] = new_iv
-            context["aes_iv"] = new_iv
-            # encrypt message
-            message = self.Message_to_raw_data(Message(type, data, context))
-            message = iv + cipher.encrypt(message)
-            client.sendMessage(message, isBinary=True)
-            return message
         client.sendMessage(message.encode("utf-8"))
         return message
 
@@ -541,9 +764,17 @@ class MyServerFactory(WebSocketServerFactory):
         for client in self.clients:
             c, ip, sock = client.split(":")
             if sock == sock_num:
-                self.message_queue.append([self.clients[client]["object"], type, data, context, cipher])
+                self.outbound.put(self.clients[client]["object"], type, data, context, cipher)
                 return
 
+    def handle_user_changed(self, event):
+        # connections and permission changes invalidate cached users
+        sock = event.data.get("sock")
+        self.user_cache.invalidate(str(sock) if sock is not None else None)
+
+    def handle_intents_changed(self, event):
+        self.intent_cache.clear()
+
     def handle_failure(self, event):
         # TODO warn user of possible lack of answer (wait for wolfram alpha x seconds first)
         logger.debug("intent failure detected")
@@ -562,8 +793,7 @@ class MyServerFactory(WebSocketServerFactory):
             c, ip, sock = client.split(":")
             if sock == sock_num:
                 logger.debug("Adding answer to answering queue")
-                self.message_queue.append(
-                    [self.clients[client]["object"], answer_type, event.data, event.context, "aes"])
+                self.outbound.put(self.clients[client]["object"], answer_type, event.data, event.context, "aes")
                 return
         logger.error("Speak targeted to non existing client")
 
@@ -603,9 +833,8 @@ if __name__ == '__main__':
         logger.info("key created at: " + key)
         logger.info("crt created at: " + cert)
         # update config with new keys
-        config["cert_file"] = cert
-        config["key_file"] = key
-        factory.config_update({"jarbas_server": config}, True)
+        factory.config_update({"jarbas_server": dict(
+            config, cert_file=cert, key_file=key)}, True)
 
     # SSL server context: load server key and certificate
     contextFactory = ssl.DefaultOpenSSLContextFactory(key, cert)
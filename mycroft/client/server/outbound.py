@@ -0,0 +1,61 @@
+from collections import deque
+from threading import Lock
+
+from mycroft.util.log import LOG
+
+__author__ = 'jarbas'
+
+
+class OutboundQueue(object):
+    """
+    Per client queues of outgoing messages, drained on the reactor thread.
+
+    Messages are queued from any thread, each client has at most one
+    pending drain call scheduled on the reactor. Messages queued while a
+    drain is pending are sent by that drain, so a busy client does not
+    wake the reactor once per message. Messages of a client are sent in
+    the order they were queued.
+
+    Args:
+        send (callable): send(client, *message) called on the reactor
+                         thread for every queued message
+        call_from_thread (callable): schedules a call on the reactor
+                                     thread, e.g. reactor.callFromThread
+    """
+
+    def __init__(self, send, call_from_thread):
+        self.send = send
+        self.call_from_thread = call_from_thread
+        self.queues = {}
+        self.lock = Lock()
+
+    def put(self, client, *message):
+        """ Queue a message for client, can be called from any thread """
+        with self.lock:
+            queue = self.queues.get(client.peer)
+            if queue is not None:
+                queue.append((client, message))
+                return
+            self.queues[client.peer] = deque([(client, message)])
+        self.call_from_thread(self.drain, client.peer)
+
+    def drain(self, peer):
+        """ Send every message queued for peer, runs on the reactor """
+        with self.lock:
+            queue = self.queues.pop(peer, None)
+        while queue:
+            client, message = queue.popleft()
+            try:
+                self.send(client, *message)
+            except Exception as e:
+                LOG.error("Could not send message to %s: %s" %
+                          (peer, repr(e)))
+
+    def remove(self, peer):
+        """ Discard the messages queued for a disconnected client """
+        with self.lock:
+            self.queues.pop(peer, None)
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(queue) for queue in self.queues.values())
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import re
+import struct
+import tempfile
+import time
+from threading import Lock
+
+from mycroft.util.log import LOG
+
+__author__ = 'jarbas'
+
+# every chunk of an upload starts with its sequence number, an empty chunk
+# ends the upload
+CHUNK_HEADER = struct.Struct(">I")
+EXTENSION = re.compile(r"^\.[A-Za-z0-9]{1,8}$")
+
+
+def pack_chunk(seq, data=""):
+    """ Frame a file chunk, an empty chunk marks the end of the file """
+    return CHUNK_HEADER.pack(seq) + data
+
+
+def unpack_chunk(payload):
+    """
+    Split a framed file chunk
+
+    Returns:
+        tuple: (sequence number, data)
+    Raises:
+        UploadError: if payload is not a chunk
+    """
+    if len(payload) < CHUNK_HEADER.size:
+        raise UploadError("truncated chunk")
+    seq, = CHUNK_HEADER.unpack_from(payload)
+    return seq, payload[CHUNK_HEADER.size:]
+
+
+class UploadError(Exception):
+    pass
+
+
+class FileUpload(object):
+    """
+    A file being received from a client, spooled to disk.
+
+    accept validates a chunk and must be called in order, as chunks
+    arrive. write and finish do the disk io and hashing, they can run on
+    another thread but must also be called in chunk order. abort can be
+    called from any thread, later writes are ignored.
+
+    Args:
+        path (str): spool file, already created
+        max_size (int): bytes accepted before the upload is refused
+        size (int): size announced by the client, None if unknown
+        sha256 (str): hex digest announced by the client, None if unknown
+    """
+
+    def __init__(self, path, max_size, size=None, sha256=None):
+        self.path = path
+        self.max_size = max_size
+        self.size = size
+        self.sha256 = sha256.lower() if sha256 else None
+        self.next_seq = 0
+        self.received = 0
+        self.complete = False
+        self.aborted = False
+        self.lock = Lock()
+        self.digest = hashlib.sha256()
+        self.file = open(path, "wb")
+
+    def accept(self, seq, data):
+        """
+        Validate the next chunk
+
+        Returns:
+            bool: True if this was the last, empty, chunk
+        Raises:
+            UploadError: if the chunk is out of order or over the limits
+        """
+        if self.complete:
+            raise UploadError("chunk received after end of file")
+        if seq != self.next_seq:
+            raise UploadError("expected chunk %d, received %d" %
+                              (self.next_seq, seq))
+        self.next_seq += 1
+        if not data:
+            self.complete = True
+            return True
+        self.received += len(data)
+        if self.received > self.max_size:
+            raise UploadError("file larger than %d bytes" % self.max_size)
+        if self.size is not None and self.received > self.size:
+            raise UploadError("file larger than announced")
+        return False
+
+    def write(self, data):
+        """ Hash and spool an accepted chunk """
+        with self.lock:
+            if self.aborted:
+                return
+            self.digest.update(data)
+            self.file.write(data)
+
+    def finish(self):
+        """
+        Close the spool file and check it against what was announced
+
+        Returns:
+            str: path of the received file
+        Raises:
+            UploadError: if the size or digest do not match
+        """
+        with self.lock:
+            if self.aborted:
+                raise UploadError("upload aborted")
+            self.file.close()
+        if self.size is not None and self.received != self.size:
+            raise UploadError("received %d of %d bytes" %
+                              (self.received, self.size))
+        digest = self.digest.hexdigest()
+        if self.sha256 is not None and digest != self.sha256:
+            raise UploadError("sha256 mismatch")
+        self.sha256 = digest
+        return self.path
+
+    def abort(self):
+        """ Close and delete the spool file """
+        with self.lock:
+            self.aborted = True
+            self.file.close()
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class UploadSpool(object):
+    """
+    Directory where client uploads are spooled.
+
+    Received files stay available to the skills handling the request that
+    follows them, files older than max_age are deleted when new uploads
+    start.
+
+    Args:
+        directory (str): spool directory, created if missing
+        max_size (int): largest upload accepted, in bytes
+        max_age (int): seconds to keep received files
+    """
+
+    def __init__(self, directory=None, max_size=20 * 1024 * 1024,
+                 max_age=3600):
+        if not directory:
+            directory = os.path.join(tempfile.gettempdir(), "mycroft",
+                                     "uploads")
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        self.directory = directory
+        self.max_size = max_size
+        self.max_age = max_age
+        self.lock = Lock()
+
+    def start(self, name, extension=".jpg", size=None, sha256=None):
+        """
+        Spool a new upload
+
+        Args:
+            name (str): prefix of the spool file, e.g. the client socket
+            extension (str): file extension announced by the client
+            size (int): announced size in bytes, optional
+            sha256 (str): announced hex digest, optional
+        Returns:
+            FileUpload
+        Raises:
+            UploadError: if the announced file is not acceptable
+        """
+        if not EXTENSION.match(extension or ""):
+            raise UploadError("invalid extension")
+        if size is not None:
+            try:
+                size = int(size)
+            except (TypeError, ValueError):
+                raise UploadError("invalid size")
+            if size < 0 or size > self.max_size:
+                raise UploadError("file larger than %d bytes" %
+                                  self.max_size)
+        self.cleanup()
+        fd, path = tempfile.mkstemp(suffix=extension, prefix=name + "_",
+                                    dir=self.directory)
+        os.close(fd)
+        return FileUpload(path, self.max_size, size, sha256)
+
+    def cleanup(self, max_age=None):
+        """ Delete spooled files older than max_age seconds """
+        if max_age is None:
+            max_age = self.max_age
+        oldest = time.time() - max_age
+        with self.lock:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                try:
+                    if os.path.getmtime(path) < oldest:
+                        os.remove(path)
+                except OSError as e:
+                    LOG.warning("Could not remove upload %s: %s" %
+                                (path, repr(e)))
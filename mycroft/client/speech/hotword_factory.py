@@ -45,6 +45,15 @@ class HotWordEngine(object):
     def found_wake_word(self, frame_data):
         return False
 
+    def found_wake_words(self, frame_data):
+        """
+        Returns:
+            list: key phrases heard in frame_data
+        """
+        if self.found_wake_word(frame_data):
+            return [self.key_phrase]
+        return []
+
 
 class PocketsphinxHotWord(HotWordEngine):
     def __init__(self, key_phrase="hey mycroft", config=None, lang="en-us"):
@@ -102,6 +111,89 @@ class PocketsphinxHotWord(HotWordEngine):
         return hyp and self.key_phrase in hyp.hypstr.lower()
 
 
+class PocketsphinxKeyphraseList(PocketsphinxHotWord):
+    """
+    Detects several pocketsphinx hotwords with a single decoder in keyword
+    list mode, so the audio is decoded once for all of them.
+
+    Args:
+        hotwords (dict): hotword -> hotword config (phonemes, threshold)
+        lang (str): language of the acoustic model
+    """
+
+    def __init__(self, hotwords, lang="en-us"):
+        HotWordEngine.__init__(self, " | ".join(sorted(hotwords)),
+                               {"module": "pocketsphinx"}, lang)
+        from pocketsphinx import Decoder
+        self.sample_rate = self.listener_config.get("sample_rate", 16000)
+        # key phrase -> (phonemes, threshold)
+        self.key_phrases = {}
+        for hotword, config in hotwords.items():
+            self.key_phrases[str(hotword).lower()] = (
+                config.get("phonemes", "HH EY . M AY K R AO F T"),
+                config.get("threshold", 1e-90))
+        dict_name = self.create_list_dict(self.key_phrases)
+        kws_name = self.create_kws_file(self.key_phrases)
+        config = self.create_list_config(dict_name, kws_name,
+                                         Decoder.default_config())
+        self.decoder = Decoder(config)
+
+    @staticmethod
+    def create_list_dict(key_phrases):
+        """ Pronunciation dictionary of the words of every key phrase """
+        pronunciations = {}
+        lines = []
+        for key_phrase in sorted(key_phrases):
+            phonemes = key_phrases[key_phrase][0]
+            for word, phoneme in zip(key_phrase.split(),
+                                     phonemes.split('.')):
+                phoneme = phoneme.strip()
+                known = pronunciations.setdefault(word, [])
+                if phoneme in known:
+                    continue
+                known.append(phoneme)
+                # alternative pronunciations are named word(2), word(3)...
+                name = word if len(known) == 1 else \
+                    word + "(" + str(len(known)) + ")"
+                lines.append(name + ' ' + phoneme + '\n')
+        (fd, file_name) = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            f.writelines(lines)
+        return file_name
+
+    @staticmethod
+    def create_kws_file(key_phrases):
+        """ Keyword list with the detection threshold of each phrase """
+        (fd, file_name) = tempfile.mkstemp()
+        with os.fdopen(fd, 'w') as f:
+            for key_phrase in sorted(key_phrases):
+                threshold = float(key_phrases[key_phrase][1])
+                f.write(key_phrase + ' /' + repr(threshold) + '/\n')
+        return file_name
+
+    def create_list_config(self, dict_name, kws_name, config):
+        model_file = join(RECOGNIZER_DIR, 'model', self.lang, 'hmm')
+        if not exists(model_file):
+            LOG.error('PocketSphinx model not found at ' + str(model_file))
+        config.set_string('-hmm', model_file)
+        config.set_string('-dict', dict_name)
+        config.set_string('-kws', kws_name)
+        config.set_float('-samprate', self.sample_rate)
+        config.set_int('-nfft', 2048)
+        config.set_string('-logfn', '/dev/null')
+        return config
+
+    def found_wake_words(self, frame_data):
+        if not self.transcribe(frame_data):
+            return []
+        heard = set(seg.word.lower() for seg in self.decoder.seg())
+        return [key_phrase for key_phrase in self.key_phrases
+                if key_phrase in heard]
+
+    def found_wake_word(self, frame_data):
+        return len(self.found_wake_words(frame_data)) > 0
+
+
 class SnowboyHotWord(HotWordEngine):
     def __init__(self, key_phrase="hey mycroft", config=None, lang="en-us"):
         super(SnowboyHotWord, self).__init__(key_phrase, config, lang)
@@ -150,3 +242,15 @@ class HotWordFactory(object):
         config = config.get(hotword, {"module": module})
         clazz = HotWordFactory.CLASSES.get(module)
         return clazz(hotword, config, lang=lang)
+
+    @staticmethod
+    def create_keyphrase_list(hotwords, lang="en-us"):
+        """
+        Create one engine detecting several pocketsphinx hotwords
+
+        Args:
+            hotwords (dict): hotword -> hotword config
+            lang (str): language of the acoustic model
+        """
+        LOG.info("creating keyphrase list " + ", ".join(hotwords))
+        return PocketsphinxKeyphraseList(hotwords, lang=lang)
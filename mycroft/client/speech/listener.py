@@ -27,11 +27,12 @@ from requests.exceptions import ConnectionError
 
 import mycroft.dialog
 from mycroft.client.speech.hotword_factory import HotWordFactory
-from mycroft.client.speech.mic import MutableMicrophone, ResponsiveRecognizer
+from mycroft.client.speech.mic import MutableMicrophone, \
+    ResponsiveRecognizer, StreamedAudioData
 from mycroft.configuration import ConfigurationManager
 from mycroft.metrics import MetricsAggregator
 from mycroft.session import SessionManager
-from mycroft.stt import STTFactory
+from mycroft.stt import STTFactory, StreamingSTT
 from mycroft.util.log import LOG
 
 
@@ -40,9 +41,11 @@ class AudioProducer(Thread):
     AudioProducer
     given a mic and a recognizer implementation, continuously listens to the
     mic for potential speech chunks and pushes them onto the queue.
+    If a streaming STT engine is given, utterances are transcribed while
+    they are recorded.
     """
 
-    def __init__(self, state, queue, mic, recognizer, emitter):
+    def __init__(self, state, queue, mic, recognizer, emitter, stream=None):
         super(AudioProducer, self).__init__()
         self.daemon = True
         self.state = state
@@ -50,6 +53,7 @@ class AudioProducer(Thread):
         self.mic = mic
         self.recognizer = recognizer
         self.emitter = emitter
+        self.stream = stream
 
     def run(self):
 
@@ -61,7 +65,11 @@ class AudioProducer(Thread):
             while self.state.running:
                 LOG.info("Microphone listening started")
                 try:
-                    audio = self.recognizer.listen(source, self.emitter)
+                    # while sleeping the audio only goes to the wake up
+                    # recognizer
+                    stream = None if self.state.sleeping else self.stream
+                    audio = self.recognizer.listen(source, self.emitter,
+                                                   stream)
                     self.queue.put(audio)
                 except IOError, ex:
                     # NOTE: Audio stack on raspi is slightly different, throws
@@ -87,6 +95,8 @@ class AudioConsumer(Thread):
 
     # In seconds, the minimum audio size to be sent to remote STT
     MIN_AUDIO_SIZE = 0.5
+    # seconds to wait for the transcription of a streamed utterance
+    STREAM_TIMEOUT = 10
 
     def __init__(self, state, queue, emitter, stt,
                  wakeup_recognizer, wakeword_recognizer):
@@ -156,8 +166,13 @@ class AudioConsumer(Thread):
         LOG.debug("Transcribing audio")
         text = None
         try:
-            # Invoke the STT engine on the audio clip
-            text = self.stt.execute(audio).lower().strip()
+            if isinstance(audio, StreamedAudioData):
+                # transcribed while recording
+                text = self.stream_result(audio)
+            else:
+                # Invoke the STT engine on the audio clip
+                text = self.stt.execute(audio)
+            text = text.lower().strip()
             LOG.debug("STT: " + text)
         except sr.RequestError as e:
             LOG.error("Could not request Speech Recognition {0}".format(e))
@@ -189,6 +204,17 @@ class AudioConsumer(Thread):
                 self.metrics.attr('utterances', [text])
         return text
 
+    def stream_result(self, audio):
+        """
+        Wait for the transcription of a streamed utterance, the recording
+        is transcribed with execute if the stream failed
+        """
+        try:
+            return audio.transcription.result(self.STREAM_TIMEOUT)
+        except Exception as e:
+            LOG.error("STT stream failed: " + repr(e))
+            return self.stt.execute(audio)
+
     def __speak(self, utterance):
         payload = {
             'utterance': utterance,
@@ -209,6 +235,10 @@ class RecognizerLoop(EventEmitter):
         recognizer and remote general speech recognition.
     """
 
+    # configuration sections the loop is built from
+    CONFIG_SECTIONS = ("lang", "listener", "hotwords", "stt", "sounds",
+                       "confirm_listening")
+
     def __init__(self):
         super(RecognizerLoop, self).__init__()
         self.mute_calls = 0
@@ -220,7 +250,8 @@ class RecognizerLoop(EventEmitter):
         """
         config = ConfigurationManager.get()
         self.config_core = config
-        self._config_hash = hash(str(config))
+        self._config_version = ConfigurationManager.version(
+            *self.CONFIG_SECTIONS)
         self.lang = config.get('lang')
         self.config = config.get('listener')
         rate = self.config.get('sample_rate')
@@ -242,6 +273,7 @@ class RecognizerLoop(EventEmitter):
     def create_hot_word_engines(self):
         LOG.info("creating hotword engines")
         hot_words = self.config_core.get("hotwords", {})
+        pocketsphinx_words = {}
         for word in hot_words:
             data = hot_words[word]
             if word == self.wakeup_recognizer.key_phrase or word == self.wakeword_recognizer.key_phrase or not data.get(
@@ -251,9 +283,19 @@ class RecognizerLoop(EventEmitter):
             ding = data.get("sound")
             utterance = data.get("utterance")
             listen = data.get("listen", False)
-            engine = HotWordFactory.create_hotword(word, lang=self.lang)
+            if type == "pocketsphinx":
+                # created below, one decoder listens for all of them
+                engine = None
+                pocketsphinx_words[word] = data
+            else:
+                engine = HotWordFactory.create_hotword(word, lang=self.lang)
             self.hot_word_engines[word] = [engine, ding, utterance,
                                            listen, type]
+        if pocketsphinx_words:
+            engine = HotWordFactory.create_keyphrase_list(pocketsphinx_words,
+                                                          lang=self.lang)
+            for word in pocketsphinx_words:
+                self.hot_word_engines[word][0] = engine
 
     def create_wake_word_recognizer(self):
         # Create a local recognizer to hear the wakeup word, e.g. 'Hey Mycroft'
@@ -274,12 +316,17 @@ class RecognizerLoop(EventEmitter):
 
         self.state.running = True
         queue = Queue()
+        stt = STTFactory.create()
+        stream = None
+        if self.config_core.get("stt", {}).get("streaming") and \
+                isinstance(stt, StreamingSTT):
+            stream = stt
         self.producer = AudioProducer(self.state, queue, self.microphone,
-                                      self.responsive_recognizer, self)
+                                      self.responsive_recognizer, self,
+                                      stream)
         self.producer.start()
 
-        self.consumer = AudioConsumer(self.state, queue, self,
-                                      STTFactory.create(),
+        self.consumer = AudioConsumer(self.state, queue, self, stt,
                                       self.wakeup_recognizer,
                                       self.wakeword_recognizer)
         self.consumer.start()
@@ -335,8 +382,8 @@ class RecognizerLoop(EventEmitter):
         while self.state.running:
             try:
                 time.sleep(1)
-                if self._config_hash != hash(str(ConfigurationManager()
-                                                         .get())):
+                if self._config_version != ConfigurationManager.version(
+                        *self.CONFIG_SECTIONS):
                     LOG.debug('Config has changed, reloading...')
                     self.reload()
             except KeyboardInterrupt as e:
@@ -62,6 +62,14 @@ def handle_hotword(event):
     ws.emit(Message('recognizer_loop:hotword', event))
 
 
+def handle_partial_utterance(event):
+    ws.emit(Message('recognizer_loop:partial_utterance', event))
+
+
+def handle_mic_level(event):
+    ws.emit(Message('recognizer_loop:mic_level', event))
+
+
 def handle_external_audio(event):
     logger.info("External audio STT request: " + event.data["wave_file"])
     loop.emit(Message('recognizer_loop:external_audio', event.data))
@@ -158,7 +166,7 @@ def main():
     global loop
     global config
     lock = PIDLock("voice")
-    ws = WebsocketClient()
+    ws = WebsocketClient(filtered=True)
     config = ConfigurationManager.get()
     ConfigurationManager.init(ws)
     loop = RecognizerLoop()
@@ -167,6 +175,8 @@ def main():
     loop.on('recognizer_loop:record_begin', handle_record_begin)
     loop.on('recognizer_loop:wakeword', handle_wakeword)
     loop.on('recognizer_loop:hotword', handle_hotword)
+    loop.on('recognizer_loop:mic_level', handle_mic_level)
+    loop.on('recognizer_loop:partial_utterance', handle_partial_utterance)
     loop.on('recognizer_loop:speak', handle_speak)
     loop.on('recognizer_loop:record_end', handle_record_end)
     loop.on('recognizer_loop:no_internet', handle_no_internet)
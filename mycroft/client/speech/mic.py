@@ -18,6 +18,7 @@
 
 import collections
 import datetime
+from multiprocessing.pool import ThreadPool
 from tempfile import gettempdir
 from threading import Thread, Lock
 
@@ -36,6 +37,7 @@ from speech_recognition import (
     AudioData
 )
 
+from mycroft.client.speech.mic_level import MicLevelWriter
 from mycroft.configuration import ConfigurationManager
 from mycroft.session import SessionManager
 from mycroft.util import (
@@ -139,6 +141,76 @@ class MutableMicrophone(Microphone):
         return self.muted
 
 
+class StreamedAudioData(AudioData):
+    """
+    Recorded utterance transcribed by a streaming STT engine
+
+    Args:
+        transcription (Future): result of the engine, resolved by the
+                                consumer of the audio
+    """
+
+    def __init__(self, frame_data, sample_rate, sample_width, transcription):
+        AudioData.__init__(self, frame_data, sample_rate, sample_width)
+        self.transcription = transcription
+
+
+class RingBuffer(object):
+    """
+    Fixed size byte buffer keeping the most recently appended audio.
+
+    Appending copies only the new bytes. Every write is mirrored in a
+    second half of the storage, so the most recent bytes are always
+    contiguous and get_last can return them without copying.
+
+    Args:
+        size (int): number of bytes kept
+    """
+
+    def __init__(self, size):
+        self.size = int(size)
+        self.data = bytearray(2 * self.size)
+        self.view = memoryview(self.data)
+        # position of the next write in [0, size)
+        self.end = 0
+        self.length = 0
+
+    def _write(self, position, chunk):
+        self.data[position:position + len(chunk)] = chunk
+        position += self.size
+        self.data[position:position + len(chunk)] = chunk
+
+    def append(self, chunk):
+        chunk = memoryview(chunk)
+        if len(chunk) >= self.size:
+            self._write(0, chunk[len(chunk) - self.size:])
+            self.end = 0
+            self.length = self.size
+            return
+        first = min(len(chunk), self.size - self.end)
+        self._write(self.end, chunk[:first])
+        if first < len(chunk):
+            self._write(0, chunk[first:])
+        self.end = (self.end + len(chunk)) % self.size
+        self.length = min(self.length + len(chunk), self.size)
+
+    def get_last(self, size):
+        """
+        Get the most recent bytes
+
+        Args:
+            size (int): number of bytes, at most the buffered length
+        Returns:
+            memoryview: the bytes, valid until the next append
+        """
+        size = min(int(size), self.length)
+        stop = self.end + self.size
+        return self.view[stop - size:stop]
+
+    def __len__(self):
+        return self.length
+
+
 class ResponsiveRecognizer(speech_recognition.Recognizer):
     # Padding of silence when feeding to pocketsphinx
     SILENCE_SEC = 0.01
@@ -195,8 +267,34 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         self.upload_lock = Lock()
         self.filenames_to_upload = []
         self.mic_level_file = os.path.join(get_ipc_directory(), "mic_level")
+        self.mic_level = MicLevelWriter(self.mic_level_file)
+        # seconds between mic level messages, 0 to disable them
+        self.mic_level_interval = listener_config.get('mic_level_interval', 0)
+        self.last_mic_level_emit = 0
         self._stop_signaled = False
         self.hot_word_engines = hot_word_engines
+        # streaming STT engine of the phrase being recorded
+        self.stream = None
+        self.last_partial = None
+        # run different hotword engines concurrently on this many threads
+        hotword_threads = listener_config.get('hotword_threads', 0)
+        self.hotword_pool = ThreadPool(hotword_threads) \
+            if hotword_threads > 1 else None
+
+    def _update_mic_level(self, energy, emitter=None):
+        """
+        Publish the energy of the last chunk in the mic level block, and on
+        the bus at most every mic_level_interval seconds
+        """
+        self.mic_level.update(energy, self.energy_threshold)
+        if emitter and self.mic_level_interval and \
+                self.mic_level.updated - self.last_mic_level_emit >= \
+                self.mic_level_interval:
+            self.last_mic_level_emit = self.mic_level.updated
+            emitter.emit("recognizer_loop:mic_level", {
+                "energy": energy,
+                "threshold": self.energy_threshold
+            })
 
     @staticmethod
     def record_sound_chunk(source):
@@ -206,7 +304,7 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
     def calc_energy(sound_chunk, sample_width):
         return audioop.rms(sound_chunk, sample_width)
 
-    def _record_phrase(self, source, sec_per_buffer):
+    def _record_phrase(self, source, sec_per_buffer, emitter=None):
         """Record an entire spoken phrase.
 
         Essentially, this code waits for a period of silence and then returns
@@ -216,6 +314,7 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         Args:
             source (AudioSource):  Source producing the audio chunks
             sec_per_buffer (float):  Fractional number of seconds in each chunk
+            emitter (EventEmitter): Emitter for mic level notifications
 
         Returns:
             bytearray: complete audio buffer recorded, including any
@@ -251,14 +350,16 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         max_chunks_of_silence = int(self.RECORDING_TIMEOUT_WITH_SILENCE /
                                     sec_per_buffer)
 
-        # bytearray to store audio in
-        byte_data = '\0' * source.SAMPLE_WIDTH
+        # audio chunks, joined once the phrase is complete
+        chunks = ['\0' * source.SAMPLE_WIDTH]
 
         phrase_complete = False
         while num_chunks < max_chunks and not phrase_complete:
             chunk = self.record_sound_chunk(source)
-            byte_data += chunk
+            chunks.append(chunk)
             num_chunks += 1
+            if self.stream is not None:
+                self._stream_data(chunk, emitter)
 
             energy = self.calc_energy(chunk, source.SAMPLE_WIDTH)
             test_threshold = self.energy_threshold * self.multiplier
@@ -270,11 +371,7 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
                 noise = decrease_noise(noise)
                 self._adjust_threshold(energy, sec_per_buffer)
 
-            if num_chunks % 10 == 0:
-                with open(self.mic_level_file, 'w') as f:
-                    f.write("Energy:  cur=" + str(energy) + " thresh=" +
-                            str(self.energy_threshold))
-                f.close()
+            self._update_mic_level(energy, emitter)
 
             was_loud_enough = num_loud_chunks > min_loud_chunks
 
@@ -293,7 +390,54 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
             if check_for_signal('buttonPress'):
                 phrase_complete = True
 
-        return byte_data
+        return b''.join(chunks)
+
+    def _stream_start(self, stream, source):
+        """ Start transcribing the phrase while it is recorded """
+        self.stream = None
+        self.last_partial = None
+        if stream is None:
+            return
+        try:
+            stream.stream_start(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            self.stream = stream
+        except Exception as e:
+            logger.error("Could not start STT stream: " + repr(e))
+
+    def _stream_data(self, chunk, emitter=None):
+        """ Feed a chunk to the STT stream and emit new partial results """
+        try:
+            partial = self.stream.stream_data(chunk)
+        except Exception as e:
+            # the complete recording will be transcribed instead
+            logger.error("STT stream failed: " + repr(e))
+            self._stream_abort()
+            return
+        if partial and partial != self.last_partial:
+            self.last_partial = partial
+            if emitter:
+                emitter.emit("recognizer_loop:partial_utterance",
+                             {"utterance": partial})
+
+    def _stream_abort(self):
+        """ End a failed STT stream, its transcription is not used """
+        stream, self.stream = self.stream, None
+        try:
+            stream.stream_stop()
+        except Exception as e:
+            logger.error("Could not stop STT stream: " + repr(e))
+
+    def _stream_stop(self, audio_data):
+        """ Attach the result of the STT stream to the recorded audio """
+        stream, self.stream = self.stream, None
+        try:
+            transcription = stream.stream_stop()
+        except Exception as e:
+            logger.error("STT stream failed: " + repr(e))
+            return audio_data
+        return StreamedAudioData(audio_data.frame_data,
+                                 audio_data.sample_rate,
+                                 audio_data.sample_width, transcription)
 
     @staticmethod
     def sec_to_bytes(sec, source):
@@ -367,16 +511,17 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
 
         silence = '\0' * num_silent_bytes
 
-        # bytearray to store audio in
-        byte_data = silence
-
         buffers_per_check = self.SEC_BETWEEN_WW_CHECKS / sec_per_buffer
         buffers_since_check = 0.0
 
-        # Max bytes for byte_data before audio is removed from the front
+        # Max bytes kept before audio is removed from the front
         max_size = self.sec_to_bytes(self.SAVED_WW_SEC, source)
         test_size = self.sec_to_bytes(self.TEST_WW_SEC, source)
 
+        # ring buffer to store audio in
+        byte_data = RingBuffer(max_size)
+        byte_data.append(silence)
+
         said_wake_word = False
 
         # Rolling buffer to track the audio energy (loudness) heard on
@@ -387,7 +532,6 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         avg_energy = 0.0
         energy_avg_samples = int(5 / sec_per_buffer)  # avg over last 5 secs
 
-        counter = 0
         while not said_wake_word and not self._stop_signaled:
             if self._skip_wake_word():
                 break
@@ -414,31 +558,22 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
                         # bump the threshold to just above this value
                         self.energy_threshold = energy * 1.2
 
-            # Periodically output energy level stats.  This can be used to
-            # visualize the microphone input, e.g. a needle on a meter.
-            if counter % 3:
-                with open(self.mic_level_file, 'w') as f:
-                    f.write("Energy:  cur=" + str(energy) + " thresh=" +
-                            str(self.energy_threshold))
-                f.close()
-            counter += 1
+            # Output energy level stats.  This can be used to visualize
+            # the microphone input, e.g. a needle on a meter.
+            self._update_mic_level(energy, emitter)
 
             # At first, the buffer is empty and must fill up.  After that
-            # just drop the first chunk bytes to keep it the same size.
-            needs_to_grow = len(byte_data) < max_size
-            if needs_to_grow:
-                byte_data += chunk
-            else:  # Remove beginning of audio and add new chunk to end
-                byte_data = byte_data[len(chunk):] + chunk
+            # the oldest audio is overwritten to keep it the same size.
+            byte_data.append(chunk)
 
             buffers_since_check += 1.0
             if buffers_since_check > buffers_per_check:
                 buffers_since_check -= buffers_per_check
-                chopped = byte_data[-test_size:] \
-                    if test_size < len(byte_data) else byte_data
-                audio_data = chopped + silence
+                chopped = byte_data.get_last(test_size)
+                audio_data = chopped.tobytes() + silence
                 said_wake_word = \
                     self.wake_word_recognizer.found_wake_word(audio_data)
+                self.mic_level.wake_word_checked(said_wake_word)
                 # if a wake word is success full then record audio in temp
                 # file.
                 if self.save_wake_words and said_wake_word:
@@ -482,13 +617,38 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
                         if file:
                             play_wav(file)
 
+    def find_hotwords(self, audio_data):
+        """
+        Run every hotword engine once on audio_data, engines shared by
+        several hotwords (pocketsphinx keyphrase lists) are run once for
+        all of them, on the hotword thread pool if enabled.
+
+        Returns:
+            set: lower case key phrases heard
+        """
+        engines = []
+        for hotword in self.hot_word_engines:
+            engine = self.hot_word_engines[hotword][0]
+            if engine not in engines:
+                engines.append(engine)
+        if self.hotword_pool and len(engines) > 1:
+            results = self.hotword_pool.map(
+                lambda engine: engine.found_wake_words(audio_data), engines)
+        else:
+            results = [engine.found_wake_words(audio_data)
+                       for engine in engines]
+        found = set()
+        for key_phrases in results:
+            found.update(key_phrases)
+        return found
+
     def check_for_hotwords(self, audio_data, emitter):
         # check hot word
+        found_hotwords = self.find_hotwords(audio_data)
         for hotword in self.hot_word_engines:
             engine, ding, utterance, listen, type = self.hot_word_engines[
                 hotword]
-            found = engine.found_wake_word(audio_data)
-            if found:
+            if hotword.lower() in found_hotwords:
                 logger.debug("Hot Word: " + hotword)
                 # If enabled, play a wave file with a short sound to audibly
                 # indicate hotword was detected.
@@ -527,7 +687,7 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         """
         return AudioData(raw_data, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
 
-    def listen(self, source, emitter):
+    def listen(self, source, emitter, stream=None):
         """Listens for chunks of audio that Mycroft should perform STT on.
 
         This will listen continuously for a wake-up-word, then return the
@@ -538,9 +698,12 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
             source (AudioSource):  Source producing the audio chunks
             emitter (EventEmitter): Emitter for notifications of when recording
                                     begins and ends.
+            stream (StreamingSTT): engine transcribing the utterance while
+                                   it is recorded
 
         Returns:
-            AudioData: audio with the user's utterance, minus the wake-up-word
+            AudioData: audio with the user's utterance, minus the wake-up-word,
+                       a StreamedAudioData if it was transcribed by stream
         """
 
         assert isinstance(source, AudioSource), "Source must be an AudioSource"
@@ -564,9 +727,12 @@ class ResponsiveRecognizer(speech_recognition.Recognizer):
         logger.debug("Recording...")
         emitter.emit("recognizer_loop:record_begin")
 
-        frame_data = self._record_phrase(source, sec_per_buffer)
+        self._stream_start(stream, source)
+        frame_data = self._record_phrase(source, sec_per_buffer, emitter)
         audio_data = self._create_audio_data(frame_data, source)
         emitter.emit("recognizer_loop:record_end")
+        if self.stream is not None:
+            audio_data = self._stream_stop(audio_data)
         logger.debug("Thinking...")
         if self.save_utterances:
             logger.info("Recording utterance")
@@ -0,0 +1,155 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+"""
+Microphone level telemetry shared between processes.
+
+The speech client updates a small memory mapped file in the IPC directory
+for every audio chunk, other processes (e.g. the text client) map the same
+file and read it without any syscall per update.
+
+Layout (little endian):
+    magic (4s), sequence (I),
+    energy (d), threshold (d), updated (d),
+    wake_word_checks (I), wake_words (I), last_wake_word (d)
+
+The sequence is odd while the writer updates the block, readers retry
+until they get an even sequence that did not change during the read.
+"""
+import mmap
+import struct
+from time import time
+
+import os
+
+__author__ = 'jarbas'
+
+MAGIC = "MLV1"
+HEADER = struct.Struct("<4sI")
+DATA = struct.Struct("<dddIId")
+SIZE = HEADER.size + DATA.size
+FIELDS = ("energy", "threshold", "updated", "wake_word_checks",
+          "wake_words", "last_wake_word")
+
+
+class MicLevelWriter(object):
+    """
+    Writer of the microphone level block, used by the speech client
+
+    Args:
+        filename (str): path of the mic level file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        fd = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, SIZE)
+            self.map = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+        self.sequence = 0
+        self.energy = 0.0
+        self.threshold = 0.0
+        self.updated = 0.0
+        self.wake_word_checks = 0
+        self.wake_words = 0
+        self.last_wake_word = 0.0
+        self.write()
+
+    def write(self):
+        # odd sequence while the data is inconsistent
+        self.sequence = (self.sequence + 1) % 2 ** 32
+        HEADER.pack_into(self.map, 0, MAGIC, self.sequence)
+        DATA.pack_into(self.map, HEADER.size, self.energy, self.threshold,
+                       self.updated, self.wake_word_checks, self.wake_words,
+                       self.last_wake_word)
+        self.sequence = (self.sequence + 1) % 2 ** 32
+        HEADER.pack_into(self.map, 0, MAGIC, self.sequence)
+
+    def update(self, energy, threshold):
+        """ Set the energy of the last audio chunk and the threshold """
+        self.energy = float(energy)
+        self.threshold = float(threshold)
+        self.updated = time()
+        self.write()
+
+    def wake_word_checked(self, found):
+        """ Count a wake word check and whether it found the wake word """
+        self.wake_word_checks = (self.wake_word_checks + 1) % 2 ** 32
+        if found:
+            self.wake_words = (self.wake_words + 1) % 2 ** 32
+            self.last_wake_word = time()
+        self.write()
+
+    def close(self):
+        self.map.close()
+
+
+class MicLevelReader(object):
+    """
+    Reader of the microphone level block, the file is mapped once it has
+    been created by the speech client
+
+    Args:
+        filename (str): path of the mic level file
+    """
+    RETRIES = 10
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.map = None
+
+    def open(self):
+        try:
+            fd = os.open(self.filename, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            if os.fstat(fd).st_size < SIZE:
+                return False
+            self.map = mmap.mmap(fd, SIZE, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        return True
+
+    def read(self):
+        """
+        Read the microphone levels
+
+        Returns:
+            dict: sequence, energy, threshold, updated, wake_word_checks,
+                  wake_words and last_wake_word, None if not available
+        """
+        if self.map is None and not self.open():
+            return None
+        for _ in range(self.RETRIES):
+            magic, sequence = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC:
+                return None
+            if sequence % 2:
+                continue
+            data = DATA.unpack_from(self.map, HEADER.size)
+            if HEADER.unpack_from(self.map, 0)[1] == sequence:
+                levels = dict(zip(FIELDS, data))
+                levels["sequence"] = sequence
+                return levels
+        return None
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
@@ -34,6 +34,7 @@ import curses.ascii                                         # nopep8
 import textwrap                                             # nopep8
 import json                                                 # nopep8
 from threading import Thread, Lock                          # nopep8
+from mycroft.client.speech.mic_level import MicLevelReader  # nopep8
 from mycroft.messagebus.client.ws import WebsocketClient    # nopep8
 from mycroft.messagebus.message import Message              # nopep8
 from mycroft.util import get_ipc_directory                  # nopep8
@@ -200,45 +201,30 @@ def start_log_monitor(filename):
 class MicMonitorThread(Thread):
     def __init__(self, filename):
         Thread.__init__(self)
-        self.filename = filename
-        self.st_results = os.stat(filename)
+        self.reader = MicLevelReader(filename)
+        self.sequence = None
 
     def run(self):
+        global meter_cur
+        global meter_thresh
+
         while True:
             try:
-                st_results = os.stat(self.filename)
-
-                if (not st_results.st_ctime == self.st_results.st_ctime or
-                        not st_results.st_mtime == self.st_results.st_mtime):
-                    self.read_file_from(0)
-                    self.st_results = st_results
+                levels = self.reader.read()
+                if levels and levels["sequence"] != self.sequence:
+                    # Just adjust meter settings
+                    self.sequence = levels["sequence"]
+                    meter_cur = levels["energy"]
+                    meter_thresh = levels["threshold"]
                     draw_screen()
             finally:
                 time.sleep(0.1)
 
-    def read_file_from(self, bytefrom):
-        global meter_cur
-        global meter_thresh
-
-        with open(self.filename, 'rb') as fh:
-            fh.seek(bytefrom)
-            while True:
-                line = fh.readline()
-                if line == "":
-                    break
-
-                # Just adjust meter settings
-                # Ex:Energy:  cur=4 thresh=1.5
-                parts = line.split("=")
-                meter_thresh = float(parts[len(parts) - 1])
-                meter_cur = float(parts[len(parts) - 2].split(" ")[0])
-
 
 def start_mic_monitor(filename):
-    if os.path.isfile(filename):
-        thread = MicMonitorThread(filename)
-        thread.setDaemon(True)  # this thread won't prevent prog from exiting
-        thread.start()
+    thread = MicMonitorThread(filename)
+    thread.setDaemon(True)  # this thread won't prevent prog from exiting
+    thread.start()
 
 
 def add_log_message(message):
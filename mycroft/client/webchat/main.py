@@ -164,6 +164,7 @@ def main():
             print "key created at: " + key
             print "crt created at: " + cert
             # update config with new keys
+            config = dict(config)
             config["cert_file"] = cert
             config["key_file"] = key
             config["ssl"] = use_ssl
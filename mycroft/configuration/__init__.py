@@ -16,6 +16,7 @@
 # along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
 
 import json
+from threading import RLock
 
 import inflection
 import re
@@ -39,6 +40,65 @@ load_order = [DEFAULT_CONFIG, REMOTE_CONFIG, SYSTEM_CONFIG, USER_CONFIG,
               RUNTIME_CONFIG]
 
 
+class ConfigSnapshot(dict):
+    """
+    Read only dictionary holding a configuration snapshot.
+
+    Snapshots are never modified, a reload builds a new one. Copies
+    (copy.copy / copy.deepcopy) are regular mutable dictionaries.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Configuration snapshots are read only, "
+                        "use ConfigurationManager.update")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return ConfigSnapshot, (dict(self),)
+
+
+def freeze(config):
+    """ Recursively convert dictionaries into ConfigSnapshots """
+    if isinstance(config, dict):
+        return ConfigSnapshot((k, freeze(v)) for k, v in config.iteritems())
+    if isinstance(config, list):
+        return [freeze(v) for v in config]
+    return config
+
+
+def thaw(config):
+    """ Recursively copy a configuration into mutable dictionaries """
+    if isinstance(config, dict):
+        return dict((k, thaw(v)) for k, v in config.iteritems())
+    if isinstance(config, list):
+        return [thaw(v) for v in config]
+    return config
+
+
+def diff_sections(old, new):
+    """
+    Top level sections whose value differs between two configurations
+
+    Args:
+        old (dict): previous configuration
+        new (dict): new configuration
+    Returns:
+        set: names of the added, removed and changed sections
+    """
+    old = old or {}
+    new = new or {}
+    return set(k for k in set(old) | set(new)
+               if k not in old or k not in new or old[k] != new[k])
+
+
 class ConfigurationLoader(object):
     """
     A utility for loading Mycroft configuration files.
@@ -224,10 +284,20 @@ class ConfigurationManager(object):
     Static management utility for accessing the cached configuration.
     This configuration is periodically updated from the remote server
     to keep in sync.
+
+    The cached configuration is a read only ConfigSnapshot, every change
+    publishes a new snapshot and increments the version. Each top level
+    section remembers the version it last changed in, so consumers can
+    compare an integer or subscribe to the sections they depend on
+    instead of comparing whole configurations.
     """
 
     __config = None
     __listener = None
+    __version = 0
+    __section_versions = {}
+    __subscribers = {}
+    __lock = RLock()
 
     @staticmethod
     def instance():
@@ -242,23 +312,26 @@ class ConfigurationManager(object):
     @staticmethod
     def init(ws):
         # Start listening for configuration update events on the messagebus
-        ConfigurationManager.__listener = _ConfigurationListener(ws)
+        listener = ConfigurationManager.__listener
+        if listener is None or listener.ws is not ws:
+            ConfigurationManager.__listener = _ConfigurationListener(ws)
 
     @staticmethod
     def load_defaults():
+        config = thaw(ConfigurationManager.__config)
         for location in load_order:
             LOG.info("Loading configuration: " + location)
             if location == REMOTE_CONFIG:
-                RemoteConfiguration.load(ConfigurationManager.__config)
+                RemoteConfiguration.load(config)
             else:
-                ConfigurationManager.__config = ConfigurationLoader.load(
-                    ConfigurationManager.__config, [location])
-        return ConfigurationManager.__config
+                config = ConfigurationLoader.load(config, [location])
+        return ConfigurationManager.publish(config)
 
     @staticmethod
     def load_local(locations=None, keep_user_config=True):
-        return ConfigurationLoader.load(ConfigurationManager.get(), locations,
-                                        keep_user_config)
+        config = ConfigurationLoader.load(thaw(ConfigurationManager.get()),
+                                          locations, keep_user_config)
+        return ConfigurationManager.publish(config)
 
     @staticmethod
     def load_internal(config):
@@ -267,9 +340,10 @@ class ConfigurationManager(object):
 
     @staticmethod
     def load_remote():
-        if not ConfigurationManager.__config:
-            ConfigurationManager.__config = ConfigurationLoader.load()
-        return RemoteConfiguration.load(ConfigurationManager.__config)
+        config = thaw(ConfigurationManager.__config)
+        if not config:
+            config = ConfigurationLoader.load()
+        return ConfigurationManager.publish(RemoteConfiguration.load(config))
 
     @staticmethod
     def get(locations=None):
@@ -277,7 +351,8 @@ class ConfigurationManager(object):
         Get cached configuration.
 
         Returns:
-            dict: A dictionary representing the Mycroft configuration
+            ConfigSnapshot: A read only dictionary representing the Mycroft
+                            configuration
         """
         if not ConfigurationManager.__config:
             ConfigurationManager.load_defaults()
@@ -287,6 +362,81 @@ class ConfigurationManager(object):
 
         return ConfigurationManager.__config
 
+    @staticmethod
+    def version(*sections):
+        """
+        Version of the configuration, or of the given sections
+
+        Args:
+            sections (str): top level sections, e.g. "tts"
+        Returns:
+            int: the current configuration version without sections,
+                 otherwise the last version any of the sections changed in
+        """
+        if not sections:
+            return ConfigurationManager.__version
+        versions = ConfigurationManager.__section_versions
+        return max(versions.get(section, 0) for section in sections)
+
+    @staticmethod
+    def subscribe(section, callback):
+        """
+        Call ``callback(config)`` with the new snapshot whenever the top
+        level ``section`` changes. A callback subscribed to several
+        sections is called once per change.
+        """
+        with ConfigurationManager.__lock:
+            callbacks = ConfigurationManager.__subscribers.setdefault(
+                section, [])
+            if callback not in callbacks:
+                callbacks.append(callback)
+
+    @staticmethod
+    def unsubscribe(section, callback):
+        with ConfigurationManager.__lock:
+            callbacks = ConfigurationManager.__subscribers.get(section, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    @staticmethod
+    def publish(config):
+        """
+        Replace the cached configuration with a snapshot of ``config``
+
+        The version only increases if a section changed, subscribers of
+        the changed sections are notified.
+
+        Returns:
+            ConfigSnapshot: the cached configuration
+        """
+        with ConfigurationManager.__lock:
+            old = ConfigurationManager.__config
+            changed = diff_sections(old, config)
+            if old is not None and not changed:
+                return old
+            snapshot = freeze(config)
+            ConfigurationManager.__version += 1
+            version = ConfigurationManager.__version
+            for section in changed:
+                ConfigurationManager.__section_versions[section] = version
+            ConfigurationManager.__config = snapshot
+            callbacks = []
+            for section in changed:
+                for callback in ConfigurationManager.__subscribers.get(
+                        section, []):
+                    if callback not in callbacks:
+                        callbacks.append(callback)
+
+        if old is not None:
+            LOG.debug("Configuration version %d, changed: %s" %
+                      (version, ", ".join(sorted(changed))))
+        for callback in callbacks:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                LOG.exception(e)
+        return snapshot
+
     @staticmethod
     def update(config):
         """
@@ -296,7 +446,9 @@ class ConfigurationManager(object):
             ConfigurationManager.load_defaults()
 
         if config:
-            ConfigurationManager.__config.update(config)
+            new_config = thaw(ConfigurationManager.__config)
+            new_config.update(config)
+            ConfigurationManager.publish(new_config)
 
     @staticmethod
     def save(config, is_system=False):
@@ -336,6 +488,7 @@ class _ConfigurationListener(object):
 
     def __init__(self, ws):
         super(_ConfigurationListener, self).__init__()
+        self.ws = ws
         ws.on("configuration.updated", self.updated)
         ws.on("configuration.patch", self.patch)
 
@@ -343,7 +496,8 @@ class _ConfigurationListener(object):
     def updated(message):
         """
             Event handler for configuration updated events. Forces a reload
-            of all configuration sources.
+            of all configuration sources, only subscribers of the sections
+            that changed are notified.
 
             Args:
                 message:    message bus message structure
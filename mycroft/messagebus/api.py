@@ -1,5 +1,4 @@
 from mycroft.messagebus.message import Message
-import time
 
 __author__ = "jarbas"
 
@@ -8,37 +7,28 @@ class BusQuery():
     def __init__(self, emitter, message_type, message_data=None,
                  message_context=None):
         self.emitter = emitter
-        self.waiting = False
         self.response = Message(None, None, None)
+        self.response_types = []
         self.query_type = message_type
         self.query_data = message_data
         self.query_context = message_context
 
-    def _end_wait(self, message):
-        self.response = message
-        self.waiting = False
-
-    def _wait_response(self, timeout):
-        start = time.time()
-        elapsed = 0
-        self.waiting = True
-        while self.waiting and elapsed < timeout:
-            elapsed = time.time() - start
-            time.sleep(0.1)
-        self.waiting = False
-
     def send(self, response_type=None, timeout=10):
         self.response = Message(None, None, None)
         if response_type is None:
             response_type = self.query_type + ".reply"
         self.add_response_type(response_type)
-        self.emitter.emit(
-            Message(self.query_type, self.query_data, self.query_context))
-        self._wait_response(timeout)
+        response = self.emitter.wait_for_response(
+            Message(self.query_type, self.query_data, self.query_context),
+            self.response_types, timeout)
+        self.response_types = []
+        if response is not None:
+            self.response = response
         return self.response.data
 
     def add_response_type(self, response_type):
-        self.emitter.once(response_type, self._end_wait)
+        if response_type not in self.response_types:
+            self.response_types.append(response_type)
 
     def get_response_type(self):
         return self.response.type
@@ -72,5 +62,10 @@ class BusResponder():
             self.response_context = context
 
     def respond(self, message):
+        context = dict(self.response_context or {})
+        # let the querying client match this response to its request
+        request_id = (message.context or {}).get("request_id")
+        if request_id is not None:
+            context["request_id"] = request_id
         self.emitter.emit(Message(self.response_type, self.response_data,
-                                  self.response_context))
+                                  context))
@@ -16,12 +16,16 @@
 # along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
 import json
 import time
+from concurrent.futures import Future, TimeoutError
 from multiprocessing.pool import ThreadPool
+from threading import Lock
+from uuid import uuid4
 
 from pyee import EventEmitter
-from websocket import WebSocketApp
+from websocket import WebSocketApp, ABNF
 
 from mycroft.configuration import ConfigurationManager
+from mycroft.messagebus.codec import JSON_CODEC, get_codec
 from mycroft.messagebus.message import Message
 from mycroft.util import validate_param
 from mycroft.util.log import LOG
@@ -30,7 +34,27 @@ __author__ = 'seanfitz', 'jdorleans'
 
 
 class WebsocketClient(object):
-    def __init__(self, host=None, port=None, route=None, ssl=None):
+    """
+    Client for the mycroft messagebus
+
+    A filtered client only receives the message types it has handlers
+    for; every call to on/once subscribes to that message type on the
+    messagebus service. Unfiltered clients receive every message.
+
+    Args:
+        host (str): messagebus host, defaults to config
+        port (int): messagebus port, defaults to config
+        route (str): messagebus route, defaults to config
+        ssl (bool): use wss, defaults to config
+        filtered (bool): only receive subscribed message types
+        codec (str): wire format to request from the messagebus service,
+                     defaults to config, json is used if not supported
+    """
+    # events emitted locally by the client, never sent over the bus
+    LOCAL_EVENTS = ["open", "close", "error", "message"]
+
+    def __init__(self, host=None, port=None, route=None, ssl=None,
+                 filtered=False, codec=None):
 
         config = ConfigurationManager.get().get("websocket")
         host = host or config.get("host")
@@ -41,15 +65,27 @@ class WebsocketClient(object):
         validate_param(port, "websocket.port")
         validate_param(route, "websocket.route")
 
+        self.preferred_codec = get_codec(codec or config.get("codec"))
+        # json until the messagebus service accepts preferred_codec
+        self.codec = JSON_CODEC
         self.build_url(host, port, route, ssl)
         self.emitter = EventEmitter()
         self.client = self.create_client()
         self.pool = ThreadPool(10)
         self.retry = 5
+        self.filtered = filtered
+        self.subscriptions = set()
+        # request_id -> (Future, reply types) of in-flight requests
+        self.requests = {}
+        # reply type -> request ids waiting for it, oldest first
+        self.reply_waiters = {}
+        self.requests_lock = Lock()
 
     def build_url(self, host, port, route, ssl):
         scheme = "wss" if ssl else "ws"
         self.url = scheme + "://" + host + ":" + str(port) + route
+        if self.preferred_codec is not JSON_CODEC:
+            self.url += "?codec=" + self.preferred_codec.name
 
     def create_client(self):
         return WebSocketApp(self.url,
@@ -58,6 +94,11 @@ class WebsocketClient(object):
 
     def on_open(self, ws):
         LOG.info("Connected")
+        self.codec = JSON_CODEC
+        if self.subscriptions:
+            # (re)send subscriptions before anything else goes out
+            self.emit(Message("bus.subscribe",
+                              {"types": list(self.subscriptions)}))
         self.emitter.emit("open")
         # Restore reconnect timer to 5 seconds on sucessful connect
         self.retry = 5
@@ -78,8 +119,16 @@ class WebsocketClient(object):
         self.run_forever()
 
     def on_message(self, ws, message):
-        self.emitter.emit('message', message)
-        parsed_message = Message.deserialize(message)
+        parsed_message = self.codec.decode(message)
+        if parsed_message.type == "connected":
+            # first message of every connection, always json
+            data = parsed_message.data or {}
+            self.codec = get_codec(data.get("codec"))
+        if self.codec is JSON_CODEC:
+            self.emitter.emit('message', message)
+        elif self.emitter.listeners('message'):
+            # 'message' listeners always get the json string
+            self.emitter.emit('message', parsed_message.serialize())
         self.pool.apply_async(
             self.emitter.emit, (parsed_message.type, parsed_message))
 
@@ -88,18 +137,76 @@ class WebsocketClient(object):
                 not self.client.sock.connected):
             return
         if hasattr(message, 'serialize'):
-            self.client.send(message.serialize())
+            if self.codec.binary:
+                self.client.send(self.codec.encode(message),
+                                 ABNF.OPCODE_BINARY)
+            else:
+                self.client.send(self.codec.encode(message))
         else:
             self.client.send(json.dumps(message.__dict__))
 
+    def subscribe(self, *message_types):
+        """
+            Ask the messagebus service to deliver message_types to this
+            client. Types ending in "*" are prefixes, "*" is everything.
+            The first subscription stops delivery of all other messages.
+
+            Args:
+                message_types: message types to receive
+        """
+        message_types = [t for t in message_types
+                         if t not in self.subscriptions]
+        if not message_types:
+            return
+        self.subscriptions.update(message_types)
+        self.emit(Message("bus.subscribe", {"types": message_types}))
+
+    def unsubscribe(self, *message_types):
+        """
+            Stop receiving message_types from the messagebus service
+
+            Args:
+                message_types: message types no longer needed
+        """
+        message_types = [t for t in message_types
+                         if t in self.subscriptions]
+        if not message_types:
+            return
+        self.subscriptions.difference_update(message_types)
+        self.emit(Message("bus.unsubscribe", {"types": message_types}))
+
+    def _subscribe_event(self, event_name):
+        if self.filtered and event_name not in self.LOCAL_EVENTS:
+            self.subscribe(event_name)
+
+    def _unsubscribe_event(self, event_name):
+        if (self.filtered and event_name not in self.LOCAL_EVENTS and
+                not self.emitter.listeners(event_name)):
+            self.unsubscribe(event_name)
+
     def on(self, event_name, func):
+        self._subscribe_event(event_name)
         self.emitter.on(event_name, func)
 
     def once(self, event_name, func):
-        self.emitter.once(event_name, func)
+        self._subscribe_event(event_name)
+
+        def handler(*args, **kwargs):
+            try:
+                # handlers run on the pool, only the first call fires
+                self.emitter.remove_listener(event_name, handler)
+            except ValueError:
+                return
+            try:
+                func(*args, **kwargs)
+            finally:
+                self._unsubscribe_event(event_name)
+
+        self.emitter.on(event_name, handler)
 
     def remove(self, event_name, func):
         self.emitter.remove_listener(event_name, func)
+        self._unsubscribe_event(event_name)
 
     def remove_all_listeners(self, event_name):
         '''
@@ -111,6 +218,104 @@ class WebsocketClient(object):
         if event_name is None:
             raise ValueError
         self.emitter.remove_all_listeners(event_name)
+        self._unsubscribe_event(event_name)
+
+    def send_request(self, message, reply_types=None):
+        """
+            Emit message and return a Future completed by its reply
+
+            A unique "request_id" is placed in the message context, a reply
+            carrying the same id completes the Future. Replies without a
+            request_id complete the oldest request waiting for that type.
+
+            Args:
+                message (Message): request to send
+                reply_types (str or list): reply message type(s), defaults
+                                           to message.type + ".reply"
+
+            Returns:
+                Future: result() is the reply Message
+        """
+        if reply_types is None:
+            reply_types = [message.type + ".reply"]
+        elif isinstance(reply_types, basestring):
+            reply_types = [reply_types]
+        request_id = str(uuid4())
+        message.context = dict(message.context or {})
+        message.context["request_id"] = request_id
+        future = Future()
+        future.request_id = request_id
+        # cancelling the future stops waiting for the reply
+        future.add_done_callback(self._request_done)
+        with self.requests_lock:
+            self.requests[request_id] = (future, reply_types)
+            for reply_type in reply_types:
+                waiters = self.reply_waiters.setdefault(reply_type, [])
+                if not waiters:
+                    self.on(reply_type, self._handle_reply)
+                waiters.append(request_id)
+        self.emit(message)
+        return future
+
+    def wait_for_response(self, message, reply_types=None, timeout=10):
+        """
+            Emit message and block until its reply arrives
+
+            Args:
+                message (Message): request to send
+                reply_types (str or list): reply message type(s), defaults
+                                           to message.type + ".reply"
+                timeout (float): seconds to wait for the reply
+
+            Returns:
+                Message: the reply, None on timeout
+        """
+        future = self.send_request(message, reply_types)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            self.cancel_request(future)
+            return None
+
+    def cancel_request(self, future):
+        """
+            Stop waiting for the reply of a request made with send_request,
+            same as future.cancel()
+
+            Args:
+                future (Future): returned by send_request
+        """
+        future.cancel()
+
+    def _request_done(self, future):
+        with self.requests_lock:
+            self._pop_request(future.request_id)
+
+    def _pop_request(self, request_id):
+        # must be called with requests_lock held
+        future, reply_types = self.requests.pop(request_id, (None, []))
+        for reply_type in reply_types:
+            waiters = self.reply_waiters.get(reply_type, [])
+            if request_id in waiters:
+                waiters.remove(request_id)
+            if not waiters:
+                self.reply_waiters.pop(reply_type, None)
+                self.remove(reply_type, self._handle_reply)
+        return future
+
+    def _handle_reply(self, message):
+        request_id = (message.context or {}).get("request_id")
+        with self.requests_lock:
+            if request_id is None:
+                # responder did not copy the request context
+                waiters = self.reply_waiters.get(message.type)
+                if not waiters:
+                    return
+                request_id = waiters[0]
+            future = self._pop_request(request_id)
+        # a cancelled request stays cancelled
+        if future is not None and future.set_running_or_notify_cancel():
+            future.set_result(message)
 
     def run_forever(self):
         self.client.run_forever()
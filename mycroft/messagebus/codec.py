@@ -0,0 +1,89 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+from mycroft.messagebus.message import Message
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+__author__ = 'jarbas'
+
+
+class MessageCodec(object):
+    """
+    Wire format used to send Message objects over the websocket
+
+    Binary codecs are sent as binary websocket frames, text codecs as
+    text frames.
+    """
+    name = None
+    binary = False
+
+    def encode(self, message):
+        raise NotImplementedError
+
+    def decode(self, payload):
+        raise NotImplementedError
+
+
+class JsonCodec(MessageCodec):
+    """ The default codec, understood by every client """
+    name = "json"
+
+    def encode(self, message):
+        return message.serialize()
+
+    def decode(self, payload):
+        return Message.deserialize(payload)
+
+
+class MsgpackCodec(MessageCodec):
+    """ Compact binary codec, requires the msgpack package """
+    name = "msgpack"
+    binary = True
+
+    def encode(self, message):
+        return msgpack.packb({
+            'type': message.type,
+            'data': message.data,
+            'context': message.context
+        }, use_bin_type=True)
+
+    def decode(self, payload):
+        obj = msgpack.unpackb(payload, raw=False)
+        return Message(obj.get('type'), obj.get('data'), obj.get('context'))
+
+
+JSON_CODEC = JsonCodec()
+
+CODECS = {JSON_CODEC.name: JSON_CODEC}
+if msgpack is not None:
+    CODECS[MsgpackCodec.name] = MsgpackCodec()
+
+
+def get_codec(name=None):
+    """
+    Get a codec by name, falls back to json if not available
+
+    Args:
+        name (str): codec name, e.g. "json" or "msgpack"
+
+    Returns:
+        MessageCodec: the requested codec, or the json codec
+    """
+    return CODECS.get(name, JSON_CODEC)
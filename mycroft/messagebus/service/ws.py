@@ -21,6 +21,7 @@ import traceback
 import tornado.websocket
 from pyee import EventEmitter
 
+from mycroft.messagebus.codec import JSON_CODEC, get_codec
 from mycroft.messagebus.message import Message
 from mycroft.util.log import LOG
 
@@ -31,22 +32,131 @@ EventBusEmitter = EventEmitter()
 client_connections = []
 
 
+class SubscriptionIndex(object):
+    """
+    Index from message types to the connections interested in them.
+
+    Connections start out receiving every message. Once a connection
+    subscribes to a message type it only receives matching messages.
+    A subscription is either an exact message type or a prefix ending
+    in "*" (e.g. "LILACS.node.*"); "*" alone means every message.
+
+    Lookups are cached per message type, the cache is dropped whenever
+    a subscription changes.
+    """
+    MAX_CACHED_TYPES = 2048
+
+    def __init__(self):
+        self.everything = set()
+        self.exact = {}
+        self.prefixes = {}
+        self.filtered = set()
+        self._cache = {}
+
+    def add(self, connection):
+        """ register a new connection, receiving every message """
+        self.everything.add(connection)
+        self._cache = {}
+
+    def remove(self, connection):
+        """ forget a connection and all of its subscriptions """
+        self.everything.discard(connection)
+        self.filtered.discard(connection)
+        for index in (self.exact, self.prefixes):
+            for key in list(index):
+                index[key].discard(connection)
+                if not index[key]:
+                    del index[key]
+        self._cache = {}
+
+    def subscribe(self, connection, message_type):
+        if connection not in self.filtered:
+            # first subscription, stop receiving the whole bus
+            self.filtered.add(connection)
+            self.everything.discard(connection)
+        if message_type == "*":
+            self.everything.add(connection)
+        elif message_type.endswith("*"):
+            self.prefixes.setdefault(message_type[:-1],
+                                     set()).add(connection)
+        else:
+            self.exact.setdefault(message_type, set()).add(connection)
+        self._cache = {}
+
+    def unsubscribe(self, connection, message_type):
+        if message_type == "*":
+            if connection in self.filtered:
+                self.everything.discard(connection)
+        else:
+            if message_type.endswith("*"):
+                index, key = self.prefixes, message_type[:-1]
+            else:
+                index, key = self.exact, message_type
+            if key in index:
+                index[key].discard(connection)
+                if not index[key]:
+                    del index[key]
+        self._cache = {}
+
+    def get(self, message_type):
+        """
+        Connections that should receive a message of type message_type
+
+        Args:
+            message_type (str): type of the message being routed
+
+        Returns:
+            frozenset: matching connections
+        """
+        connections = self._cache.get(message_type)
+        if connections is None:
+            connections = set(self.everything)
+            connections.update(self.exact.get(message_type, ()))
+            for prefix in self.prefixes:
+                if message_type.startswith(prefix):
+                    connections.update(self.prefixes[prefix])
+            connections = frozenset(connections)
+            if len(self._cache) >= self.MAX_CACHED_TYPES:
+                self._cache = {}
+            self._cache[message_type] = connections
+        return connections
+
+
+subscriptions = SubscriptionIndex()
+
+
 class WebsocketEventHandler(tornado.websocket.WebSocketHandler):
     def __init__(self, application, request, **kwargs):
         tornado.websocket.WebSocketHandler.__init__(
             self, application, request, **kwargs)
         self.emitter = EventBusEmitter
+        self.codec = JSON_CODEC
 
     def on(self, event_name, handler):
         self.emitter.on(event_name, handler)
 
     def on_message(self, message):
-        LOG.debug(message)
+        # text frames are always json, binary frames use the codec
+        # negotiated when the connection was opened
+        if isinstance(message, bytes):
+            codec = self.codec
+        else:
+            codec = JSON_CODEC
+            LOG.debug(message)
         try:
-            deserialized_message = Message.deserialize(message)
+            deserialized_message = codec.decode(message)
         except:
             return
 
+        if deserialized_message.type in ("bus.subscribe", "bus.unsubscribe"):
+            data = deserialized_message.data or {}
+            for message_type in data.get("types", []):
+                if deserialized_message.type == "bus.subscribe":
+                    subscriptions.subscribe(self, message_type)
+                else:
+                    subscriptions.unsubscribe(self, message_type)
+            return
+
         try:
             self.emitter.emit(deserialized_message.type, deserialized_message)
         except Exception, e:
@@ -54,20 +164,33 @@ class WebsocketEventHandler(tornado.websocket.WebSocketHandler):
             traceback.print_exc(file=sys.stdout)
             pass
 
-        for client in client_connections:
-            client.write_message(message)
+        # forward the received payload untouched to clients sharing the
+        # sender's codec, encode at most once for every other codec
+        payloads = {codec.name: message}
+        for client in subscriptions.get(deserialized_message.type):
+            payload = payloads.get(client.codec.name)
+            if payload is None:
+                payload = client.codec.encode(deserialized_message)
+                payloads[client.codec.name] = payload
+            client.write_message(payload, binary=client.codec.binary)
 
     def open(self):
-        self.write_message(Message("connected").serialize())
+        self.codec = get_codec(self.get_argument("codec", JSON_CODEC.name))
+        # always sent as json, tells the client which codec was accepted
+        self.write_message(JSON_CODEC.encode(
+            Message("connected", {"codec": self.codec.name})))
         client_connections.append(self)
+        subscriptions.add(self)
 
     def on_close(self):
         client_connections.remove(self)
+        subscriptions.remove(self)
 
     def emit(self, channel_message):
         if (hasattr(channel_message, 'serialize') and
                 callable(getattr(channel_message, 'serialize'))):
-            self.write_message(channel_message.serialize())
+            self.write_message(self.codec.encode(channel_message),
+                               binary=self.codec.binary)
         else:
             self.write_message(json.dumps(channel_message))
 
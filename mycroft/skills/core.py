@@ -15,7 +15,9 @@
 # You should have received a copy of the GNU General Public License
 # along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
 import abc
+import hashlib
 import imp
+import json
 import time
 import sys
 
@@ -57,6 +59,46 @@ MainModule = '__init__'
 logger = getLogger(__name__)
 
 
+def read_vocab_file(path, vocab_type):
+    """
+        Parse a mycroft vocabulary file.
+
+        Args:
+            path:       path to vocabulary file (*.voc)
+            vocab_type: keyword name
+        Returns:
+            list of register_vocab message data, one per entity and alias
+    """
+    entries = []
+    with open(path, 'r') as voc_file:
+        for line in voc_file.readlines():
+            parts = line.strip().split("|")
+            entity = parts[0]
+            entries.append({'start': entity, 'end': vocab_type})
+            for alias in parts[1:]:
+                entries.append({
+                    'start': alias, 'end': vocab_type, 'alias_of': entity
+                })
+    return entries
+
+
+def read_regex_file(path):
+    """
+        Parse and validate a regex file.
+
+        Args:
+            path:       path to regex file (*.rx)
+        Returns:
+            list of register_vocab message data, one per regex
+    """
+    entries = []
+    with open(path, 'r') as reg_file:
+        for line in reg_file.readlines():
+            re.compile(line.strip())
+            entries.append({'regex': line.strip()})
+    return entries
+
+
 def load_vocab_from_file(path, vocab_type, emitter):
     """
         Load mycroft vocabulary from file. and send it on the message bus for
@@ -68,18 +110,8 @@ def load_vocab_from_file(path, vocab_type, emitter):
             emitter:    emitter to access the message bus
     """
     if path.endswith('.voc'):
-        with open(path, 'r') as voc_file:
-            for line in voc_file.readlines():
-                parts = line.strip().split("|")
-                entity = parts[0]
-
-                emitter.emit(Message("register_vocab", {
-                    'start': entity, 'end': vocab_type
-                }))
-                for alias in parts[1:]:
-                    emitter.emit(Message("register_vocab", {
-                        'start': alias, 'end': vocab_type, 'alias_of': entity
-                    }))
+        for entry in read_vocab_file(path, vocab_type):
+            emitter.emit(Message("register_vocab", entry))
 
 
 def load_regex_from_file(path, emitter):
@@ -92,11 +124,8 @@ def load_regex_from_file(path, emitter):
             emitter:    emitter to access the message bus
     """
     if path.endswith('.rx'):
-        with open(path, 'r') as reg_file:
-            for line in reg_file.readlines():
-                re.compile(line.strip())
-                emitter.emit(
-                    Message("register_vocab", {'regex': line.strip()}))
+        for entry in read_regex_file(path):
+            emitter.emit(Message("register_vocab", entry))
 
 
 def load_vocabulary(basedir, emitter):
@@ -113,6 +142,116 @@ def load_regex(basedir, emitter):
                 join(basedir, regex_type), emitter)
 
 
+def vocab_cache_directory():
+    """
+        Directory of the vocabulary cache, kept under ~/.mycroft so it
+        survives reboots, unlike get_cache_directory which may be cleared
+        at any time.
+    """
+    return FileSystemAccess("vocab_cache").path
+
+
+class VocabularyCache(object):
+    """
+        On disk cache of the parsed vocabulary and regex files of a
+        directory. Parsed entries are reused while the modification time
+        and size of a file are unchanged.
+
+        Args:
+            basedir:    directory holding *.voc or *.rx files
+    """
+
+    def __init__(self, basedir):
+        self.basedir = basedir
+        name = hashlib.md5(abspath(basedir)).hexdigest() + ".json"
+        self.path = join(vocab_cache_directory(), name)
+        self.files = {}
+        self.changed = False
+        try:
+            with open(self.path, 'r') as f:
+                self.cached = json.load(f)
+        except (IOError, ValueError):
+            self.cached = {}
+
+    def get(self, filename, parser):
+        """
+            Get the entries of a file, parsing it only if it changed.
+
+            Args:
+                filename:   file name inside basedir
+                parser:     function(path) returning the entries of a file
+            Returns:
+                list of register_vocab message data
+        """
+        path = join(self.basedir, filename)
+        stat = os.stat(path)
+        cached = self.cached.get(filename)
+        if cached and cached["mtime"] == stat.st_mtime and \
+                cached["size"] == stat.st_size:
+            self.files[filename] = cached
+        else:
+            self.files[filename] = {"mtime": stat.st_mtime,
+                                    "size": stat.st_size,
+                                    "entries": parser(path)}
+            self.changed = True
+        return self.files[filename]["entries"]
+
+    def store(self):
+        """
+            Write the cache to disk if any file was parsed or removed.
+        """
+        if not self.changed and set(self.files) == set(self.cached):
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                # dumps uses the C encoder, dump writes piece by piece
+                f.write(json.dumps(self.files))
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            logger.warning("Could not store vocabulary cache: " + repr(e))
+
+
+def load_vocabulary_batch(basedir, emitter):
+    """
+        Load all vocabulary files of basedir and send them on the message
+        bus in a single register_vocab_batch message.
+
+        Args:
+            basedir:    directory holding *.voc files
+            emitter:    emitter to access the message bus
+    """
+    cache = VocabularyCache(basedir)
+    entries = []
+    for vocab_file in sorted(listdir(basedir)):
+        if vocab_file.endswith(".voc"):
+            vocab_type = splitext(vocab_file)[0]
+            entries += cache.get(
+                vocab_file, lambda path: read_vocab_file(path, vocab_type))
+    cache.store()
+    if entries:
+        emitter.emit(Message("register_vocab_batch", {"vocab": entries}))
+
+
+def load_regex_batch(basedir, emitter):
+    """
+        Load all regex files of basedir and send them on the message
+        bus in a single register_vocab_batch message.
+
+        Args:
+            basedir:    directory holding *.rx files
+            emitter:    emitter to access the message bus
+    """
+    cache = VocabularyCache(basedir)
+    entries = []
+    for regex_file in sorted(listdir(basedir)):
+        if regex_file.endswith(".rx"):
+            entries += cache.get(regex_file, read_regex_file)
+    cache.store()
+    if entries:
+        emitter.emit(Message("register_vocab_batch", {"vocab": entries}))
+
+
 def open_intent_envelope(message):
     """ Convert dictionary received over messagebus to Intent. """
     intent_dict = message.data
@@ -290,7 +429,7 @@ class MycroftSkill(object):
         """ Get the JSON data struction holding location information. """
         # TODO: Allow Enclosure to override this for devices that
         # contain a GPS.
-        return self.config_core.get('location')
+        return ConfigurationManager.get().get('location')
 
     @property
     def location_pretty(self):
@@ -310,7 +449,7 @@ class MycroftSkill(object):
 
     @property
     def lang(self):
-        return self.config_core.get('lang')
+        return ConfigurationManager.get().get('lang')
 
     @property
     def settings(self):
@@ -696,12 +835,12 @@ class MycroftSkill(object):
     def load_vocab_files(self, vocab_dir):
         self.vocab_dir = vocab_dir
         if exists(vocab_dir):
-            load_vocabulary(vocab_dir, self.emitter)
+            load_vocabulary_batch(vocab_dir, self.emitter)
         else:
             logger.debug('No vocab loaded, ' + vocab_dir + ' does not exist')
 
     def load_regex_files(self, regex_dir):
-        load_regex(regex_dir, self.emitter)
+        load_regex_batch(regex_dir, self.emitter)
 
     def __handle_stop(self, event):
         """
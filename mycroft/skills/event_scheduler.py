@@ -1,8 +1,14 @@
+import errno
+import fcntl
+import heapq
 import json
+import math
+import select
 import time
-from Queue import Queue
-from threading import Thread
+from itertools import count
+from threading import Thread, Lock
 
+import os
 from os.path import isfile
 
 from mycroft.messagebus.message import Message
@@ -10,18 +16,41 @@ from mycroft.util.log import LOG
 
 
 class EventScheduler(Thread):
+    """
+        Thread emitting scheduled messagebus events.
+
+        Pending trigger times are kept in a min-heap, the thread sleeps in
+        select on a self-pipe until the earliest trigger time or until the
+        schedule changes. Removed events are discarded lazily when they
+        reach the top of the heap.
+    """
+    # seconds between writes of a changed schedule to disk
+    STORE_INTERVAL = 60
+
     def __init__(self, emitter, schedule_file='/opt/mycroft/schedule.json'):
         super(EventScheduler, self).__init__()
+        self.daemon = True
+        # event name -> {sequence: [time, repeat, data]} of pending times
         self.events = {}
+        # heap of (time, sequence, event name, entry)
+        self.heap = []
+        self.sequence = count()
+        self.removed = 0
+        self.lock = Lock()
+        # writing to the pipe wakes the thread up, unlike Condition.wait
+        # on Python 2 select does not poll until the timeout expires
+        self.wake_read, self.wake_write = os.pipe()
+        for fd in (self.wake_read, self.wake_write):
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+        self.dirty = False
+        self.last_store = time.time()
         self.emitter = emitter
         self.isRunning = True
         self.schedule_file = schedule_file
         if self.schedule_file:
             self.load()
 
-        self.add = Queue()
-        self.remove = Queue()
-        self.update = Queue()
         self.emitter.on('mycroft.scheduler.schedule_event',
                         self.schedule_event_handler)
         self.emitter.on('mycroft.scheduler.remove_event',
@@ -34,82 +63,132 @@ class EventScheduler(Thread):
         """
             Load json data with active events from json file.
         """
-        if isfile(self.schedule_file):
-            with open(self.schedule_file) as f:
-                try:
-                    json_data = json.load(f)
-                except Exception as e:
-                    LOG.error(e)
-            current_time = time.time()
-            for key in json_data:
-                event_list = json_data[key]
-                # discard non repeating events that has already happened
-                self.events[key] = [tuple(e) for e in event_list
-                                    if e[0] > current_time or e[1]]
-
-    def fetch_new_events(self):
-        """
-            Fetch new events and add to list of pending events.
-        """
-        while not self.add.empty():
-            event, sched_time, repeat, data = self.add.get(timeout=1)
-            # get current list of scheduled times for event, [] if missing
-            event_list = self.events.get(event, [])
-            # add received event and time
-            event_list.append((sched_time, repeat, data))
-            self.events[event] = event_list
-
-    def remove_events(self):
-        """
-            Remove event from event list.
-        """
-        while not self.remove.empty():
-            event = self.remove.get()
-            if event in self.events:
-                self.events.pop(event)
+        if not isfile(self.schedule_file):
+            return
+        with open(self.schedule_file) as f:
+            try:
+                json_data = json.load(f)
+            except Exception as e:
+                LOG.error(e)
+                return
+        current_time = time.time()
+        with self.lock:
+            for event, event_list in json_data.iteritems():
+                for sched_time, repeat, data in event_list:
+                    # discard non repeating events that already happened
+                    if sched_time > current_time or repeat:
+                        self._push(event, sched_time, repeat, data)
+
+    def _push(self, event, sched_time, repeat, data):
+        """ Add a trigger time, must be called with the lock held """
+        sequence = next(self.sequence)
+        entry = [sched_time, repeat, data]
+        self.events.setdefault(event, {})[sequence] = entry
+        heapq.heappush(self.heap, (sched_time, sequence, event, entry))
+        self.dirty = True
+        return sequence
 
-    def update_events(self):
+    def _is_pending(self, item):
+        return item[1] in self.events.get(item[2], ())
+
+    def _pop_due(self, current_time):
         """
-            Update event list with new data.
+            Pop the entries due at current_time, rescheduling repeating
+            ones. A repeating event that is overdue by several intervals
+            is emitted once and rescheduled after current_time. Must be
+            called with the lock held.
+
+            Returns:
+                list of (event, data) to emit, in trigger order
         """
-        while not self.remove.empty():
-            event, data = self.update.get()
-            # if there is an active event with this name
-            if len(self.events.get(event, [])) > 0:
-                time, repeat, _ = self.events[event][0]
-                self.events[event][0] = (time, repeat, data)
+        due = []
+        while self.heap and self.heap[0][0] <= current_time:
+            item = heapq.heappop(self.heap)
+            if not self._is_pending(item):
+                # removed while waiting in the heap
+                self.removed -= 1
+                continue
+            sched_time, sequence, event, entry = item
+            _, repeat, data = entry
+            due.append((event, data))
+            entries = self.events[event]
+            del entries[sequence]
+            if not entries:
+                del self.events[event]
+            # if this is a repeated event add a new trigger time
+            if repeat:
+                missed = math.floor((current_time - sched_time) / repeat)
+                self._push(event, sched_time + repeat * (missed + 1),
+                           repeat, data)
+            self.dirty = True
+        return due
+
+    def _wait_timeout(self, current_time):
+        """ Seconds until the next trigger time or periodic store """
+        timeout = None
+        if self.dirty and self.schedule_file:
+            timeout = self.last_store + self.STORE_INTERVAL - current_time
+        if self.heap:
+            next_time = self.heap[0][0] - current_time
+            timeout = next_time if timeout is None else min(timeout,
+                                                            next_time)
+        return None if timeout is None else max(timeout, 0)
+
+    def _notify(self):
+        """ Wake the thread up """
+        try:
+            os.write(self.wake_write, b'.')
+        except OSError as e:
+            # a full pipe wakes the thread up already
+            if e.errno != errno.EAGAIN:
+                raise
+
+    def _wait(self, timeout):
+        """ Sleep until timeout or _notify, without holding the lock """
+        try:
+            readable = select.select([self.wake_read], [], [], timeout)[0]
+        except select.error as e:
+            if e.args[0] != errno.EINTR:
+                raise
+            return
+        if readable:
+            try:
+                os.read(self.wake_read, 4096)
+            except OSError as e:
+                if e.errno != errno.EAGAIN:
+                    raise
 
     def run(self):
-        while self.isRunning:
-            # Fetch newly scheduled events
-            self.fetch_new_events()
-            # Remove events
-            self.remove_events()
-            # Update events
-            self.update_events()
-
-            # Check all events
-            for event in self.events:
+        while True:
+            with self.lock:
+                if not self.isRunning:
+                    break
                 current_time = time.time()
-                e = self.events[event]
-                # Get scheduled times that has passed
-                passed = [(t, r, d) for (t, r, d) in e if t <= current_time]
-                # and remaining times that we're still waiting for
-                remaining = [(t, r, d) for t, r, d in e if t > current_time]
-                # Trigger registered methods
-                for sched_time, repeat, data in passed:
-                    self.emitter.emit(Message(event, data))
-                    # if this is a repeated event add a new trigger time
-                    if repeat:
-                        remaining.append((sched_time + repeat, repeat, data))
-                # update list of events
-                self.events[event] = remaining
-            time.sleep(0.5)
+                due = self._pop_due(current_time)
+                store = (self.dirty and self.schedule_file and
+                         current_time - self.last_store >=
+                         self.STORE_INTERVAL)
+                timeout = self._wait_timeout(current_time)
+            if not due and not store:
+                # a _notify after the lock was released is still in the
+                # pipe, select returns at once
+                self._wait(timeout)
+                continue
+            # Trigger registered methods outside of the lock, handlers
+            # may schedule new events
+            for event, data in due:
+                self.emitter.emit(Message(event, data))
+            if store:
+                self.store()
 
     def schedule_event(self, event, sched_time, repeat=None, data=None):
-        """ Send event to thread using thread safe queue. """
+        """ Add event to the schedule and wake the thread if needed. """
         data = data or {}
-        self.add.put((event, sched_time, repeat, data))
+        with self.lock:
+            sequence = self._push(event, sched_time, repeat, data)
+            # the thread only needs to wake up if this is the next event
+            if self.heap[0][1] == sequence:
+                self._notify()
 
     def schedule_event_handler(self, message):
         """
@@ -135,8 +214,19 @@ class EventScheduler(Thread):
             LOG.error('Scheduled event time not provided')
 
     def remove_event(self, event):
-        """ Remove event using thread safe queue. """
-        self.remove.put(event)
+        """ Remove all pending trigger times of event. """
+        with self.lock:
+            entries = self.events.pop(event, None)
+            if not entries:
+                return
+            self.removed += len(entries)
+            self.dirty = True
+            # rebuild the heap once most of it is removed entries
+            if self.removed > len(self.heap) / 2:
+                self.heap = [item for item in self.heap
+                             if self._is_pending(item)]
+                heapq.heapify(self.heap)
+                self.removed = 0
 
     def remove_event_handler(self, message):
         """ Messagebus interface to the remove_event method. """
@@ -144,7 +234,13 @@ class EventScheduler(Thread):
         self.remove_event(event)
 
     def update_event(self, event, data):
-        self.update((event, data))
+        """ Replace the data of the next trigger time of event. """
+        with self.lock:
+            entries = self.events.get(event)
+            # if there is an active event with this name
+            if entries:
+                min(entries.values(), key=lambda e: e[0])[2] = data
+                self.dirty = True
 
     def update_event_handler(self, message):
         """ Messagebus interface to the update_event method. """
@@ -156,17 +252,33 @@ class EventScheduler(Thread):
         """
             Write current schedule to disk.
         """
-        with open(self.schedule_file, 'w') as f:
-            json.dump(self.events, f)
+        if not self.schedule_file:
+            return
+        with self.lock:
+            events = dict((event, sorted(tuple(e) for e in entries.values()))
+                          for event, entries in self.events.iteritems())
+            self.dirty = False
+            self.last_store = time.time()
+        try:
+            tmp_file = self.schedule_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(events, f)
+            os.rename(tmp_file, self.schedule_file)
+        except (IOError, OSError) as e:
+            LOG.error('Could not store schedule: ' + repr(e))
 
     def shutdown(self):
         """ Stop the running thread. """
-        self.isRunning = False
+        with self.lock:
+            self.isRunning = False
+            self._notify()
         # Remove listeners
         self.emitter.remove_all_listeners('mycroft.scheduler.schedule_event')
         self.emitter.remove_all_listeners('mycroft.scheduler.remove_event')
         self.emitter.remove_all_listeners('mycroft.scheduler.update_event')
         # Wait for thread to finish
         self.join()
+        os.close(self.wake_read)
+        os.close(self.wake_write)
         # Store all pending scheduled events
         self.store()
@@ -17,12 +17,16 @@
 
 
 from adapt.engine import IntentDeterminationEngine
+from adapt.parser import Parser
+import json
 import time
+from copy import deepcopy
 from time import sleep
 from threading import Timer
 from mycroft.messagebus.message import Message
 from mycroft.skills.core import open_intent_envelope
 from mycroft.util.log import getLogger
+from mycroft.util.lru import LRUCache
 from mycroft.util.parse import normalize
 from mycroft.configuration import ConfigurationManager
 
@@ -34,6 +38,9 @@ source_name = "server_skills"
 
 logger = getLogger(__name__)
 
+# marks a cache miss, None is a cached "no intent matched"
+_NOT_CACHED = object()
+
 
 class ContextManager(object):
     """
@@ -131,10 +138,112 @@ class ContextManager(object):
         return result
 
 
+class IntentEngine(IntentDeterminationEngine):
+    """
+    Adapt engine with an index from keywords to intent parsers
+
+    Only intent parsers whose required keywords were tagged in the
+    utterance, or are available from context, are validated against the
+    parse results. The best intent is the same as the one picked by
+    IntentDeterminationEngine, since any other parser scores 0.
+    """
+    def __init__(self, tokenizer=None, trie=None):
+        IntentDeterminationEngine.__init__(self, tokenizer, trie)
+        self.keyword_index = {}  # {keyword: set of parser ids}
+        self.requirements = {}  # {parser id: (requires, at_least_one)}
+        self.unindexed = set()  # ids of parsers without required keywords
+
+    def register_intent_parser(self, intent_parser):
+        IntentDeterminationEngine.register_intent_parser(self, intent_parser)
+        self.index_intent_parser(intent_parser)
+
+    def index_intent_parser(self, intent_parser):
+        parser_id = id(intent_parser)
+        requires = set(k.lower() for k, _ in
+                       getattr(intent_parser, 'requires', []))
+        at_least_one = [set(k.lower() for k in one_of) for one_of in
+                        getattr(intent_parser, 'at_least_one', [])]
+        self.requirements[parser_id] = (requires, at_least_one)
+        keywords = requires.union(*at_least_one)
+        if not keywords:
+            self.unindexed.add(parser_id)
+        for keyword in keywords:
+            self.keyword_index.setdefault(keyword, set()).add(parser_id)
+
+    def remove_intent_parsers(self, predicate):
+        """
+        Remove the intent parsers for which predicate(parser) is True
+        """
+        self.intent_parsers = [p for p in self.intent_parsers
+                               if not predicate(p)]
+        self.keyword_index = {}
+        self.requirements = {}
+        self.unindexed = set()
+        for intent_parser in self.intent_parsers:
+            self.index_intent_parser(intent_parser)
+
+    def get_candidates(self, tags, context):
+        """
+        Get the intent parsers that could match the tagged keywords, in
+        registration order
+        """
+        keywords = set()
+        for entity in [e for tag in tags for e in tag['entities']] + context:
+            keywords.update(t.lower() for _, t in entity['data'])
+        ids = set(self.unindexed)
+        for keyword in keywords:
+            for parser_id in self.keyword_index.get(keyword, ()):
+                if parser_id in ids:
+                    continue
+                requires, at_least_one = self.requirements[parser_id]
+                if requires <= keywords and \
+                        all(one_of & keywords for one_of in at_least_one):
+                    ids.add(parser_id)
+        return [p for p in self.intent_parsers if id(p) in ids]
+
+    def determine_intent(self, utterance, num_results=1, include_tags=False,
+                         context_manager=None):
+        parser = Parser(self.tokenizer, self.tagger)
+        candidates = []
+        context = []
+        if context_manager:
+            context = context_manager.get_context()
+
+        def on_tagged_entities(result):
+            candidates[:] = self.get_candidates(result['tags'], context)
+            self.emit("tagged_entities", result)
+
+        parser.on('tagged_entities', on_tagged_entities)
+        for result in parser.parse(utterance, N=num_results, context=context):
+            self.emit("parse_result", result)
+            # create a context without entities used in result
+            used_keys = set(t['key'] for t in result['tags']
+                            if t['from_context'])
+            remaining_context = [{'entities': [c]} for c in context
+                                 if c['key'] not in used_keys]
+            best_intent = None
+            best_tags = None
+            for intent_parser in candidates:
+                i, tags = intent_parser.validate_with_tags(
+                    result.get('tags') + remaining_context,
+                    result.get('confidence'))
+                if not best_intent or (i and i.get('confidence') >
+                                       best_intent.get('confidence')):
+                    best_intent = i
+                    best_tags = tags
+            if best_intent and best_intent.get('confidence', 0.0) > 0:
+                if include_tags:
+                    best_intent['__tags__'] = best_tags
+                yield best_intent
+
+
 class IntentService(object):
     def __init__(self, emitter):
         self.config = ConfigurationManager.get().get('context', {})
-        self.engine = IntentDeterminationEngine()
+        self.engine = IntentEngine()
+        skills_config = ConfigurationManager.get().get('skills', {})
+        self.intent_cache = LRUCache(
+            skills_config.get('intent_cache_size', 1000))
         self.context_keywords = self.config.get('keywords', ['Location'])
         self.context_max_frames = self.config.get('max_frames', 3)
         self.context_timeout = self.config.get('timeout', 2)
@@ -142,35 +251,74 @@ class IntentService(object):
         self.context_manager = ContextManager(self.context_timeout)
         self.emitter = emitter
         self.emitter.on('register_vocab', self.handle_register_vocab)
+        self.emitter.on('register_vocab_batch',
+                        self.handle_register_vocab_batch)
         self.emitter.on('register_intent', self.handle_register_intent)
         self.emitter.on('recognizer_loop:utterance', self.handle_utterance)
         self.emitter.on('detach_intent', self.handle_detach_intent)
         self.emitter.on('detach_skill', self.handle_detach_skill)
-        self.emitter.on('skill.converse.response',
-                        self.handle_conversation_response)
         self.emitter.on('intent_request', self.handle_intent_request)
         self.emitter.on('intent_to_skill_request', self.handle_intent_to_skill_request)
         self.emitter.on('active_skill_request', self.handle_active_skill_request)
         self.active_skills = []  # [skill_id , timestamp]
         self.skill_ids = {}  # {skill_id: [intents]}
         self.converse_timeout = 5  # minutes to prune active_skills
+        # seconds to wait for all active skills to answer converse
+        self.converse_deadline = skills_config.get('converse_deadline', 5)
+        # skills slower than this (seconds) are removed from active skills
+        self.converse_max_latency = skills_config.get(
+            'converse_max_latency', 2)
+        self.converse_latency = {}  # {skill_id: average latency}
         # Context related handlers
         self.emitter.on('add_context', self.handle_add_context)
         self.emitter.on('remove_context', self.handle_remove_context)
         self.emitter.on('clear_context', self.handle_clear_context)
 
-    def do_conversation(self, utterances, skill_id, lang):
-        self.emitter.emit(Message("skill.converse.request", {
-            "skill_id": skill_id, "utterances": utterances, "lang": lang}))
-        self.waiting = True
-        self.result = False
-        start_time = time.time()
-        t = 0
-        while self.waiting and t < 5:
-            t = time.time() - start_time
-            sleep(0.1)
-        self.waiting = False
-        return self.result
+    def converse(self, utterances, lang):
+        """
+            Ask the active skills to converse, most recent first, until one
+            handles the utterance. A skill acts on the utterance when it
+            handles it, so the next skill is only asked after the previous
+            one declined. All skills share one deadline, unresponsive
+            skills delay intent parsing by converse_deadline at most.
+
+            Skills whose average converse latency exceeds
+            converse_max_latency are removed from the active skills until
+            they become active again.
+
+            Args:
+                utterances: list of utterances
+                lang: language of the utterances
+            Returns:
+                skill_id of the skill that handled the utterance or None
+        """
+        deadline = time.time() + self.converse_deadline
+        for skill_id, _ in list(self.active_skills):
+            start = time.time()
+            if start >= deadline:
+                break
+            response = self.emitter.wait_for_response(
+                Message("skill.converse.request", {
+                    "skill_id": skill_id, "utterances": utterances,
+                    "lang": lang}),
+                "skill.converse.response", deadline - start)
+            self.track_converse_latency(skill_id, time.time() - start)
+            if response is not None and response.data.get("result"):
+                return skill_id
+            latency = self.converse_latency[skill_id]
+            if latency > self.converse_max_latency:
+                logger.warning("Skill " + str(skill_id) + " took " +
+                               str(latency) + "s to converse, removing "
+                               "from active skills")
+                self.remove_active_skill(skill_id)
+        return None
+
+    def track_converse_latency(self, skill_id, latency):
+        """
+            Update the moving average of the converse latency of a skill
+        """
+        average = self.converse_latency.get(skill_id, latency)
+        self.converse_latency[skill_id] = (average + latency) / 2.0
 
     def handle_intent_to_skill_request(self, message):
         intent = message.data["intent_name"]
@@ -178,20 +326,13 @@ class IntentService(object):
             for name in self.skill_ids[id]:
                 if name == intent:
                     self.emitter.emit(Message("intent_to_skill_response", {
-                        "skill_id": id, "intent_name": intent}))
+                        "skill_id": id, "intent_name": intent},
+                        message.context))
                     return id
         self.emitter.emit(Message("intent_to_skill_response", {
-            "skill_id": 0, "intent_name": intent}))
+            "skill_id": 0, "intent_name": intent}, message.context))
         return 0
 
-    def handle_conversation_response(self, message):
-        # id = message.data["skill_id"]
-        # no need to crosscheck id because waiting before new request is made
-        # no other skill will make this request is safe assumption
-        result = message.data["result"]
-        self.result = result
-        self.waiting = False
-
     def remove_active_skill(self, skill_id):
         for skill in self.active_skills:
             if skill[0] == skill_id:
@@ -200,6 +341,8 @@ class IntentService(object):
     def add_active_skill(self, skill_id):
         # you have to search the list for an existing entry that already contains it and remove that reference
         self.remove_active_skill(skill_id)
+        # an active skill gets a fresh converse latency average
+        self.converse_latency.pop(skill_id, None)
         # add skill with timestamp to start of skill_list
         self.active_skills.insert(0, [skill_id, time.time()])
 
@@ -228,23 +371,52 @@ class IntentService(object):
         skill_id = message.data["skill_id"]
         self.add_active_skill(skill_id)
 
+    def get_best_intent(self, utterance, lang, context_manager=None):
+        """
+            Get the best intent for an utterance, results are cached by
+            normalized utterance and context until intents or vocabulary
+            change.
+
+            Args:
+                utterance: utterance to parse
+                lang: language of the utterance
+                context_manager: optional ContextManager
+            Returns:
+                intent dict or None if no intent matches
+        """
+        # normalize() changes "it's a boy" to "it is boy", etc.
+        normalized = normalize(utterance, lang)
+        context = []
+        if context_manager:
+            context = context_manager.get_context()
+        # adapt tags the lower cased utterance, so case does not matter
+        key = (normalized.lower(), json.dumps(context, sort_keys=True))
+        # read before parsing, results of an engine changed meanwhile are
+        # not cached
+        generation = self.intent_cache.generation
+        best_intent = self.intent_cache.get(key, _NOT_CACHED)
+        if best_intent is not _NOT_CACHED:
+            best_intent = deepcopy(best_intent)
+        else:
+            try:
+                best_intent = next(self.engine.determine_intent(
+                    normalized, 100, include_tags=True,
+                    context_manager=context_manager))
+            except StopIteration:
+                best_intent = None
+            self.intent_cache.put(key, deepcopy(best_intent), generation)
+        if best_intent:
+            # TODO - Should Adapt handle this?
+            best_intent['utterance'] = utterance
+        return best_intent
+
     def handle_intent_request(self, message):
         utterance = message.data["utterance"]
         # Get language of the utterance
         lang = message.data.get('lang', None)
         if not lang:
             lang = "en-us"
-        best_intent = None
-        try:
-            # normalize() changes "it's a boy" to "it is boy", etc.
-            best_intent = next(self.engine.determine_intent(
-                normalize(utterance, lang), 100))
-
-            # TODO - Should Adapt handle this?
-            best_intent['utterance'] = utterance
-        except StopIteration, e:
-            logger.exception(e)
-
+        best_intent = self.get_best_intent(utterance, lang)
         if best_intent and best_intent.get('confidence', 0.0) > 0.0:
             skill_id = int(best_intent['intent_type'].split(":")[0])
             intent_name = best_intent['intent_type'].split(":")[1]
@@ -282,27 +454,20 @@ class IntentService(object):
                               if time.time() - skill[1] <= self.converse_timeout * 60]
 
         # check if any skill wants to handle utterance
-        for skill in self.active_skills:
-            if self.do_conversation(utterances, skill[0], lang):
-                # update timestamp, or there will be a timeout where
-                # intent stops conversing whether its being used or not
-                self.add_active_skill(skill[0])
-                return
+        skill_id = self.converse(utterances, lang)
+        if skill_id is not None:
+            # update timestamp, or there will be a timeout where
+            # intent stops conversing whether its being used or not
+            self.add_active_skill(skill_id)
+            return
 
         # no skill wants to handle utterance, proceed
         best_intent = None
         for utterance in utterances:
-            try:
-                # normalize() changes "it's a boy" to "it is boy", etc.
-                best_intent = next(self.engine.determine_intent(
-                                   normalize(utterance, lang), 100,
-                                   include_tags=True,
-                                   context_manager=self.context_manager))
-                # TODO - Should Adapt handle this?
-                best_intent['utterance'] = utterance
-            except StopIteration, e:
-                logger.exception(e)
-                continue
+            intent = self.get_best_intent(utterance, lang,
+                                          self.context_manager)
+            if intent:
+                best_intent = intent
 
         if best_intent and best_intent.get('confidence', 0.0) > 0.0:
             self.update_context(best_intent)
@@ -320,19 +485,28 @@ class IntentService(object):
             }, context))
 
     def handle_register_vocab(self, message):
-        start_concept = message.data.get('start')
-        end_concept = message.data.get('end')
-        regex_str = message.data.get('regex')
-        alias_of = message.data.get('alias_of')
+        self.register_vocab(message.data)
+
+    def handle_register_vocab_batch(self, message):
+        for data in message.data.get('vocab', []):
+            self.register_vocab(data)
+
+    def register_vocab(self, data):
+        start_concept = data.get('start')
+        end_concept = data.get('end')
+        regex_str = data.get('regex')
+        alias_of = data.get('alias_of')
         if regex_str:
             self.engine.register_regex_entity(regex_str)
         else:
             self.engine.register_entity(
                 start_concept, end_concept, alias_of=alias_of)
+        self.intent_cache.clear()
 
     def handle_register_intent(self, message):
         intent = open_intent_envelope(message)
         self.engine.register_intent_parser(intent)
+        self.intent_cache.clear()
         #  map intent_name to skill_id
         skill_id = int(intent.name.split(":")[0])
         intent_name = intent.name.split(":")[1]
@@ -343,16 +517,14 @@ class IntentService(object):
 
     def handle_detach_intent(self, message):
         intent_name = message.data.get('intent_name')
-        new_parsers = [
-            p for p in self.engine.intent_parsers if p.name != intent_name]
-        self.engine.intent_parsers = new_parsers
+        self.engine.remove_intent_parsers(lambda p: p.name == intent_name)
+        self.intent_cache.clear()
 
     def handle_detach_skill(self, message):
         skill_id = message.data.get('skill_id')
-        new_parsers = [
-            p for p in self.engine.intent_parsers if
-            not p.name.startswith(skill_id)]
-        self.engine.intent_parsers = new_parsers
+        self.engine.remove_intent_parsers(
+            lambda p: p.name.startswith(skill_id))
+        self.intent_cache.clear()
 
     def handle_add_context(self, message):
         """
@@ -392,43 +564,50 @@ class IntentService(object):
 class IntentParser():
     def __init__(self, emitter, time_out=5):
         self.emitter = emitter
-        self.waiting = False
         self.intent = ""
         self.id = 0
-        self.emitter.on("intent_response", self.handle_receive_intent)
-        self.emitter.on("intent_to_skill_response", self.handle_receive_skill_id)
         self.time_out = time_out
 
     def determine_intent(self, utterance, lang="en-us"):
-        self.waiting = True
-        self.emitter.emit(Message("intent_request", {"utterance": utterance, "lang": lang}))
-        start_time = time.time()
-        t = 0
-        while self.waiting and t < self.time_out:
-            t = time.time() - start_time
-            sleep(0.1)
+        self.intent = ""
+        self.id = 0
+        response = self.emitter.wait_for_response(
+            Message("intent_request", {"utterance": utterance,
+                                       "lang": lang}),
+            "intent_response", self.time_out)
+        if response is not None:
+            self.handle_receive_intent(response)
         return self.intent, self.id
 
+    def determine_intent_async(self, utterance, lang="en-us"):
+        """
+            Ask for the intent of utterance without waiting for the answer,
+            safe to call from several threads
+
+            Returns:
+                Future: result() is the intent_response Message, cancel it
+                        to stop waiting
+        """
+        return self.emitter.send_request(
+            Message("intent_request", {"utterance": utterance,
+                                       "lang": lang}),
+            "intent_response")
+
     def get_skill_id(self, intent_name):
-        self.waiting = True
         self.id = 0
-        self.emitter.emit(Message("intent_to_skill_request", {"intent_name": intent_name}))
-        start_time = time.time()
-        t = 0
-        while self.waiting and t < self.time_out:
-            t = time.time() - start_time
-            sleep(0.1)
-        self.waiting = False
+        response = self.emitter.wait_for_response(
+            Message("intent_to_skill_request", {"intent_name": intent_name}),
+            "intent_to_skill_response", self.time_out)
+        if response is not None:
+            self.handle_receive_skill_id(response)
         return self.id
 
     def handle_receive_intent(self, message):
         self.id = message.data["skill_id"]
         self.intent = message.data["intent_name"]
-        self.waiting = False
 
     def handle_receive_skill_id(self, message):
         self.id = message.data["skill_id"]
-        self.waiting = False
 
 
 class IntentLayers():
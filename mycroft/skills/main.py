@@ -22,7 +22,8 @@ import subprocess
 import sys
 import time
 from os.path import exists, join
-from threading import Timer, Thread, Event
+from multiprocessing.pool import ThreadPool
+from threading import Timer, Thread, Event, RLock
 
 from mycroft import MYCROFT_ROOT_PATH
 from mycroft.configuration import ConfigurationManager
@@ -39,6 +40,11 @@ from mycroft.api import is_paired
 import mycroft.dialog
 from mycroft import MYCROFT_ROOT_PATH
 
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
 logger = getLogger("Skills")
 
 __author__ = 'seanfitz'
@@ -254,9 +260,36 @@ def _get_last_modified_date(path):
     return last_date
 
 
+def _load_skill(skill_folder):
+    """
+        Load a registered skill from SKILLS_DIR and report the result and
+        load time on the messagebus.
+
+        Args:
+            skill_folder:   folder of the skill, key in loaded_skills
+        Returns:    seconds it took to load the skill
+    """
+    skill = loaded_skills[skill_folder]
+    start = time.time()
+    skill["loaded"] = True
+    skill["instance"] = load_skill(
+        create_skill_descriptor(skill["path"]), ws, skill["id"])
+    load_time = time.time() - start
+    if skill["instance"]:
+        ws.emit(Message("skill.loaded",
+                        {"skill": skill["id"], "folder": skill_folder,
+                         "load_time": load_time}))
+    else:
+        ws.emit(Message("skill.loaded.fail",
+                        {"skill": skill["id"], "folder": skill_folder,
+                         "load_time": load_time}))
+        skill["do_not_load"] = True
+    return load_time
+
+
 def load_priority():
     global ws, loaded_skills, SKILLS_DIR, PRIORITY_SKILLS, id_counter
-
+    load_times = {}
     if exists(SKILLS_DIR):
         for skill_folder in PRIORITY_SKILLS:
             try:
@@ -270,26 +303,159 @@ def load_priority():
                 # checking if skill is loaded
                 if skill.get("loaded"):
                     continue
-
-                skill["instance"] = load_skill(
-                    create_skill_descriptor(skill["path"]), ws, skill["id"])
-                skill["loaded"] = True
+                load_times[skill_folder] = _load_skill(skill_folder)
             except TypeError:
                 logger.error(skill_folder + " does not seem to exist")
+    return load_times
+
+
+def load_remaining():
+    """
+        Load all skills not loaded by load_priority, independent skills
+        are imported and initialized in parallel on a thread pool.
+
+        Returns:    dict of skill folder -> seconds it took to load
+    """
+    skill_folders = []
+    for skill_folder, skill in loaded_skills.items():
+        if skill_folder in BLACKLISTED_SKILLS or skill.get("loaded") or \
+                skill["do_not_load"]:
+            continue
+        skill["path"] = os.path.join(SKILLS_DIR, skill_folder)
+        # checking if is a skill
+        if not MainModule + ".py" in os.listdir(skill["path"]):
+            continue
+        skill["last_modified"] = _get_last_modified_date(skill["path"])
+        skill_folders.append(skill_folder)
+
+    pool = ThreadPool(max(1, skills_config.get("loader_threads", 4)))
+    try:
+        load_times = pool.map(_load_skill, skill_folders)
+    finally:
+        pool.close()
+    return dict(zip(skill_folders, load_times))
+
+
+if pyinotify is not None:
+    class _SkillsDirHandler(pyinotify.ProcessEvent):
+        """
+            Forwards inotify events in SKILLS_DIR to a WatchSkills thread.
+        """
+        def my_init(self, watcher):
+            self.watcher = watcher
+
+        def process_default(self, event):
+            self.watcher.notify_change(event.pathname)
 
 
 class WatchSkills(Thread):
     """
         Thread function to reload skills when a change is detected.
+
+        Uses inotify (pyinotify) when available so only skills with changed
+        files are checked, otherwise SKILLS_DIR is polled every
+        POLL_INTERVAL seconds.
     """
+    POLL_INTERVAL = 2
+    # wait for bursts of writes (e.g. git pull) to settle, at most
+    # MAX_DEBOUNCE seconds
+    DEBOUNCE = 0.5
+    MAX_DEBOUNCE = 5
+
     def __init__(self):
         super(WatchSkills, self).__init__()
         self._stop_event = Event()
+        self._wake_event = Event()
+        self._changes_lock = RLock()
+        self._changed = set()
+        self.notifier = None
+
+    def start_notifier(self):
+        """
+            Start watching SKILLS_DIR with inotify.
+
+            Returns:    True if inotify is used, False to fall back to polling
+        """
+        if pyinotify is None:
+            return False
+        try:
+            mask = pyinotify.IN_MODIFY | pyinotify.IN_ATTRIB | \
+                pyinotify.IN_CREATE | pyinotify.IN_DELETE | \
+                pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO
+            manager = pyinotify.WatchManager()
+            self.notifier = pyinotify.ThreadedNotifier(
+                manager, _SkillsDirHandler(watcher=self))
+            self.notifier.daemon = True
+            self.notifier.start()
+            watches = manager.add_watch(SKILLS_DIR, mask, rec=True,
+                                        auto_add=True)
+            # failed watches are negative, e.g. inotify watch limit reached
+            failed = [path for path, wd in watches.items() if wd < 0]
+            if not watches or failed:
+                raise OSError("could not watch " +
+                              ", ".join(failed or [SKILLS_DIR]))
+            logger.debug("Watching " + SKILLS_DIR + " with inotify")
+            return True
+        except Exception as e:
+            logger.warning("inotify not available, polling skills: " +
+                           repr(e))
+            if self.notifier:
+                self.notifier.stop()
+                self.notifier = None
+            return False
+
+    def notify_change(self, path):
+        """
+            Mark the skill containing path as changed and wake the watcher.
+
+            Args:
+                path:   changed file or directory inside SKILLS_DIR
+        """
+        relative = os.path.relpath(path, SKILLS_DIR)
+        parts = relative.split(os.sep)
+        if relative.startswith(".") or any(p.startswith(".") for p in parts):
+            return
+        if path.endswith(".pyc") or parts[-1] == "settings.json":
+            return
+        with self._changes_lock:
+            self._changed.add(parts[0])
+        self.wake()
+
+    def wake(self):
+        """
+            Check skills now instead of waiting for the next scan.
+        """
+        self._wake_event.set()
+
+    def _wait_for_changes(self):
+        """
+            Wait for the next scan.
+
+            Returns:    set of changed skill folders, None if every skill
+                        must be checked
+        """
+        if self.notifier is None:
+            self._wake_event.wait(self.POLL_INTERVAL)
+            self._wake_event.clear()
+            return None
+
+        self._wake_event.wait(60)
+        # debounce bursts of file system events
+        deadline = time.time() + self.MAX_DEBOUNCE
+        while self._wake_event.is_set() and time.time() < deadline:
+            self._wake_event.clear()
+            self._wake_event.wait(self.DEBOUNCE)
+        self._wake_event.clear()
+        with self._changes_lock:
+            changed, self._changed = self._changed, set()
+        return changed
 
     def run(self):
         global ws, loaded_skills, last_modified_skill, \
             id_counter
 
+        self.start_notifier()
+
         # Scan the folder that contains Skills.
         list = filter(lambda x: os.path.isdir(
             os.path.join(SKILLS_DIR, x)), os.listdir(SKILLS_DIR))
@@ -304,12 +470,24 @@ class WatchSkills(Thread):
                                                "reload_request": False,
                                                "shutdown": False}
 
-        # Load priority skills first
-        load_priority()
+        # Load priority skills first, in order, then everything else
+        start = time.time()
+        load_times = load_priority()
+        load_times.update(load_remaining())
+        modified_dates = [skill.get("last_modified", 0)
+                          for skill in loaded_skills.values()]
+        if modified_dates:
+            last_modified_skill = max(modified_dates)
+        ws.emit(Message("mycroft.skills.initialized",
+                        {"load_time": time.time() - start,
+                         "skills": load_times}))
 
         # Scan the file folder that contains Skills.  If a Skill is updated,
         # unload the existing version from memory and reload from the disk.
         while not self._stop_event.is_set():
+            changed = self._wait_for_changes()
+            if self._stop_event.is_set():
+                break
             if exists(SKILLS_DIR):
                 # checking skills dir and getting all skills there
                 list = filter(lambda x: os.path.isdir(
@@ -361,6 +539,11 @@ class WatchSkills(Thread):
                     # check if we are supposed to load this skill
                     elif skill["do_not_load"]:
                         continue
+                    # nothing changed on disk for this loaded skill
+                    if changed is not None and skill.get("loaded") and \
+                            skill_folder not in changed and \
+                            not skill["reload_request"]:
+                        continue
                     skill["path"] = os.path.join(SKILLS_DIR, skill_folder)
                     # checking if is a skill
                     if not MainModule + ".py" in os.listdir(skill["path"]):
@@ -419,19 +602,7 @@ class WatchSkills(Thread):
 
                     # load skill
                     if not skill["do_not_reload"]:
-                        skill["loaded"] = True
-                        skill["instance"] = load_skill(
-                            create_skill_descriptor(skill["path"]), ws,
-                            skill["id"])
-
-                        if skill["instance"]:
-                            ws.emit(Message("skill.loaded",
-                                            {"skill": skill["id"]}))
-                        else:
-                            ws.emit(Message("skill.loaded.fail",
-                                            {"skill": skill["id"]}))
-                            skill["do_not_load"] = True
-                    loaded_skills[skill_folder] = skill
+                        _load_skill(skill_folder)
 
             # get the last modified skill
             modified_dates = map(lambda x: x.get("last_modified"),
@@ -439,11 +610,11 @@ class WatchSkills(Thread):
             if len(modified_dates) > 0:
                 last_modified_skill = max(modified_dates)
 
-            # Pause briefly before beginning next scan
-            time.sleep(2)
-
     def stop(self):
         self._stop_event.set()
+        self.wake()
+        if self.notifier:
+            self.notifier.stop()
 
 
 def handle_shutdown_skill_request(message):
@@ -457,6 +628,8 @@ def handle_shutdown_skill_request(message):
             loaded_skills[skill]["reload_request"] = False
             # loaded_skills[skill]["loaded"] = False
             ws.emit(Message("shutdown_skill_response", {"status": "waiting", "skill_id": skill_id}))
+            if skill_reload_thread:
+                skill_reload_thread.wake()
             break
 
 
@@ -470,6 +643,8 @@ def handle_reload_skill_request(message):
             loaded_skills[skill]["shutdown"] = False
             loaded_skills[skill]["loaded"] = False
             ws.emit(Message("reload_skill_response", {"status": "waiting", "skill_id": skill_id}))
+            if skill_reload_thread:
+                skill_reload_thread.wake()
             break
 
 
@@ -486,17 +661,18 @@ def handle_conversation_request(message):
             except:
                 logger.error("converse requested but skill not loaded")
                 ws.emit(Message("skill.converse.response", {
-                    "skill_id": 0, "result": False}))
+                    "skill_id": 0, "result": False}, message.context))
                 return
             try:
                 result = instance.converse(utterances, lang)
                 ws.emit(Message("skill.converse.response", {
-                    "skill_id": skill_id, "result": result}))
+                    "skill_id": skill_id, "result": result},
+                    message.context))
                 return
             except:
                 logger.error("Converse method malformed for skill " + str(skill_id))
     ws.emit(Message("skill.converse.response", {
-        "skill_id": 0, "result": False}))
+        "skill_id": 0, "result": False}, message.context))
 
 
 def handle_loaded_skills_request(message):
@@ -520,7 +696,7 @@ def main():
     lock = Lock('skills')  # prevent multiple instances of this service
 
     # Connect this Skill management process to the websocket
-    ws = WebsocketClient()
+    ws = WebsocketClient(filtered=True)
     ConfigurationManager.init(ws)
 
     ignore_logs = ConfigurationManager.instance().get("ignore_logs")
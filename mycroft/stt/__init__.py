@@ -15,8 +15,15 @@
 # You should have received a copy of the GNU General Public License
 # along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
 
+import audioop
+from Queue import Queue
 from abc import ABCMeta, abstractmethod
+from os.path import dirname, join, realpath
+from threading import Thread
 
+import os
+import speech_recognition
+from concurrent.futures import Future
 from speech_recognition import Recognizer, UnknownValueError, RequestError
 
 from mycroft.api import STTApi
@@ -53,6 +60,57 @@ class STT(object):
         pass
 
 
+class StreamingSTT(STT):
+    """
+    STT engine able to transcribe audio while it is being recorded, the
+    recognizer feeds every recorded chunk to stream_data
+    """
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def stream_start(self, sample_rate=16000, sample_width=2,
+                     language=None):
+        """
+        Begin the transcription of an utterance
+
+        Args:
+            sample_rate (int): sample rate of the audio
+            sample_width (int): bytes per sample
+            language (str): language of the utterance
+        """
+        pass
+
+    @abstractmethod
+    def stream_data(self, data):
+        """
+        Feed raw audio of the current utterance
+
+        Args:
+            data (str): mono raw audio in the format given to stream_start
+        Returns:
+            str: partial transcription, None if not available
+        """
+        pass
+
+    @abstractmethod
+    def stream_stop(self):
+        """
+        End the utterance without waiting for its transcription
+
+        Returns:
+            Future: result() is the final transcription, None if nothing
+                    was understood, it raises if the transcription failed
+        """
+        pass
+
+    @staticmethod
+    def transcription(text):
+        """ Future of a transcription that is already known """
+        future = Future()
+        future.set_result(text)
+        return future
+
+
 class TokenSTT(STT):
     __metaclass__ = ABCMeta
 
@@ -115,9 +173,16 @@ class MycroftSTT(STT):
             return self.api.stt(audio.get_flac_data(), self.lang, 1)[0]
 
 
-class KaldiSTT(STT):
+class KaldiSTT(StreamingSTT):
+    """
+    Client of the kaldi-gstreamer-server HTTP API, streamed audio is sent
+    with chunked transfer encoding while the utterance is recorded
+    """
+
     def __init__(self):
         super(KaldiSTT, self).__init__()
+        self.stream_queue = None
+        self.stream_future = None
 
     def execute(self, audio, language=None):
         language = language or self.lang
@@ -131,10 +196,94 @@ class KaldiSTT(STT):
         except:
             return None
 
-
-class PocketSphinxSTT(STT):
+    def stream_start(self, sample_rate=16000, sample_width=2,
+                     language=None):
+        queue = self.stream_queue = Queue()
+        future = self.stream_future = Future()
+        content_type = "audio/x-raw, layout=(string)interleaved, " \
+                       "rate=(int)%d, format=(string)S%dLE, " \
+                       "channels=(int)1" % (sample_rate, sample_width * 8)
+
+        def chunks():
+            chunk = queue.get()
+            while chunk is not None:
+                yield chunk
+                chunk = queue.get()
+
+        def upload():
+            try:
+                response = post(self.config.get("uri"), data=chunks(),
+                                headers={"Content-Type": content_type})
+                future.set_result(self.get_response(response))
+            except Exception as e:
+                LOG.error("Kaldi streaming error: " + repr(e))
+                future.set_exception(e)
+
+        upload_thread = Thread(target=upload)
+        upload_thread.daemon = True
+        upload_thread.start()
+
+    def stream_data(self, data):
+        self.stream_queue.put(data)
+        # the HTTP API only returns the final result
+        return None
+
+    def stream_stop(self):
+        # the upload thread resolves the future once kaldi answered
+        self.stream_queue.put(None)
+        return self.stream_future
+
+
+class PocketSphinxSTT(StreamingSTT):
     def __init__(self):
         super(PocketSphinxSTT, self).__init__()
+        self.decoder = None
+        self.decoder_language = None
+        self.stream_format = None
+        self.rate_state = None
+
+    def create_decoder(self, language):
+        """ Decoder using the models bundled with speech_recognition """
+        from pocketsphinx import pocketsphinx
+        language_directory = join(
+            dirname(realpath(speech_recognition.__file__)),
+            "pocketsphinx-data", language)
+        config = pocketsphinx.Decoder.default_config()
+        config.set_string("-hmm", join(language_directory, "acoustic-model"))
+        config.set_string("-lm", join(language_directory,
+                                      "language-model.lm.bin"))
+        config.set_string("-dict", join(language_directory,
+                                        "pronounciation-dictionary.dict"))
+        config.set_string("-logfn", os.devnull)
+        return pocketsphinx.Decoder(config)
+
+    def stream_start(self, sample_rate=16000, sample_width=2,
+                     language=None):
+        # same default as recognize_sphinx used by execute
+        language = language or "en-US"
+        if self.decoder is None or self.decoder_language != language:
+            self.decoder = self.create_decoder(language)
+            self.decoder_language = language
+        self.stream_format = (sample_rate, sample_width)
+        self.rate_state = None
+        self.decoder.start_utt()
+
+    def stream_data(self, data):
+        # the models require 16-bit 16 kHz audio
+        sample_rate, sample_width = self.stream_format
+        if sample_width != 2:
+            data = audioop.lin2lin(data, sample_width, 2)
+        if sample_rate != 16000:
+            data, self.rate_state = audioop.ratecv(
+                data, 2, 1, sample_rate, 16000, self.rate_state)
+        self.decoder.process_raw(data, False, False)
+        hyp = self.decoder.hyp()
+        return hyp.hypstr if hyp else None
+
+    def stream_stop(self):
+        self.decoder.end_utt()
+        hyp = self.decoder.hyp()
+        return self.transcription(hyp.hypstr if hyp and hyp.hypstr else None)
 
     def execute(self, audio, language=None):
         text = None
@@ -14,9 +14,8 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
-import hashlib
 import random
-from Queue import Queue, Empty
+from Queue import Queue, Empty, Full
 from threading import Thread
 from time import time, sleep
 
@@ -29,6 +28,7 @@ import mycroft.util
 from mycroft.client.enclosure.api import EnclosureAPI
 from mycroft.configuration import ConfigurationManager
 from mycroft.messagebus.message import Message
+from mycroft.tts.cache import TTSCache, get_tts_cache
 from mycroft.util import play_wav, play_mp3, check_for_signal, create_signal
 from mycroft.util.log import LOG
 import re
@@ -48,6 +48,8 @@ class PlaybackThread(Thread):
         self._terminated = False
         self._processing_queue = False
         self._clear_visimes = False
+        # incremented every time pending playbacks are dropped
+        self.generation = 0
 
     def init(self, tts):
         self.tts = tts
@@ -56,6 +58,7 @@ class PlaybackThread(Thread):
         """
             Remove all pending playbacks.
         """
+        self.generation += 1
         while not self.queue.empty():
             self.queue.get()
         try:
@@ -70,7 +73,11 @@ class PlaybackThread(Thread):
         """
         while not self._terminated:
             try:
-                snd_type, data, visimes = self.queue.get(timeout=2)
+                snd_type, data, visimes, generation = \
+                    self.queue.get(timeout=2)
+                if generation != self.generation:
+                    # queued after the pending playbacks were cleared
+                    continue
                 self.blink(0.5)
                 if not self._processing_queue:
                     self._processing_queue = True
@@ -144,6 +151,9 @@ class TTS(object):
     ``execute(sentence)`` and ``validate_ssml(sentence)`` functions.
     """
     __metaclass__ = ABCMeta
+    # sentences get_tts_batch synthesizes at once, engines that benefit
+    # from batched synthesis override get_tts_batch and raise this
+    batch_size = 1
 
     def __init__(self, lang, config, validator):
         super(TTS, self).__init__()
@@ -154,10 +164,16 @@ class TTS(object):
         self.validator = validator
         self.enclosure = None
         random.seed()
-        self.queue = Queue()
+        tts_config = ConfigurationManager.get().get("tts", {})
+        # synthesis blocks while this many chunks are waiting for playback
+        self.queue = Queue(max(1, tts_config.get("lookahead", 2)))
         self.playback = PlaybackThread(self.queue)
         self.playback.start()
-        self.clear_cache()
+        cache_config = tts_config.get("cache", {})
+        cache_path = cache_config.get("path")
+        self.cache = get_tts_cache(
+            cache_path and os.path.expanduser(cache_path),
+            int(cache_config.get("max_size_mb", 50) * 1024 * 1024))
         self.ssml_support = self.config.get("ssml", False)
         default_tags = ["speak", "lang", "p", "phoneme", "prosody", "break",
                         "sub"]
@@ -228,6 +244,20 @@ class TTS(object):
         # return text with supported ssml tags only
         return utterance.replace("  ", " ")
 
+    def get_tts_batch(self, sentences, wav_files):
+        """
+            Synthesize several sentences, engines with batch_size > 1
+            should implement this.
+
+            Args:
+                sentences(list): Sentences to synthesize
+                wav_files(list): output file of each sentence
+
+            Returns: list of (wav_file, phoneme) tuples
+        """
+        return [self.get_tts(sentence, wav_file)
+                for sentence, wav_file in zip(sentences, wav_files)]
+
     def validate_and_execute(self, sentence):
         """
             validate ssml, execute text to speech
@@ -238,89 +268,124 @@ class TTS(object):
         sentence = self.validate_ssml(sentence)
         self.execute(sentence)
 
+    def validate_and_execute_batch(self, sentences):
+        """
+            validate ssml, execute text to speech of several sentences
+
+            Args:
+                sentences(list): Sentences to execute
+        """
+        self.execute_batch([self.validate_ssml(s) for s in sentences])
+
     def execute(self, sentence):
         """
             Convert sentence to speech.
 
-            The method caches results if possible using the hash of the
-            sentence.
+            The method caches results in the TTS cache using the hash of
+            the engine, voice, lang and sentence.
 
             Args:
                 sentence:   Sentence to be spoken
         """
-        key = str(hashlib.md5(sentence.encode('utf-8', 'ignore')).hexdigest())
-        wav_file = os.path.join(mycroft.util.get_cache_directory("tts"),
-                                key + '.' + self.type)
-
-        if os.path.exists(wav_file):
-            LOG.debug("TTS cache hit")
-            phonemes = self.load_phonemes(key)
-        else:
-            wav_file, phonemes = self.get_tts(sentence, wav_file)
-            if phonemes:
-                self.save_phonemes(key, phonemes)
+        generation = self.playback.generation
+        wav_file, phonemes = self.synthesize([sentence])[0]
+        if wav_file:
+            self.queue_audio(self.type, wav_file, self.visime(phonemes),
+                             generation)
 
-        self.queue.put((self.type, wav_file, self.visime(phonemes)))
-
-    def visime(self, phonemes):
+    def execute_batch(self, sentences):
         """
-            Create visimes from phonemes. Needs to be implemented for all
-            tts backend
+            Convert several sentences to speech, synthesizing up to
+            batch_size sentences at once. Engines with batch_size 1 get
+            one execute call per sentence.
 
             Args:
-                phonemes(str): String with phoneme data
+                sentences:  Sentences to be spoken, in order
         """
-        return None
-
-    def clear_cache(self):
-        """ Remove all cached files. """
-        if not os.path.exists(mycroft.util.get_cache_directory('tts')):
+        if self.batch_size <= 1:
+            for sentence in sentences:
+                self.execute(sentence)
             return
-        for f in os.listdir(mycroft.util.get_cache_directory("tts")):
-            file_path = os.path.join(mycroft.util.get_cache_directory("tts"),
-                                     f)
-            if os.path.isfile(file_path):
-                os.unlink(file_path)
-
-    def save_phonemes(self, key, phonemes):
+        generation = self.playback.generation
+        for i in range(0, len(sentences), self.batch_size):
+            for wav_file, phonemes in self.synthesize(
+                    sentences[i:i + self.batch_size]):
+                if wav_file and not self.queue_audio(
+                        self.type, wav_file, self.visime(phonemes),
+                        generation):
+                    return
+
+    def synthesize(self, sentences):
         """
-            Cache phonemes
+            Get audio of several sentences from the TTS cache, sentences
+            not cached are synthesized in one get_tts_batch call.
 
             Args:
-                key:        Hash key for the sentence
-                phonemes:   phoneme string to save
+                sentences:  Sentences to synthesize
+
+            Returns: list of (wav_file, phoneme) tuples
+        """
+        engine = self.__class__.__name__
+        keys = [TTSCache.get_key(sentence, engine, self.voice, self.lang)
+                for sentence in sentences]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if not result]
+        if len(missing) < len(results):
+            LOG.debug("TTS cache hit (%d hits, %d misses)" %
+                      (self.cache.hits, self.cache.misses))
+        if missing:
+            synthesized = self.get_tts_batch(
+                [sentences[i] for i in missing],
+                [self.cache.get_path(keys[i], self.type) for i in missing])
+            for i, (wav_file, phonemes) in zip(missing, synthesized):
+                if wav_file:
+                    self.cache.put(keys[i], wav_file, phonemes,
+                                   engine=engine, voice=self.voice,
+                                   lang=self.lang)
+                results[i] = (wav_file, phonemes)
+        return results
+
+    def queue_audio(self, snd_type, audio_file, visimes, generation):
         """
-        # Clean out the cache as needed
-        cache_dir = mycroft.util.get_cache_directory("tts")
-        mycroft.util.curate_cache(cache_dir)
+            Queue audio for the playback thread, blocks while the playback
+            queue is full.
 
-        pho_file = os.path.join(cache_dir, key + ".pho")
-        try:
-            with open(pho_file, "w") as cachefile:
-                cachefile.write(phonemes)
-        except:
-            LOG.debug("Failed to write .PHO to cache")
-            pass
+            Args:
+                snd_type:   "wav" or "mp3"
+                audio_file: file to play
+                visimes:    visime data for the enclosure
+                generation: playback.generation when synthesis started,
+                            audio is dropped if the queue was cleared since
+
+            Returns:
+                True if the audio was queued
+        """
+        while self.playback.generation == generation:
+            try:
+                self.queue.put((snd_type, audio_file, visimes, generation),
+                               timeout=0.5)
+                # the playback thread skips audio of an old generation
+                return self.playback.generation == generation
+            except Full:
+                pass
+        return False
 
-    def load_phonemes(self, key):
+    def visime(self, phonemes):
         """
-            Load phonemes from cache file.
+            Create visimes from phonemes. Needs to be implemented for all
+            tts backend
 
             Args:
-                Key:    Key identifying phoneme cache
+                phonemes(str): String with phoneme data
         """
-        pho_file = os.path.join(mycroft.util.get_cache_directory("tts"),
-                                key + ".pho")
-        if os.path.exists(pho_file):
-            try:
-                with open(pho_file, "r") as cachefile:
-                    phonemes = cachefile.read().strip()
-                return phonemes
-            except:
-                LOG.debug("Failed to read .PHO from cache")
         return None
 
+    def clear_cache(self):
+        """ Remove all cached files. """
+        self.cache.clear()
+
     def __del__(self):
+        self.cache.close()
         self.playback.stop()
         self.playback.join()
 
@@ -371,39 +436,78 @@ class TTSValidator(object):
 
 
 class TTSFactory(object):
-    from mycroft.tts.espeak_tts import ESpeak
-    from mycroft.tts.fa_tts import FATTS
-    from mycroft.tts.google_tts import GoogleTTS
-    from mycroft.tts.mary_tts import MaryTTS
-    from mycroft.tts.mimic_tts import Mimic
-    from mycroft.tts.spdsay_tts import SpdSay
-    from mycroft.tts.morse_code_tts import MorseCode
-    from mycroft.tts.beepspeak_tts import BeepSpeak
-    from mycroft.tts.pico_tts import Pico
-    from mycroft.tts.deep_throat_tts import DeepThroat
-    from mycroft.tts.tacotron_tts import Tacotron
-    from mycroft.tts.polly_tts import Polly
-    from mycroft.tts.bing_tts import BingTTS
-    from mycroft.tts.ibm_tts import WatsonTTS
-    #from mycroft.tts.pymimic_tts import Pymimic
-
+    # engine name -> "module:Class", engines are only imported when created
     CLASSES = {
-        "mimic": Mimic,
-        "google": GoogleTTS,
-        "marytts": MaryTTS,
-        "fatts": FATTS,
-        "espeak": ESpeak,
-        "spdsay": SpdSay,
-        #"pymimic": Pymimic,
-        "morse": MorseCode,
-        "beep_speak": BeepSpeak,
-        "pico": Pico,
-        "deep_throat": DeepThroat,
-        "tacotron": Tacotron,
-        "polly": Polly,
-        "bing": BingTTS,
-        "ibm": WatsonTTS
+        "mimic": "mycroft.tts.mimic_tts:Mimic",
+        "google": "mycroft.tts.google_tts:GoogleTTS",
+        "marytts": "mycroft.tts.mary_tts:MaryTTS",
+        "fatts": "mycroft.tts.fa_tts:FATTS",
+        "espeak": "mycroft.tts.espeak_tts:ESpeak",
+        "spdsay": "mycroft.tts.spdsay_tts:SpdSay",
+        #"pymimic": "mycroft.tts.pymimic_tts:Pymimic",
+        "morse": "mycroft.tts.morse_code_tts:MorseCode",
+        "beep_speak": "mycroft.tts.beepspeak_tts:BeepSpeak",
+        "pico": "mycroft.tts.pico_tts:Pico",
+        "deep_throat": "mycroft.tts.deep_throat_tts:DeepThroat",
+        "tacotron": "mycroft.tts.tacotron_tts:Tacotron",
+        "polly": "mycroft.tts.polly_tts:Polly",
+        "bing": "mycroft.tts.bing_tts:BingTTS",
+        "ibm": "mycroft.tts.ibm_tts:WatsonTTS"
     }
+    # setuptools entry point group of engines installed as plugins
+    ENTRY_POINT_GROUP = "mycroft.plugin.tts"
+
+    @staticmethod
+    def load_class(path):
+        """
+        Import an engine class
+
+        Args:
+            path (str): "module:Class" path of the engine
+        Returns:
+            the engine class
+        """
+        module_name, class_name = path.split(":")
+        module = __import__(module_name, fromlist=[class_name])
+        return getattr(module, class_name)
+
+    @staticmethod
+    def find_plugin(name):
+        """
+        Find an engine installed as a plugin, i.e. registered in the
+        mycroft.plugin.tts entry point group
+
+        Args:
+            name (str): engine name
+        Returns:
+            the engine class, None if no plugin has that name
+        """
+        try:
+            import pkg_resources
+        except ImportError:
+            return None
+        for entry_point in pkg_resources.iter_entry_points(
+                TTSFactory.ENTRY_POINT_GROUP, name):
+            return entry_point.load()
+        return None
+
+    @staticmethod
+    def get_class(name):
+        """
+        Get the class of an engine, builtin engines are looked up before
+        plugins
+
+        Args:
+            name (str): engine name, the "module" of the tts config
+        Returns:
+            the engine class, None if unknown
+        """
+        clazz = TTSFactory.CLASSES.get(name)
+        if clazz is None:
+            clazz = TTSFactory.find_plugin(name)
+        elif isinstance(clazz, basestring):
+            clazz = TTSFactory.load_class(clazz)
+        return clazz
 
     @staticmethod
     def create():
@@ -416,13 +520,23 @@ class TTSFactory(object):
         "tts": {
             "module": <engine_name>
         }
+
+        Only the selected engine is imported, engines not in CLASSES are
+        looked up in the mycroft.plugin.tts entry point group.
         """
         config = ConfigurationManager.get()
         lang = config.get("lang", "en-us")
         tts_module = config.get('tts', {}).get('module', 'mimic')
         tts_config = config.get('tts', {}).get(tts_module, {})
         tts_lang = tts_config.get('lang', lang)
-        clazz = TTSFactory.CLASSES.get(tts_module)
+        start = time()
+        clazz = TTSFactory.get_class(tts_module)
+        if clazz is None:
+            raise ValueError("Unknown TTS engine: " + tts_module)
+        loaded = time()
         tts = clazz(tts_lang, tts_config)
         tts.validator.validate()
+        end = time()
+        LOG.info("TTS engine %s ready in %.3fs (import %.3fs, init %.3fs)" %
+                 (tts_module, end - start, loaded - start, end - loaded))
         return tts
@@ -0,0 +1,251 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+import atexit
+import hashlib
+import json
+import re
+from threading import Lock, RLock
+from time import time
+
+import os
+import os.path
+
+from mycroft.filesystem import FileSystemAccess
+from mycroft.util.log import LOG
+
+__author__ = 'jarbas'
+
+
+def tts_cache_directory():
+    """
+    Default directory of the TTS cache, kept under ~/.mycroft so it
+    survives reboots, unlike get_cache_directory which may be cleared at
+    any time.
+    """
+    return FileSystemAccess("tts_cache").path
+
+
+class TTSCache(object):
+    """
+    Persistent cache of synthesized audio, bounded in bytes.
+
+    Audio files live in the cache directory, an index file maps every key
+    to its engine, voice, lang, phonemes, size and last access time.
+    The least recently used entries are removed when the cache grows
+    past max_bytes. The index is reloaded on startup, so cached
+    sentences survive restarts.
+
+    Args:
+        directory (str): cache directory, default is tts_cache_directory()
+        max_bytes (int): byte budget of the cache
+    """
+    INDEX_FILE = "index.json"
+    # seconds between index writes, pending changes are written on close
+    SAVE_INTERVAL = 30
+    # files remove_orphans may delete, audio named after a cache key
+    ORPHAN_NAME = re.compile(r"^[0-9a-f]{32}\.(wav|mp3)$")
+    # untracked audio younger than this may belong to another process
+    ORPHAN_AGE = 3600
+
+    def __init__(self, directory=None, max_bytes=50 * 1024 * 1024):
+        self.directory = directory or tts_cache_directory()
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.directory, self.INDEX_FILE)
+        self.lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        self.last_save = 0
+        self.dirty = False
+        self.index = self.load_index()
+        self.total_bytes = sum(e["size"] for e in self.index.values())
+        self.remove_orphans()
+
+    @staticmethod
+    def get_key(sentence, engine, voice, lang):
+        """
+        Cache key of a sentence, different engines, voices or languages
+        never share audio
+        """
+        data = u"|".join([unicode(engine), unicode(voice), unicode(lang),
+                          sentence if isinstance(sentence, unicode)
+                          else sentence.decode('utf-8', 'ignore')])
+        return hashlib.md5(data.encode('utf-8')).hexdigest()
+
+    def get_path(self, key, extension):
+        return os.path.join(self.directory, key + "." + extension)
+
+    def load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            return {}
+        # drop entries whose files were removed
+        return dict((key, entry) for key, entry in index.items()
+                    if os.path.exists(self.get_path(key, entry["type"])))
+
+    def remove_orphans(self):
+        """
+        Delete cached audio not tracked by the index, e.g. older caches.
+        Other files, like .pho files, and audio modified in the last
+        ORPHAN_AGE seconds are kept.
+        """
+        oldest = time() - self.ORPHAN_AGE
+        for filename in os.listdir(self.directory):
+            key = os.path.splitext(filename)[0]
+            if key in self.index or not self.ORPHAN_NAME.match(filename):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                if os.path.getmtime(path) < oldest:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def save_index(self):
+        with self.lock:
+            try:
+                tmp_path = self.index_path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(self.index, f)
+                os.rename(tmp_path, self.index_path)
+                self.dirty = False
+                self.last_save = time()
+            except (IOError, OSError) as e:
+                LOG.warning("Could not save TTS cache index: " + repr(e))
+
+    def get(self, key):
+        """
+        Get cached audio
+
+        Args:
+            key (str): key returned by get_key
+        Returns:
+            (audio_file, phonemes) tuple, None if not cached
+        """
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            audio_file = self.get_path(key, entry["type"])
+            if not os.path.exists(audio_file):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["last_access"] = time()
+            self.changed()
+            return audio_file, entry.get("phonemes")
+
+    def put(self, key, audio_file, phonemes=None, **metadata):
+        """
+        Add synthesized audio to the cache
+
+        Args:
+            key (str): key returned by get_key
+            audio_file (str): audio file, must be get_path(key, type)
+            phonemes (str): phoneme data of the audio
+            metadata: engine, voice and lang stored in the index
+        """
+        audio_type = os.path.splitext(audio_file)[1][1:]
+        if audio_file != self.get_path(key, audio_type) or \
+                not os.path.exists(audio_file):
+            return
+        with self.lock:
+            self._remove(key, delete_files=False)
+            entry = dict(metadata)
+            entry.update({
+                "type": audio_type,
+                "phonemes": phonemes,
+                "size": os.path.getsize(audio_file),
+                "last_access": time()
+            })
+            self.index[key] = entry
+            self.total_bytes += entry["size"]
+            self.evict()
+            self.changed()
+
+    def changed(self):
+        """ Save the index unless it was saved in the last SAVE_INTERVAL """
+        with self.lock:
+            self.dirty = True
+            if time() - self.last_save > self.SAVE_INTERVAL:
+                self.save_index()
+
+    def evict(self):
+        """ Remove least recently used entries until under budget """
+        with self.lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+            entries = sorted(self.index.items(),
+                             key=lambda item: item[1]["last_access"])
+            for key, entry in entries:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self._remove(key)
+
+    def _remove(self, key, delete_files=True):
+        entry = self.index.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry["size"]
+        if delete_files:
+            try:
+                os.remove(self.get_path(key, entry["type"]))
+            except OSError:
+                pass
+
+    def clear(self):
+        """ Remove all cached files """
+        with self.lock:
+            for key in list(self.index):
+                self._remove(key)
+            self.save_index()
+
+    def close(self):
+        """ Persist pending changes of the index """
+        with self.lock:
+            if self.dirty:
+                self.save_index()
+
+
+_caches = {}
+_caches_lock = Lock()
+
+
+def get_tts_cache(directory=None, max_bytes=50 * 1024 * 1024):
+    """
+    Get the TTSCache of a directory, shared by every TTS instance of the
+    process so a single index tracks the directory
+
+    Args:
+        directory (str): cache directory, default is tts_cache_directory()
+        max_bytes (int): byte budget of the cache
+    Returns:
+        TTSCache
+    """
+    directory = directory or tts_cache_directory()
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = TTSCache(directory, max_bytes)
+            atexit.register(cache.close)
+        else:
+            cache.max_bytes = max_bytes
+            cache.evict()
+        return cache
@@ -18,7 +18,6 @@
 
 from mycroft.tts import TTS, TTSValidator
 from mycroft.util.log import getLogger
-from mycroft.util import play_wav
 
 __author__ = 'jarbas'
 
@@ -29,11 +28,13 @@ class DeepThroat(TTS):
     def __init__(self, lang, voice):
         super(DeepThroat, self).__init__(lang, voice,
                                          DeepThroatValidator(self))
-        from jarbas_utils.deep_throat import say
-        self.synth = say
+        from jarbas_utils import deep_throat
+        self.synth = deep_throat.say
+        if deep_throat.numpy is not None:
+            deep_throat.precompute_phoneme_arrays()
+        self.type = "wav"
 
-    def execute(self, sentence, output="/tmp/deep_throat_tts.wav"):
-        self.begin_audio()
+    def get_tts(self, sentence, wav_file):
         try:
             mode_file_output = True
             verbose = False
@@ -41,16 +42,16 @@ class DeepThroat(TTS):
             self.synth(
                 text=sentence,
                 save_to_file=mode_file_output,
-                filename_output=output,
+                filename_output=wav_file,
                 explain=verbose,
                 translate_numbers=mode_translate_numbers
             )
-            play_wav(output)
         except Exception as e:
             LOGGER.error(e)
             LOGGER.error("Install deep_throat by running "
                          "/JarbasAI/scripts/install_deep_throat.sh")
-        self.end_audio()
+            return None, None
+        return wav_file, None
 
 
 class DeepThroatValidator(TTSValidator):
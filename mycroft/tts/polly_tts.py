@@ -38,7 +38,7 @@ class Polly(TTS):
         except:
             logger.error("Missing boto3 python requirement for PollyTTS")
         # FS cache
-        self.cache = self.config.get("cache", True)
+        self.use_cache = self.config.get("cache", True)
         self.key_id = self.config.get("key_id", '')
         self.key = self.config.get("key", '')
         self.region = self.config.get("region", 'us-west-2')
@@ -73,7 +73,7 @@ class Polly(TTS):
         file_name = '{0}.{1}'.format(hash, output_format)
         output = os.path.join(gettempdir(), file_name)
 
-        if self.cache and os.path.isfile(output):
+        if self.use_cache and os.path.isfile(output):
             logger.info('Using file {0}'.format(output))
             return output
 
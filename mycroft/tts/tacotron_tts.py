@@ -17,16 +17,32 @@
 
 
 import time
+from threading import Lock
 from mycroft.tts import TTS, TTSValidator
 from mycroft.util.log import getLogger
 from mycroft.configuration import ConfigurationManager
-from mycroft.util import play_wav
 from mycroft import MYCROFT_ROOT_PATH as root_path
 
 __author__ = 'jarbas'
 
 LOGGER = getLogger("Tacotron")
 
+# loaded synthesizers by checkpoint path, kept across Tacotron instances
+# since loading and warming up the model takes several seconds
+_synthesizers = {}
+_synthesizers_lock = Lock()
+
+
+def get_synthesizer(path, workers=None):
+    with _synthesizers_lock:
+        if path not in _synthesizers:
+            from jarbas_models.tf_tacotron.synthesizer import Synthesizer
+            synthesizer = Synthesizer()
+            synthesizer.load(path, workers=workers)
+            synthesizer.warm_up()
+            _synthesizers[path] = synthesizer
+        return _synthesizers[path]
+
 
 class Tacotron(TTS):
     def __init__(self, lang, voice):
@@ -37,33 +53,38 @@ class Tacotron(TTS):
         path = root_path + "/jarbas_models/tf_tacotron/trained/" + model + \
                "/model.ckpt"
         path = config.get("path", path)
+        self.batch_size = config.get("batch_size", 4)
         try:
-            from jarbas_models.tf_tacotron.synthesizer import Synthesizer
-            self.synthesizer = Synthesizer()
-            self.synthesizer.load(path)
+            self.synthesizer = get_synthesizer(path, config.get("workers"))
             LOGGER.info("Loaded Tacotron")
         except Exception as e:
             LOGGER.error(e)
             LOGGER.error("Install tacotron by running "
                          "/JarbasAI/scripts/install_tacotron.sh")
             self.synthesizer = None
+        self.type = "wav"
+
+    def get_tts(self, sentence, wav_file):
+        return self.get_tts_batch([sentence], [wav_file])[0]
 
-    def execute(self, sentence, output="/tmp/tacotron_tts.wav"):
+    def get_tts_batch(self, sentences, wav_files):
         if self.synthesizer is None:
             LOGGER.error("Tacotron failed to load")
-            return
-        self.begin_audio()
+            return [(None, None)] * len(sentences)
         try:
             start = time.time()
             LOGGER.info("Tacotron, Synthethize")
-            self.synthesizer.synthesize(sentence, output)
-            play_wav(output)
+            wavs = self.synthesizer.synthesize_batch(sentences)
             LOGGER.info("elapsed time" + str(time.time() - start))
         except Exception as e:
             LOGGER.error(e)
             LOGGER.error("Install tacotron by running "
                          "/JarbasAI/scripts/install_tacotron.sh")
-        self.end_audio()
+            return [(None, None)] * len(sentences)
+        for wav, wav_file in zip(wavs, wav_files):
+            with open(wav_file, "wb") as f:
+                f.write(wav)
+        return [(wav_file, None) for wav_file in wav_files]
 
 
 class TacotronValidator(TTSValidator):
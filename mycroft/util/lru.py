@@ -0,0 +1,85 @@
+# Copyright 2017 Mycroft AI, Inc.
+#
+# This file is part of Mycroft Core.
+#
+# Mycroft Core is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Mycroft Core is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Mycroft Core.  If not, see <http://www.gnu.org/licenses/>.
+from collections import OrderedDict
+from threading import Lock
+
+__author__ = 'jarbas'
+
+
+class LRUCache(object):
+    """
+    Thread safe in memory cache holding at most max_size items, the least
+    recently used item is dropped when full.
+
+    generation changes on every clear, a value computed before a clear can
+    be put with the generation read before computing it and is dropped if
+    the cache was cleared in the meantime.
+
+    Args:
+        max_size (int): maximum number of cached items
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.lock = Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.items[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value, generation=None):
+        """
+        Cache value under key
+
+        Args:
+            generation (int): self.generation when value was computed, the
+                              value is not cached if it changed since
+        Returns:
+            bool: True if the value was cached
+        """
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self.items.pop(key, None)
+            self.items[key] = value
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.generation += 1
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.items
+
+    def __len__(self):
+        with self.lock:
+            return len(self.items)
@@ -1,5 +1,11 @@
+import fcntl
+import hashlib
+import mmap
+import struct
 import tempfile
 import time
+import zlib
+from threading import Lock
 
 import os
 import os.path
@@ -70,6 +76,197 @@ def create_file(filename):
         f.write('')
 
 
+class SignalBackend(object):
+    """ Storage of named signals shared by the processes of the host """
+
+    def create(self, signal_name):
+        """ Set a signal, returns True on success """
+        raise NotImplementedError
+
+    def get(self, signal_name):
+        """ Creation time of a signal, None if it is not set """
+        raise NotImplementedError
+
+    def remove(self, signal_name):
+        raise NotImplementedError
+
+
+class FileSignalBackend(SignalBackend):
+    """
+    One file per signal, the creation time is the file ctime
+
+    Args:
+        directory (str): folder of the signal files
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def create(self, signal_name):
+        try:
+            create_file(os.path.join(self.directory, signal_name))
+            return True
+        except IOError:
+            return False
+
+    def get(self, signal_name):
+        try:
+            return os.path.getctime(os.path.join(self.directory, signal_name))
+        except OSError:
+            return None
+
+    def remove(self, signal_name):
+        try:
+            os.remove(os.path.join(self.directory, signal_name))
+        except OSError:
+            pass
+
+
+class SharedMemorySignalBackend(SignalBackend):
+    """
+    Table of signal creation times in a memory mapped file, usually on the
+    /dev/shm RAM disk, so setting and checking a signal needs no syscall.
+
+    Signals are stored in a hash table of SLOTS slots, a slot holds the
+    signal name and its creation time (0 when not set). Slots are only
+    allocated, under a file lock, the first time a signal is created, and
+    never freed. Signals that do not fit in the table, because their name
+    is too long or the table is full, are stored by the fallback.
+
+    Args:
+        path (str): path of the shared memory file
+        fallback (SignalBackend): backend of the signals that do not fit
+    """
+    SLOTS = 128
+    NAME = struct.Struct("<64s")
+    TIME = struct.Struct("<d")
+    SLOT_SIZE = NAME.size + TIME.size
+    # find result of the signals stored by the fallback
+    FALLBACK = -1
+
+    def __init__(self, path, fallback):
+        self.path = path
+        self.fallback = fallback
+        save = os.umask(0)
+        try:
+            # give everyone rights to r/w here
+            self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0666)
+        finally:
+            os.umask(save)
+        size = self.SLOTS * self.SLOT_SIZE
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        # signal name -> slot offset
+        self.offsets = {}
+
+    def find(self, signal_name, allocate=False):
+        """
+        Offset of the slot of a signal, None if it is not allocated and
+        FALLBACK if it does not fit in the table
+        """
+        offset = self.offsets.get(signal_name)
+        if offset is not None:
+            return offset
+        name = signal_name.encode("utf-8")
+        if len(name) > self.NAME.size:
+            return self.FALLBACK
+        if allocate:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            index = zlib.crc32(name) % self.SLOTS
+            for i in range(self.SLOTS):
+                offset = ((index + i) % self.SLOTS) * self.SLOT_SIZE
+                slot_name = self.NAME.unpack_from(self.map, offset)[0]
+                slot_name = slot_name.rstrip("\0")
+                if slot_name == name:
+                    self.offsets[signal_name] = offset
+                    return offset
+                if not slot_name:
+                    if not allocate:
+                        return None
+                    self.TIME.pack_into(self.map, offset + self.NAME.size, 0)
+                    self.NAME.pack_into(self.map, offset, name)
+                    self.offsets[signal_name] = offset
+                    return offset
+            # an empty slot would have been allocated before the table
+            # was full
+            return self.FALLBACK
+        finally:
+            if allocate:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def create(self, signal_name):
+        offset = self.find(signal_name, allocate=True)
+        if offset == self.FALLBACK:
+            return self.fallback.create(signal_name)
+        self.TIME.pack_into(self.map, offset + self.NAME.size, time.time())
+        return True
+
+    def get(self, signal_name):
+        offset = self.find(signal_name)
+        if offset is None:
+            return None
+        if offset == self.FALLBACK:
+            return self.fallback.get(signal_name)
+        created = self.TIME.unpack_from(self.map,
+                                        offset + self.NAME.size)[0]
+        return created or None
+
+    def remove(self, signal_name):
+        offset = self.find(signal_name)
+        if offset == self.FALLBACK:
+            self.fallback.remove(signal_name)
+        elif offset is not None:
+            self.TIME.pack_into(self.map, offset + self.NAME.size, 0)
+
+
+SHARED_MEMORY_DIR = "/dev/shm"
+
+_backend = None
+_backend_lock = Lock()
+
+
+def create_signal_backend():
+    """
+    Create the signal backend selected by the "signal_backend" setting,
+    "memory" (the default) uses shared memory when available and falls
+    back to files in the IPC directory, "file" always uses files.
+
+    Returns:
+        SignalBackend
+    """
+    config = mycroft.configuration.ConfigurationManager.instance()
+    ipc_directory = get_ipc_directory()
+    backend = FileSignalBackend(os.path.join(ipc_directory, "signal"))
+    if config.get("signal_backend", "memory") == "memory" and \
+            os.path.isdir(SHARED_MEMORY_DIR):
+        # processes sharing an IPC directory share the signals
+        name = "mycroft-signals-" + hashlib.md5(ipc_directory).hexdigest()
+        try:
+            backend = SharedMemorySignalBackend(
+                os.path.join(SHARED_MEMORY_DIR, name), backend)
+        except (OSError, IOError, mmap.error) as e:
+            LOG.warning("Shared memory signals not available: " + repr(e))
+    return backend
+
+
+def get_signal_backend():
+    """
+    Get the signal backend of the process, the IPC directory is resolved
+    once when it is created
+
+    Returns:
+        SignalBackend
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_signal_backend()
+    return _backend
+
+
 def create_signal(signal_name):
     """Create a named signal
 
@@ -77,12 +274,7 @@ def create_signal(signal_name):
         signal_name (str): The signal's name.  Must only contain characters
             valid in filenames.
     """
-    try:
-        path = os.path.join(get_ipc_directory(), "signal", signal_name)
-        create_file(path)
-        return os.path.isfile(path)
-    except IOError:
-        return False
+    return get_signal_backend().create(signal_name)
 
 
 def check_for_signal(signal_name, sec_lifetime=0):
@@ -98,18 +290,18 @@ def check_for_signal(signal_name, sec_lifetime=0):
     Returns:
         bool: True if the signal is defined, False otherwise
     """
-    path = os.path.join(get_ipc_directory(), "signal", signal_name)
-    if os.path.isfile(path):
-        if sec_lifetime == 0:
-            # consume this single-use signal
-            os.remove(path)
-        elif sec_lifetime == -1:
-            return True
-        elif int(os.path.getctime(path) + sec_lifetime) < int(time.time()):
-            # remove once expired
-            os.remove(path)
-            return False
+    backend = get_signal_backend()
+    created = backend.get(signal_name)
+    if created is None:
+        # No such signal exists
+        return False
+    if sec_lifetime == 0:
+        # consume this single-use signal
+        backend.remove(signal_name)
+    elif sec_lifetime == -1:
         return True
-
-    # No such signal exists
-    return False
+    elif int(created + sec_lifetime) < int(time.time()):
+        # remove once expired
+        backend.remove(signal_name)
+        return False
+    return True
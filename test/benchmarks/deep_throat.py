@@ -0,0 +1,60 @@
+"""Benchmark of deep throat synthesis
+
+Compares synthesizing a paragraph to a wav file with the Python list path
+(phonemes_words_values and save_values_to_wave_file) against the NumPy
+array path used by the DeepThroat TTS. Requires the deep throat
+dependencies, run from the repository root:
+
+    python test/benchmarks/deep_throat.py
+"""
+import os
+import tempfile
+import time
+import wave
+
+__author__ = 'jarbas'
+
+PARAGRAPH = ("The quick brown fox jumps over the lazy dog. "
+             "Speech synthesis should be faster than real time "
+             "even on small devices. ") * 4
+
+SAMPLE_RATE = 15300
+
+
+def run(words_values, save, phonemes, filename):
+    start = time.time()
+    save(values=words_values(phonemes_words=phonemes), filename=filename,
+         sample_rate=SAMPLE_RATE)
+    elapsed = time.time() - start
+    audio = wave.open(filename)
+    duration = audio.getnframes() / float(audio.getframerate())
+    audio.close()
+    return elapsed, duration
+
+
+def main():
+    from jarbas_utils import deep_throat
+    phonemes = deep_throat.text_to_phonemes(text=PARAGRAPH)
+    deep_throat.precompute_phoneme_arrays()
+    fd, filename = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        results = [
+            ("lists", run(deep_throat.phonemes_words_values,
+                          deep_throat.save_values_to_wave_file,
+                          phonemes, filename)),
+            ("numpy", run(deep_throat.phonemes_words_array,
+                          deep_throat.save_array_to_wave_file,
+                          phonemes, filename))
+        ]
+    finally:
+        os.remove(filename)
+    print "%-8s %10s %12s %14s" % ("path", "time (s)", "audio (s)",
+                                   "real time x")
+    for name, (elapsed, duration) in results:
+        print "%-8s %10.3f %12.2f %14.1f" % (name, elapsed, duration,
+                                             duration / elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark of deep throat text to phonemes translation
+
+Compares the rule by rule translation (text_to_phonemes_sequential)
+against the single pass rule index of text_to_phonemes, with a cold and a
+warm word cache, on the most frequent words of the Brown corpus. Requires
+the deep throat dependencies and the nltk Brown corpus, run from the
+repository root:
+
+    python test/benchmarks/deep_throat_phonemes.py [number of words]
+"""
+import sys
+import time
+
+__author__ = 'jarbas'
+
+
+def run(translate, text):
+    start = time.time()
+    translate(text=text)
+    return (time.time() - start) * 1000
+
+
+def main():
+    from jarbas_utils import deep_throat
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    words = deep_throat.most_frequent_Brown_Corpus_words()[:number]
+    text = " ".join(words)
+    results = [("sequential rules",
+                run(deep_throat.text_to_phonemes_sequential, text))]
+    deep_throat.words_phonemes_cache.clear()
+    results.append(("single pass, cold",
+                    run(deep_throat.text_to_phonemes, text)))
+    results.append(("single pass, warm",
+                    run(deep_throat.text_to_phonemes, text)))
+    print "%d words" % len(words)
+    print "%-20s %10s %14s" % ("translation", "time (ms)", "words / s")
+    for name, elapsed in results:
+        rate = len(words) / (elapsed / 1000)
+        print "%-20s %10.2f %14.0f" % (name, elapsed, rate)
+
+
+if __name__ == "__main__":
+    main()
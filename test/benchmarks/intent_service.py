@@ -0,0 +1,76 @@
+"""Benchmark of intent determination
+
+Registers a number of synthetic skills and measures the median time to
+determine the intent of an utterance with the plain adapt engine, the
+keyword indexed IntentEngine and the IntentService utterance cache. Run
+from the repository root:
+
+    python test/benchmarks/intent_service.py
+"""
+import time
+
+from adapt.engine import IntentDeterminationEngine
+from adapt.intent import IntentBuilder
+
+from mycroft.skills.intent_service import IntentEngine, IntentService
+
+__author__ = 'jarbas'
+
+
+class NullEmitter(object):
+    def on(self, event, f):
+        pass
+
+    def emit(self, message):
+        pass
+
+
+def register_skills(engine, skills=150):
+    for i in range(skills):
+        engine.register_entity("action%d" % i, "Action%dKeyword" % i)
+        engine.register_entity("thing%d" % i, "Thing%dKeyword" % i)
+        engine.register_intent_parser(
+            IntentBuilder("%d:Intent" % i).require("Action%dKeyword" % i)
+            .optionally("Thing%dKeyword" % i).build())
+
+
+UTTERANCES = ["please action7 the thing7 now", "action99 thing3",
+              "nothing to see here", "action140 and action2"]
+
+
+def median_ms(func, rounds=20):
+    times = []
+    for _ in range(rounds):
+        for utterance in UTTERANCES:
+            start = time.time()
+            func(utterance)
+            times.append(time.time() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def first(generator):
+    return next(generator, None)
+
+
+def main():
+    adapt = IntentDeterminationEngine()
+    register_skills(adapt)
+    indexed = IntentEngine()
+    register_skills(indexed)
+    service = IntentService(NullEmitter())
+    register_skills(service.engine)
+    results = [
+        ("adapt", median_ms(
+            lambda u: first(adapt.determine_intent(u, 100, True)))),
+        ("indexed", median_ms(
+            lambda u: first(indexed.determine_intent(u, 100, True)))),
+        ("indexed + cache", median_ms(
+            lambda u: service.get_best_intent(u, "en-us")))
+    ]
+    print "%-20s %12s" % ("engine", "median (ms)")
+    for name, elapsed in results:
+        print "%-20s %12.3f" % (name, elapsed)
+
+
+if __name__ == "__main__":
+    main()
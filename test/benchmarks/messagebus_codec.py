@@ -0,0 +1,89 @@
+"""Benchmark of the messagebus wire codecs
+
+Measures the cost of encoding and decoding typical messagebus traffic
+with every available codec. Run from the repository root:
+
+    python test/benchmarks/messagebus_codec.py
+"""
+import timeit
+
+from mycroft.messagebus.codec import CODECS
+from mycroft.messagebus.message import Message
+
+__author__ = 'jarbas'
+
+
+def lilacs_node(name, connections=40):
+    """ a LILACS node as stored by the json storage skill """
+    links = ["%s_%d" % (name, i) for i in range(connections)]
+    return {
+        "name": name,
+        "type": "info",
+        "connections": {
+            "parents": dict((link, 5) for link in links),
+            "childs": dict((link, 5) for link in links),
+            "synonims": dict((link, 5) for link in links[:10]),
+            "antonims": {},
+            "cousins": dict((link, 5) for link in links),
+            "spawns": {},
+            "spawned_by": {},
+            "consumes": {},
+            "consumed_by": {},
+            "parts": dict((link, 5) for link in links),
+            "part_off": {}
+        },
+        "data": {
+            "description": "a " + name + " is a thing " * 200,
+            "abstract": "lorem ipsum dolor sit amet " * 100,
+            "pics": ["https://example.com/%d.jpg" % i for i in range(20)],
+            "infobox": dict(("key_%d" % i, "value %d" % i)
+                            for i in range(50))
+        },
+        "properties": {"last_seen": 1508250000.0, "weight": 0.75,
+                       "online": True}
+    }
+
+
+MESSAGES = {
+    "speak": Message("speak",
+                     {"utterance": "the weather today is sunny with a "
+                                   "high of 24 degrees",
+                      "expect_response": False},
+                     {"source": "WeatherSkill",
+                      "destination": "cli"}),
+    "recognizer_loop:utterance": Message(
+        "recognizer_loop:utterance",
+        {"utterances": ["what is the weather like today"],
+         "lang": "en-us"},
+        {"source": "cli", "destination": "skills",
+         "mute": False, "user": "local"}),
+    "LILACS.node.json.load.reply": Message(
+        "LILACS.node.json.load.reply",
+        {"node": "dog", "data": lilacs_node("dog"), "sucess": True},
+        {"source": "LILACS_Json_Storage_Skill",
+         "destination": "LILACS_Core_Skill"})
+}
+
+
+def bench(codec, message, number):
+    payload = codec.encode(message)
+    encode = timeit.timeit(lambda: codec.encode(message), number=number)
+    decode = timeit.timeit(lambda: codec.decode(payload), number=number)
+    return len(payload), encode / number * 1e6, decode / number * 1e6
+
+
+def main(number=20000):
+    print "%-30s %-8s %9s %12s %12s" % ("message", "codec", "bytes",
+                                        "encode (us)", "decode (us)")
+    for name in sorted(MESSAGES):
+        message = MESSAGES[name]
+        n = number if len(CODECS["json"].encode(message)) < 4096 \
+            else number // 50
+        for codec_name in sorted(CODECS):
+            size, encode, decode = bench(CODECS[codec_name], message, n)
+            print "%-30s %-8s %9d %12.2f %12.2f" % (name, codec_name, size,
+                                                    encode, decode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Benchmark of the Jarbas server outbound message pipeline
+
+Simulates N connected clients receiving AES encrypted "speak" messages
+queued from bus threads, and compares the reactor drained per client
+queues with the previous single thread polling a shared list. Reports
+messages per second and the p50 / p99 latency between queueing a
+message and handing the ciphertext to the websocket. Requires twisted
+and pycrypto. Run from the repository root:
+
+    python test/benchmarks/server_pipeline.py [clients] [messages]
+"""
+import base64
+import sys
+import time
+from threading import Event, Lock, Thread
+
+from twisted.internet import reactor
+
+from mycroft.client.server.aes_session import AESSession
+from mycroft.client.server.outbound import OutboundQueue
+from mycroft.messagebus.message import Message
+
+__author__ = 'jarbas'
+
+
+class SimulatedClient(object):
+    """ Stands in for MyServerProtocol """
+
+    def __init__(self, peer, stats):
+        self.peer = peer
+        self.session = AESSession()
+        self.stats = stats
+        self.bytes_sent = 0
+
+    def sendMessage(self, payload, isBinary=False):
+        self.bytes_sent += len(payload)
+
+
+class Stats(object):
+    def __init__(self, expected):
+        self.expected = expected
+        self.latencies = []
+        self.lock = Lock()
+        self.done = Event()
+
+    def delivered(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            if len(self.latencies) >= self.expected:
+                self.done.set()
+
+
+def send(client, sent_at, utterance):
+    """ what MyServerFactory.send_message does for aes messages """
+    next_iv = AESSession.generate_iv()
+    context = {"destinatary": "cli:" + client.peer,
+               "aes_iv": base64.b64encode(next_iv)}
+    message = Message("speak", {"utterance": utterance}, context).serialize()
+    client.sendMessage(client.session.encrypt(message, next_iv), True)
+    client.stats.delivered(time.time() - sent_at)
+
+
+class PollingQueue(object):
+    """ The previous pipeline: one thread polling a shared list """
+
+    def __init__(self):
+        self.message_queue = []
+        self.running = True
+        thread = Thread(target=self._queue)
+        thread.daemon = True
+        thread.start()
+
+    def _queue(self):
+        while self.running:
+            for msg in self.message_queue:
+                send(*msg)
+                self.message_queue.remove(msg)
+            time.sleep(0.1)
+
+    def put(self, client, *message):
+        self.message_queue.append([client] + list(message))
+
+    def stop(self):
+        self.running = False
+
+
+class ReactorQueue(OutboundQueue):
+    def __init__(self):
+        super(ReactorQueue, self).__init__(send, reactor.callFromThread)
+
+    def stop(self):
+        pass
+
+
+def run(queue_class, num_clients, num_messages, interval=0.001):
+    total = num_clients * num_messages
+    stats = Stats(total)
+    clients = [SimulatedClient("tcp:127.0.0.1:%d" % (5000 + i), stats)
+               for i in range(num_clients)]
+    queue = queue_class()
+    utterance = "the weather today is sunny with a high of 24 degrees"
+
+    def produce(client):
+        for _ in range(num_messages):
+            queue.put(client, time.time(), utterance)
+            time.sleep(interval)
+
+    start = time.time()
+    threads = [Thread(target=produce, args=(c,)) for c in clients]
+    for t in threads:
+        t.start()
+    stats.done.wait(120)
+    elapsed = time.time() - start
+    for t in threads:
+        t.join()
+    queue.stop()
+    latencies = sorted(stats.latencies)
+    delivered = len(latencies)
+    if not delivered:
+        return 0, 0.0, 0.0, 0.0
+    p50 = latencies[delivered // 2] * 1000
+    p99 = latencies[min(delivered - 1, int(delivered * 0.99))] * 1000
+    return delivered, delivered / elapsed, p50, p99
+
+
+def main(clients=(1, 10, 50), messages=200):
+    print "%-10s %8s %10s %12s %10s %10s" % (
+        "pipeline", "clients", "delivered", "messages/s", "p50 (ms)",
+        "p99 (ms)")
+    for num_clients in clients:
+        for name, queue_class in (("polling", PollingQueue),
+                                  ("reactor", ReactorQueue)):
+            delivered, rate, p50, p99 = run(queue_class, num_clients,
+                                            messages)
+            print "%-10s %8d %10d %12.1f %10.2f %10.2f" % (
+                name, num_clients, delivered, rate, p50, p99)
+    reactor.callFromThread(reactor.stop)
+
+
+if __name__ == "__main__":
+    clients = (int(sys.argv[1]),) if len(sys.argv) > 1 else (1, 10, 50)
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    reactor.callInThread(main, clients, messages)
+    reactor.run()
@@ -0,0 +1,95 @@
+"""Benchmark of skill vocabulary registration
+
+Compares registering the vocabulary and regex files of every bundled skill
+with one register_vocab message per line against the cached
+register_vocab_batch path, cold (empty cache) and warm. Every message is
+serialized, parsed back and handled by an IntentService, so the time is
+the vocabulary part of boot-to-ready: from reading the first file until
+the intent engine knows every entry. Run from the repository root:
+
+    python test/benchmarks/skill_vocab.py
+
+The full boot-to-ready time on a device, including skill imports, is
+reported by the skills service in the load_time of the
+mycroft.skills.initialized message.
+"""
+import shutil
+import tempfile
+import time
+from glob import glob
+
+import mock
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.core import load_vocabulary, load_regex, \
+    load_vocabulary_batch, load_regex_batch
+from mycroft.skills.intent_service import IntentService
+
+__author__ = 'jarbas'
+
+
+class SerializingEmitter(object):
+    """ Delivers every message, serialized, to its handlers """
+
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self.handlers = {}
+
+    def on(self, message_type, handler):
+        self.handlers.setdefault(message_type, []).append(handler)
+
+    def emit(self, message):
+        self.messages += 1
+        serialized = message.serialize()
+        self.bytes += len(serialized)
+        message = Message.deserialize(serialized)
+        for handler in self.handlers.get(message.type, []):
+            handler(message)
+
+
+def skill_dirs(pattern):
+    return sorted(glob("jarbas_skills/*/" + pattern + "/en-us"))
+
+
+def run(load_vocab, load_rx):
+    emitter = SerializingEmitter()
+    IntentService(emitter)
+    start = time.time()
+    for path in skill_dirs("vocab"):
+        load_vocab(path, emitter)
+    for path in skill_dirs("regex"):
+        load_rx(path, emitter)
+    return emitter.messages, emitter.bytes, (time.time() - start) * 1000
+
+
+def main(repeat=5):
+    modes = [("per line", load_vocabulary, load_regex, False),
+             ("batch, cold cache", load_vocabulary_batch, load_regex_batch,
+              False),
+             ("batch, warm cache", load_vocabulary_batch, load_regex_batch,
+              True)]
+    results = {}
+    for _ in range(repeat):
+        for name, load_vocab, load_rx, warm in modes:
+            cache_dir = tempfile.mkdtemp()
+            try:
+                with mock.patch('mycroft.skills.core.vocab_cache_directory',
+                                return_value=cache_dir):
+                    if warm:
+                        run(load_vocab, load_rx)
+                    result = run(load_vocab, load_rx)
+            finally:
+                shutil.rmtree(cache_dir)
+            if name not in results or result[2] < results[name][2]:
+                results[name] = result
+    print "%d vocab dirs, %d regex dirs, best of %d" % (
+        len(skill_dirs("vocab")), len(skill_dirs("regex")), repeat)
+    print "%-20s %9s %9s %10s" % ("mode", "messages", "bytes", "time (ms)")
+    for name, _, _, _ in modes:
+        messages, size, elapsed = results[name]
+        print "%-20s %9d %9d %10.2f" % (name, messages, size, elapsed)
+
+
+if __name__ == "__main__":
+    main()
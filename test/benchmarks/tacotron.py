@@ -0,0 +1,52 @@
+"""CPU benchmark of Tacotron synthesis
+
+Compares synthesizing sentences one at a time against batched synthesis
+with Griffin-Lim on the process pool, in sentences per second. Needs
+tensorflow and a trained model. Run from the repository root:
+
+    python test/benchmarks/tacotron.py path/to/model.ckpt [batch_size]
+"""
+import os
+import sys
+import time
+
+__author__ = 'jarbas'
+
+
+def sentences_per_second(func, texts):
+    start = time.time()
+    func(texts)
+    return len(texts) / (time.time() - start)
+
+
+def main(checkpoint, batch_size=4):
+    # CPU only, must be set before tensorflow is imported
+    os.environ['CUDA_VISIBLE_DEVICES'] = ''
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+    from jarbas_models.tf_tacotron.eval import sentences
+    from jarbas_models.tf_tacotron.synthesizer import Synthesizer
+
+    synthesizer = Synthesizer()
+    synthesizer.load(checkpoint)
+    synthesizer.warm_up()
+    texts = sentences[:batch_size]
+
+    def sequential(texts):
+        for text in texts:
+            synthesizer.synthesize(text)
+
+    def batched(texts):
+        synthesizer.synthesize_batch(texts)
+
+    print "%-12s %14s" % ("mode", "sentences/s")
+    print "%-12s %14.3f" % ("sequential",
+                            sentences_per_second(sequential, texts))
+    print "%-12s %14.3f" % ("batched", sentences_per_second(batched, texts))
+    synthesizer.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print __doc__
+        sys.exit(1)
+    main(sys.argv[1], *[int(arg) for arg in sys.argv[2:3]])
@@ -0,0 +1,106 @@
+import sys
+import unittest
+from multiprocessing.pool import ThreadPool
+
+import mock
+
+from mycroft.client.speech.hotword_factory import HotWordEngine, \
+    PocketsphinxKeyphraseList
+from mycroft.client.speech.mic import ResponsiveRecognizer
+
+__author__ = 'jarbas'
+
+
+class MockEngine(HotWordEngine):
+    def __init__(self, key_phrase, found):
+        super(MockEngine, self).__init__(key_phrase, {})
+        self.found = found
+        self.calls = 0
+
+    def found_wake_word(self, frame_data):
+        self.calls += 1
+        return self.found
+
+
+class MockKeyphraseList(HotWordEngine):
+    def __init__(self, found):
+        super(MockKeyphraseList, self).__init__("list", {})
+        self.found = found
+        self.calls = 0
+
+    def found_wake_words(self, frame_data):
+        self.calls += 1
+        return self.found
+
+
+class KeyphraseListTest(unittest.TestCase):
+    def setUp(self):
+        self.pocketsphinx = mock.Mock()
+        patcher = mock.patch.dict(sys.modules,
+                                  {'pocketsphinx': self.pocketsphinx})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.engine = PocketsphinxKeyphraseList({
+            "Hey Jarbas": {"phonemes": "HH EY . JH AA R B AH S",
+                           "threshold": 1e-20},
+            "Jarbas": {"phonemes": "Y AA R B AH S"}
+        })
+        self.config = self.pocketsphinx.Decoder.default_config.return_value
+
+    def get_file(self, option):
+        for call in self.config.set_string.call_args_list:
+            if call[0][0] == option:
+                with open(call[0][1]) as f:
+                    return f.read()
+
+    def test_files(self):
+        self.assertEqual(self.get_file('-kws'),
+                         "hey jarbas /1e-20/\njarbas /1e-90/\n")
+        self.assertEqual(self.get_file('-dict'),
+                         "hey HH EY\njarbas JH AA R B AH S\n"
+                         "jarbas(2) Y AA R B AH S\n")
+
+    def test_found_wake_words(self):
+        decoder = self.engine.decoder
+        segment = mock.Mock()
+        segment.word = "hey jarbas"
+        decoder.seg.return_value = [segment]
+        self.assertEqual(self.engine.found_wake_words("audio"),
+                         ["hey jarbas"])
+        self.assertTrue(self.engine.found_wake_word("audio"))
+        decoder.process_raw.assert_called_with("audio", False, False)
+
+        decoder.hyp.return_value = None
+        self.assertEqual(self.engine.found_wake_words("audio"), [])
+
+
+class FindHotwordsTest(unittest.TestCase):
+    def setUp(self):
+        self.wake_word = MockEngine("hey jarbas", False)
+
+    def test_shared_engine_runs_once(self):
+        keyphrases = MockKeyphraseList(["thank you"])
+        snowboy = MockEngine("self destruct", False)
+        recognizer = ResponsiveRecognizer(self.wake_word, {
+            "thank you": [keyphrases, None, None, False, "pocketsphinx"],
+            "hello": [keyphrases, None, None, False, "pocketsphinx"],
+            "self destruct": [snowboy, None, None, False, "snowboy"]
+        })
+        self.assertEqual(recognizer.find_hotwords("audio"),
+                         set(["thank you"]))
+        self.assertEqual(keyphrases.calls, 1)
+        self.assertEqual(snowboy.calls, 1)
+
+    def test_thread_pool(self):
+        engines = [MockEngine("one", True), MockEngine("two", False),
+                   MockEngine("three", True)]
+        recognizer = ResponsiveRecognizer(self.wake_word, dict(
+            (engine.key_phrase, [engine, None, None, False, "snowboy"])
+            for engine in engines))
+        recognizer.hotword_pool = ThreadPool(2)
+        try:
+            self.assertEqual(recognizer.find_hotwords("audio"),
+                             set(["one", "three"]))
+        finally:
+            recognizer.hotword_pool.close()
+        self.assertEqual([engine.calls for engine in engines], [1, 1, 1])
@@ -0,0 +1,47 @@
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from mycroft.client.speech.mic_level import MicLevelReader, MicLevelWriter
+
+__author__ = 'jarbas'
+
+
+class MicLevelTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = join(self.tmp_dir, "mic_level")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_missing_file(self):
+        reader = MicLevelReader(self.filename)
+        self.assertIsNone(reader.read())
+
+    def test_read_updates(self):
+        reader = MicLevelReader(self.filename)
+        writer = MicLevelWriter(self.filename)
+        first = reader.read()
+        self.assertEqual(first["energy"], 0)
+        self.assertEqual(first["sequence"] % 2, 0)
+
+        writer.update(1200, 1500.5)
+        writer.wake_word_checked(False)
+        writer.wake_word_checked(True)
+        levels = reader.read()
+        self.assertNotEqual(levels["sequence"], first["sequence"])
+        self.assertEqual(levels["energy"], 1200)
+        self.assertEqual(levels["threshold"], 1500.5)
+        self.assertEqual(levels["wake_word_checks"], 2)
+        self.assertEqual(levels["wake_words"], 1)
+        self.assertEqual(levels["last_wake_word"], writer.last_wake_word)
+        self.assertEqual(levels["updated"], writer.updated)
+        writer.close()
+        reader.close()
+
+    def test_old_text_file(self):
+        with open(self.filename, "w") as f:
+            f.write("Energy:  cur=4 thresh=1.5" + " " * 40)
+        self.assertIsNone(MicLevelReader(self.filename).read())
@@ -0,0 +1,32 @@
+import unittest
+
+from mycroft.client.speech.mic import RingBuffer
+
+__author__ = 'jarbas'
+
+
+class RingBufferTest(unittest.TestCase):
+    def test_grow(self):
+        buf = RingBuffer(8)
+        buf.append("abc")
+        self.assertEqual(len(buf), 3)
+        self.assertEqual(buf.get_last(8).tobytes(), "abc")
+        self.assertEqual(buf.get_last(2).tobytes(), "bc")
+
+    def test_wrap(self):
+        buf = RingBuffer(8)
+        data = ""
+        for chunk in ["abc", "defgh", "ijk", "l", "mnopqr"]:
+            buf.append(chunk)
+            data = (data + chunk)[-8:]
+            self.assertEqual(len(buf), len(data))
+            self.assertEqual(buf.get_last(8).tobytes(), data)
+            self.assertEqual(buf.get_last(5).tobytes(), data[-5:])
+
+    def test_chunk_larger_than_buffer(self):
+        buf = RingBuffer(4)
+        buf.append("ab")
+        buf.append("cdefgh")
+        self.assertEqual(buf.get_last(10).tobytes(), "efgh")
+        buf.append("ij")
+        self.assertEqual(buf.get_last(4).tobytes(), "ghij")
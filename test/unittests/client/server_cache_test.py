@@ -0,0 +1,43 @@
+import unittest
+
+from mycroft.client.server.cache import UserCache
+
+__author__ = 'jarbas'
+
+
+class UserCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = UserCache()
+        self.user = {"id": "1", "forbidden_messages": ["speak"]}
+
+    def test_put_get(self):
+        self.assertIsNone(self.cache.get("77"))
+        token = self.cache.token("77")
+        self.assertTrue(self.cache.put("77", self.user, token))
+        self.assertEquals(self.cache.get("77"), self.user)
+
+    def test_invalidate_sock(self):
+        self.cache.put("77", self.user, self.cache.token("77"))
+        self.cache.put("78", self.user, self.cache.token("78"))
+        self.cache.invalidate("77")
+        self.assertIsNone(self.cache.get("77"))
+        self.assertEquals(self.cache.get("78"), self.user)
+
+    def test_invalidate_all(self):
+        self.cache.put("77", self.user, self.cache.token("77"))
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.get("77"))
+        self.assertEquals(len(self.cache), 0)
+
+    def test_late_reply_not_cached(self):
+        token = self.cache.token("77")
+        # permissions changed while the lookup was running
+        self.cache.invalidate("77")
+        self.assertFalse(self.cache.put("77", self.user, token))
+        self.assertIsNone(self.cache.get("77"))
+
+        token = self.cache.token("78")
+        self.cache.invalidate()
+        self.assertFalse(self.cache.put("78", self.user, token))
+        self.assertTrue(self.cache.put("78", self.user,
+                                       self.cache.token("78")))
@@ -0,0 +1,105 @@
+import unittest
+from Queue import Queue
+from threading import Thread
+
+from mycroft.client.server.outbound import OutboundQueue
+
+__author__ = 'jarbas'
+
+
+class MockClient(object):
+    def __init__(self, peer):
+        self.peer = peer
+
+
+class MockReactor(object):
+    """ Runs scheduled calls in order on a single thread """
+
+    def __init__(self):
+        self.calls = Queue()
+        self.scheduled = 0
+
+    def callFromThread(self, f, *args):
+        self.scheduled += 1
+        self.calls.put((f, args))
+
+    def run_pending(self):
+        while not self.calls.empty():
+            f, args = self.calls.get()
+            f(*args)
+
+    def run(self):
+        """ Run calls until stop is called, like reactor.run """
+        while True:
+            f, args = self.calls.get()
+            if f is None:
+                break
+            f(*args)
+
+    def stop(self):
+        self.calls.put((None, ()))
+
+
+class OutboundQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.reactor = MockReactor()
+        self.sent = []
+        self.queue = OutboundQueue(self.send, self.reactor.callFromThread)
+
+    def send(self, client, *message):
+        self.sent.append((client.peer, message))
+
+    def test_coalesces_drains(self):
+        client = MockClient("tcp:127.0.0.1:1")
+        for i in range(100):
+            self.queue.put(client, "speak", i)
+        self.assertEquals(self.reactor.scheduled, 1)
+        self.assertEquals(len(self.queue), 100)
+        self.reactor.run_pending()
+        self.assertEquals(self.sent, [(client.peer, ("speak", i))
+                                      for i in range(100)])
+        self.assertEquals(len(self.queue), 0)
+
+    def test_order_per_client(self):
+        clients = [MockClient("tcp:127.0.0.1:%d" % i) for i in range(8)]
+
+        def produce(client):
+            for i in range(1000):
+                self.queue.put(client, "speak", i)
+
+        reactor_thread = Thread(target=self.reactor.run)
+        reactor_thread.start()
+        threads = [Thread(target=produce, args=(c,)) for c in clients]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.reactor.stop()
+        reactor_thread.join()
+        self.reactor.run_pending()
+        for client in clients:
+            sent = [m[1] for peer, m in self.sent if peer == client.peer]
+            self.assertEquals(sent, range(1000))
+
+    def test_remove(self):
+        removed = MockClient("tcp:127.0.0.1:1")
+        kept = MockClient("tcp:127.0.0.1:2")
+        self.queue.put(removed, "speak", 1)
+        self.queue.put(kept, "speak", 2)
+        self.queue.remove(removed.peer)
+        self.reactor.run_pending()
+        self.assertEquals(self.sent, [(kept.peer, ("speak", 2))])
+
+    def test_send_error(self):
+        client = MockClient("tcp:127.0.0.1:1")
+
+        def send(client, value):
+            if value == 0:
+                raise ValueError
+            self.sent.append(value)
+
+        self.queue.send = send
+        for i in range(3):
+            self.queue.put(client, i)
+        self.reactor.run_pending()
+        self.assertEquals(self.sent, [1, 2])
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from mycroft.client.server.upload import UploadSpool, UploadError, \
+    pack_chunk, unpack_chunk
+
+__author__ = 'jarbas'
+
+
+class UploadSpoolTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.spool = UploadSpool(os.path.join(self.dir, "uploads"),
+                                 max_size=1000)
+        self.data = os.urandom(700)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def receive(self, upload, chunks):
+        for seq, data in enumerate(chunks):
+            seq, data = unpack_chunk(pack_chunk(seq, data))
+            if upload.accept(seq, data):
+                return upload.finish()
+            upload.write(data)
+
+    def chunks(self):
+        return [self.data[i:i + 128] for i in range(0, 700, 128)] + [""]
+
+    def test_upload(self):
+        upload = self.spool.start("77", ".png", len(self.data),
+                                  hashlib.sha256(self.data).hexdigest())
+        path = self.receive(upload, self.chunks())
+        self.assertTrue(path.endswith(".png"))
+        self.assertEquals(os.path.dirname(path), self.spool.directory)
+        with open(path, "rb") as f:
+            self.assertEquals(f.read(), self.data)
+
+    def test_sha256_mismatch(self):
+        upload = self.spool.start("77", ".png", len(self.data),
+                                  hashlib.sha256("other").hexdigest())
+        self.assertRaises(UploadError, self.receive, upload, self.chunks())
+
+    def test_size_mismatch(self):
+        upload = self.spool.start("77", ".png", len(self.data) + 1)
+        self.assertRaises(UploadError, self.receive, upload, self.chunks())
+        upload = self.spool.start("77", ".png", 10)
+        self.assertRaises(UploadError, self.receive, upload, self.chunks())
+
+    def test_max_size(self):
+        self.assertRaises(UploadError, self.spool.start, "77", ".png", 1001)
+        upload = self.spool.start("77", ".png")
+        self.receive(upload, [self.data])
+        self.assertRaises(UploadError, upload.accept, 1, self.data)
+
+    def test_sequence(self):
+        upload = self.spool.start("77", ".png")
+        upload.accept(0, "a")
+        self.assertRaises(UploadError, upload.accept, 2, "b")
+        self.assertRaises(UploadError, unpack_chunk, "ab")
+
+    def test_extension(self):
+        for extension in ["/../../x", ".p/g", "", "jpg"]:
+            self.assertRaises(UploadError, self.spool.start, "77", extension)
+
+    def test_abort(self):
+        upload = self.spool.start("77", ".png")
+        upload.accept(0, "a")
+        upload.abort()
+        upload.write("a")
+        self.assertFalse(os.path.exists(upload.path))
+        self.assertRaises(UploadError, upload.finish)
+
+    def test_cleanup(self):
+        old = self.spool.start("77", ".png")
+        self.receive(old, [self.data, ""])
+        past = time.time() - 7200
+        os.utime(old.path, (past, past))
+        new = self.spool.start("78", ".png")
+        self.assertFalse(os.path.exists(old.path))
+        self.assertTrue(os.path.exists(new.path))
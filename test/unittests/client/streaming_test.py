@@ -0,0 +1,110 @@
+import unittest
+from Queue import Queue
+
+import mock
+from concurrent.futures import Future
+from speech_recognition import AudioSource
+
+from mycroft.client.speech.hotword_factory import HotWordEngine
+from mycroft.client.speech.listener import AudioConsumer, \
+    RecognizerLoopState
+from mycroft.client.speech.mic import ResponsiveRecognizer, \
+    StreamedAudioData
+from mycroft.stt import StreamingSTT
+
+__author__ = 'jarbas'
+
+
+class MockStream(object):
+    def __init__(self, chunk):
+        self.chunk = chunk
+
+    def read(self, chunk_size):
+        return self.chunk
+
+
+class MockSource(AudioSource):
+    def __init__(self):
+        self.stream = MockStream('\0\0' * 512)
+        self.CHUNK = 512
+        self.SAMPLE_RATE = 16000
+        self.SAMPLE_WIDTH = 2
+
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self):
+        self.recognizer = ResponsiveRecognizer(HotWordEngine("hey jarbas",
+                                                             {}))
+        self.recognizer._wait_until_wake_word = mock.Mock()
+        self.recognizer.adjust_for_ambient_noise = mock.Mock()
+        self.emitter = mock.Mock()
+        self.stt = mock.Mock()
+        self.partials = iter(["hello", "hello", "hello world"])
+        self.stt.stream_data.side_effect = lambda data: next(self.partials,
+                                                             None)
+        self.stt.stream_stop.return_value = StreamingSTT.transcription(
+            "hello world")
+
+    def test_listen_streaming(self):
+        audio = self.recognizer.listen(MockSource(), self.emitter, self.stt)
+        self.assertIsInstance(audio, StreamedAudioData)
+        self.assertEqual(audio.transcription.result(), "hello world")
+        self.stt.stream_start.assert_called_once_with(16000, 2)
+        # every recorded chunk was streamed
+        self.assertEqual(self.stt.stream_data.call_count,
+                         (len(audio.frame_data) - 2) / 1024)
+        partials = [call[0][1]["utterance"]
+                    for call in self.emitter.emit.call_args_list
+                    if call[0][0] == "recognizer_loop:partial_utterance"]
+        self.assertEqual(partials, ["hello", "hello world"])
+
+    def test_stream_failure(self):
+        self.stt.stream_data.side_effect = IOError
+        audio = self.recognizer.listen(MockSource(), self.emitter, self.stt)
+        self.assertNotIsInstance(audio, StreamedAudioData)
+        self.assertEqual(self.stt.stream_data.call_count, 1)
+        # the engine does not stay in the middle of the utterance
+        self.stt.stream_stop.assert_called_once_with()
+
+    def test_stream_stop_failure(self):
+        self.stt.stream_stop.side_effect = IOError
+        audio = self.recognizer.listen(MockSource(), self.emitter, self.stt)
+        self.assertNotIsInstance(audio, StreamedAudioData)
+
+    def test_listen_without_stream(self):
+        audio = self.recognizer.listen(MockSource(), self.emitter)
+        self.assertNotIsInstance(audio, StreamedAudioData)
+
+
+class StreamResultTest(unittest.TestCase):
+    def setUp(self):
+        self.stt = mock.Mock()
+        self.stt.execute.return_value = "recording"
+        self.consumer = AudioConsumer(RecognizerLoopState(), Queue(),
+                                      mock.Mock(), self.stt, mock.Mock(),
+                                      mock.Mock())
+
+    def audio(self, transcription):
+        return StreamedAudioData('\0\0' * 512, 16000, 2, transcription)
+
+    def test_streamed(self):
+        audio = self.audio(StreamingSTT.transcription("streamed"))
+        self.assertEqual(self.consumer.stream_result(audio), "streamed")
+        self.assertFalse(self.stt.execute.called)
+
+    def test_not_understood(self):
+        audio = self.audio(StreamingSTT.transcription(None))
+        self.assertIsNone(self.consumer.stream_result(audio))
+        self.assertFalse(self.stt.execute.called)
+
+    def test_stream_failed(self):
+        transcription = Future()
+        transcription.set_exception(IOError())
+        audio = self.audio(transcription)
+        self.assertEqual(self.consumer.stream_result(audio), "recording")
+        self.stt.execute.assert_called_once_with(audio)
+
+    def test_stream_timeout(self):
+        self.consumer.STREAM_TIMEOUT = 0.01
+        audio = self.audio(Future())
+        self.assertEqual(self.consumer.stream_result(audio), "recording")
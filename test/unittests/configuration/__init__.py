@@ -1,9 +1,12 @@
+import copy
+import pickle
 import unittest
 
 from os.path import dirname, join
 
 from mycroft.configuration import ConfigurationLoader, ConfigurationManager, \
-    DEFAULT_CONFIG, SYSTEM_CONFIG, USER_CONFIG, RemoteConfiguration
+    DEFAULT_CONFIG, SYSTEM_CONFIG, USER_CONFIG, RemoteConfiguration, \
+    ConfigSnapshot, diff_sections, freeze, thaw
 
 __author__ = 'jdorleans'
 
@@ -139,3 +142,84 @@ class ConfigurationManagerTest(AbstractConfigurationTest):
         ConfigurationManager.load_defaults()
         config = ConfigurationManager.get([self.config_path])
         self.assert_config(config, 'pt-br', 'espeak', 'f1')
+
+
+class ConfigSnapshotTest(AbstractConfigurationTest):
+    def test_read_only(self):
+        config = freeze(self.create_config())
+        self.assertIsInstance(config, ConfigSnapshot)
+        self.assertIsInstance(config['tts'], ConfigSnapshot)
+        self.assertRaises(TypeError, config.__setitem__, 'lang', 'pt-br')
+        self.assertRaises(TypeError, config['tts'].update, {'module': 'x'})
+        self.assertRaises(TypeError, config.pop, 'lang')
+
+    def test_copies_are_mutable(self):
+        config = freeze(self.create_config())
+        for c in (thaw(config), copy.deepcopy(config)):
+            self.assertEquals(c, config)
+            self.assertNotIsInstance(c['tts'], ConfigSnapshot)
+            c['tts']['module'] = 'espeak'
+        self.assertEquals(config['tts']['module'], 'mimic')
+
+    def test_pickle(self):
+        config = freeze(self.create_config())
+        self.assertEquals(pickle.loads(pickle.dumps(config, 2)), config)
+
+    def test_diff_sections(self):
+        old = self.create_config()
+        new = self.create_config(module='espeak')
+        new['key'] = 'value'
+        self.assertEquals(diff_sections(old, old), set())
+        self.assertEquals(diff_sections(old, new), {'tts', 'key'})
+        self.assertEquals(diff_sections(None, old), {'lang', 'tts'})
+
+
+class ConfigurationVersionTest(AbstractConfigurationTest):
+    def setUp(self):
+        super(ConfigurationVersionTest, self).setUp()
+        self.original = ConfigurationManager.get()
+        ConfigurationManager.publish(self.create_config())
+        self.calls = []
+
+    def tearDown(self):
+        ConfigurationManager.unsubscribe('tts', self.on_change)
+        ConfigurationManager.unsubscribe('lang', self.on_change)
+        ConfigurationManager.publish(thaw(self.original))
+
+    def on_change(self, config):
+        self.calls.append(config)
+
+    def test_unchanged_publish_keeps_version(self):
+        version = ConfigurationManager.version()
+        config = ConfigurationManager.get()
+        self.assertIs(ConfigurationManager.publish(self.create_config()),
+                      config)
+        self.assertEquals(ConfigurationManager.version(), version)
+
+    def test_section_versions(self):
+        tts_version = ConfigurationManager.version('tts')
+        ConfigurationManager.update({'lang': 'pt-br'})
+        self.assertEquals(ConfigurationManager.version('tts'), tts_version)
+        self.assertEquals(ConfigurationManager.version('lang'),
+                          ConfigurationManager.version())
+        self.assertEquals(ConfigurationManager.version('tts', 'lang'),
+                          ConfigurationManager.version())
+        self.assertEquals(ConfigurationManager.get()['lang'], 'pt-br')
+
+    def test_old_snapshot_unchanged(self):
+        config = ConfigurationManager.get()
+        ConfigurationManager.update({'lang': 'pt-br'})
+        self.assertEquals(config['lang'], 'en-us')
+        self.assertIsNot(ConfigurationManager.get(), config)
+
+    def test_subscribe(self):
+        ConfigurationManager.subscribe('tts', self.on_change)
+        ConfigurationManager.subscribe('lang', self.on_change)
+        ConfigurationManager.update({'key': 'value'})
+        self.assertEquals(self.calls, [])
+        ConfigurationManager.publish(self.create_config('pt-br', 'espeak'))
+        self.assertEquals(len(self.calls), 1)
+        self.assertIs(self.calls[0], ConfigurationManager.get())
+        ConfigurationManager.unsubscribe('tts', self.on_change)
+        ConfigurationManager.update({'tts': {'module': 'mimic'}})
+        self.assertEquals(len(self.calls), 1)
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+import wave
+
+import numpy
+
+from jarbas_utils import deep_throat
+
+__author__ = 'jarbas'
+
+
+class WaveformTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.phonemes = deep_throat.text_to_phonemes("hello world")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_array_matches_values(self):
+        for rectangle in [True, False]:
+            values = deep_throat.phonemes_words_values(
+                phonemes_words=self.phonemes,
+                change_waveform_to_rectangle_waveform=rectangle)
+            array = deep_throat.phonemes_words_array(
+                phonemes_words=self.phonemes,
+                change_waveform_to_rectangle_waveform=rectangle)
+            self.assertEqual(len(array), len(values))
+            self.assertTrue(numpy.allclose(array, values))
+
+    def read_frames(self, filename):
+        wave_file = wave.open(filename, "r")
+        try:
+            return wave_file.readframes(wave_file.getnframes())
+        finally:
+            wave_file.close()
+
+    def test_wave_file_matches(self):
+        values_file = os.path.join(self.directory, "values.wav")
+        array_file = os.path.join(self.directory, "array.wav")
+        deep_throat.save_values_to_wave_file(
+            values=deep_throat.phonemes_words_values(
+                phonemes_words=self.phonemes),
+            filename=values_file)
+        deep_throat.save_array_to_wave_file(
+            values=deep_throat.phonemes_words_array(
+                phonemes_words=self.phonemes),
+            filename=array_file)
+        self.assertEqual(self.read_frames(array_file),
+                         self.read_frames(values_file))
+
+
+class PhonemesTest(unittest.TestCase):
+    def setUp(self):
+        deep_throat.words_phonemes_cache.clear()
+
+    def tearDown(self):
+        deep_throat.words_phonemes_cache.clear()
+
+    def test_words(self):
+        words = {
+            "THE": "TH-UH",
+            "HELLO": "H-EH-L-OH",
+            "CAT": "K-AE-T",
+            "ONE": "W-UH-N",
+            "WORLD": "W-AE-R-L-D",
+            "SPEECH": "S-P-EE-CH",
+            "I": "AH-EE"
+        }
+        for word, phonemes in words.items():
+            self.assertEqual(deep_throat.word_to_phonemes(word), phonemes)
+
+    def test_text(self):
+        self.assertEqual(deep_throat.text_to_phonemes("The cat, one world!"),
+                         "TH-UH K-AE-T W-UH-N W-AE-R-L-D")
+
+    def test_cache_hit(self):
+        cache = deep_throat.words_phonemes_cache
+        self.assertFalse("CAT" in cache)
+        self.assertEqual(deep_throat.word_to_phonemes("CAT"), "K-AE-T")
+        self.assertEqual(cache.get("CAT"), "K-AE-T")
+        # a cached word is not translated again
+        cache.put("CAT", "M-EH-OW")
+        self.assertEqual(deep_throat.word_to_phonemes("CAT"), "M-EH-OW")
+        # unless the translation is explained
+        self.assertEqual(deep_throat.word_to_phonemes("CAT", explain=True),
+                         "K-AE-T")
+
+    def test_sequential(self):
+        # both translations agree where no rule rewrites the output of
+        # another one
+        for text in ["cat", "speech", "first", "from", "not", "can"]:
+            self.assertEqual(deep_throat.text_to_phonemes(text),
+                             deep_throat.text_to_phonemes_sequential(text))
+        # contexts are matched against the original word by the single
+        # pass, the sequential rewriting loses most of these words
+        mangled = {"people": "P-EE-P-UH-L", "time": "T-AH-EE-M",
+                   "more": "M-AW-R", "see": "S-EE"}
+        for text, phonemes in mangled.items():
+            self.assertEqual(deep_throat.text_to_phonemes(text), phonemes)
+            self.assertNotEqual(
+                deep_throat.text_to_phonemes_sequential(text), phonemes)
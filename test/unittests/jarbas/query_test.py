@@ -0,0 +1,113 @@
+import time
+import unittest
+from threading import Timer
+
+from jarbas_utils.skill_dev_tools import QueryBackend, gather, \
+    first_completed
+from jarbas_utils.skill_tools import KnowledgeQuery
+from mycroft.messagebus.client.ws import WebsocketClient
+from mycroft.messagebus.message import Message
+
+__author__ = 'jarbas'
+
+
+class MockBus(WebsocketClient):
+    """ Records sent requests, replies are injected with reply """
+
+    def __init__(self):
+        super(MockBus, self).__init__()
+        self.sent = []
+
+    def emit(self, message):
+        self.sent.append(message)
+
+    def request(self, message_type):
+        for message in self.sent:
+            if message.type == message_type:
+                return message
+
+    def reply(self, message_type, data, reply_type=None):
+        request = self.request(message_type)
+        reply_type = reply_type or message_type.replace(".request",
+                                                        ".result")
+        self.emitter.emit(reply_type, Message(
+            reply_type, data, {"request_id": request.context["request_id"]}))
+
+
+class QueryBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.bus = MockBus()
+        self.query = QueryBackend(emitter=self.bus, timeout=1)
+
+    def test_send_request_async(self):
+        future = self.query.send_request_async("test.request", {"q": 1})
+        request = self.bus.request("test.request")
+        self.assertEquals(request.data, {"q": 1})
+        self.assertEquals(request.context["waiting_for"],
+                          ["test.reply", "test.response", "test.result"])
+        self.assertFalse(future.done())
+        self.bus.reply("test.request", {"a": 1}, "test.response")
+        self.assertEquals(future.result(0).data, {"a": 1})
+
+    def test_gather(self):
+        futures = [self.query.send_request_async("a.request"),
+                   self.query.send_request_async("b.request")]
+        self.bus.reply("b.request", {"b": 1})
+        start = time.time()
+        self.assertEquals(gather(futures, 0.1), [None, {"b": 1}])
+        self.assertLess(time.time() - start, 0.5)
+        # unanswered queries stop waiting
+        self.assertTrue(futures[0].cancelled())
+        self.assertEquals(self.bus.requests, {})
+
+    def test_first_completed(self):
+        futures = [self.query.send_request_async("a.request"),
+                   self.query.send_request_async("b.request")]
+        Timer(0.05, self.bus.reply, ("b.request", {"b": 1})).start()
+        self.assertEquals(first_completed(futures, 1), (1, {"b": 1}))
+        self.assertTrue(futures[0].cancelled())
+
+    def test_first_completed_timeout(self):
+        futures = [self.query.send_request_async("a.request")]
+        self.assertEquals(first_completed(futures, 0.05), (None, None))
+        self.assertTrue(futures[0].cancelled())
+
+
+class KnowledgeQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.bus = MockBus()
+        self.query = KnowledgeQuery(emitter=self.bus, timeout=1)
+
+    def test_adquire_all(self):
+        Timer(0.05, self.bus.reply,
+              ("wikipedia.request", {"wikipedia": "w"})).start()
+        start = time.time()
+        result = self.query.adquire_all("dog", ["wikidata"],
+                                        needed=["wikipedia"])
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEquals(result, {"wikidata": None,
+                                   "wikipedia": {"wikipedia": "w"}})
+
+    def test_adquire_all_wolfram(self):
+        self.query.adquire_all("dog", ["wolfram alpha"], timeout=0)
+        self.assertIsNotNone(self.bus.request("wolframalpha.request"))
+        self.assertRaises(ValueError, self.query.adquire_all, "dog",
+                          ["wolfram"])
+
+    def test_adquire_first(self):
+        # every source is asked at once, preference order decides
+        Timer(0.05, self.bus.reply,
+              ("wikipedia.request", {"wikipedia": "w"})).start()
+        Timer(0.1, self.bus.reply,
+              ("dbpedia.request", {"dbpedia": {}})).start()
+        source, data = self.query.adquire_first(
+            "dog", ["dbpedia", "wikipedia"])
+        self.assertEquals(source, "wikipedia")
+        self.assertEquals(data, {"wikipedia": "w"})
+        self.assertEquals(len(self.bus.sent), 2)
+        self.assertEquals(self.bus.requests, {})
+
+    def test_adquire_first_nothing(self):
+        self.assertEquals(self.query.adquire_first("dog", ["wikidata"],
+                                                   timeout=0.05),
+                          (None, None))
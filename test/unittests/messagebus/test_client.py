@@ -0,0 +1,94 @@
+import unittest
+from threading import Timer
+
+from mycroft.messagebus.client.ws import WebsocketClient
+from mycroft.messagebus.message import Message
+
+
+class TestRequests(unittest.TestCase):
+    def setUp(self):
+        self.ws = WebsocketClient()
+        self.sent = []
+        self.ws.emit = self.sent.append
+
+    def reply(self, request, data, request_id=True):
+        context = {}
+        if request_id:
+            context["request_id"] = request.context["request_id"]
+        self.ws.emitter.emit("test.reply",
+                             Message("test.reply", data, context))
+
+    def test_reply_completes_request(self):
+        future = self.ws.send_request(Message("test", {"q": 1}))
+        request = self.sent[0]
+        self.assertIn("request_id", request.context)
+        self.reply(request, {"a": 1})
+        self.assertEquals(future.result(1).data, {"a": 1})
+        self.assertEquals(self.ws.emitter.listeners("test.reply"), [])
+
+    def test_concurrent_requests(self):
+        first = self.ws.send_request(Message("test", {"q": 1}))
+        second = self.ws.send_request(Message("test", {"q": 2}))
+        self.reply(self.sent[1], {"a": 2})
+        self.assertFalse(first.done())
+        self.assertEquals(second.result(1).data, {"a": 2})
+        self.reply(self.sent[0], {"a": 1})
+        self.assertEquals(first.result(1).data, {"a": 1})
+
+    def test_unknown_request_id_ignored(self):
+        future = self.ws.send_request(Message("test"))
+        self.ws.emitter.emit("test.reply", Message(
+            "test.reply", {}, {"request_id": "someone else"}))
+        self.assertFalse(future.done())
+
+    def test_reply_without_request_id(self):
+        first = self.ws.send_request(Message("test"))
+        second = self.ws.send_request(Message("test"))
+        self.reply(self.sent[0], {"a": 1}, request_id=False)
+        self.assertTrue(first.done())
+        self.assertFalse(second.done())
+
+    def test_wait_for_response(self):
+        self.ws.emit = lambda request: Timer(
+            0.05, self.reply, (request, {"a": 1})).start()
+        response = self.ws.wait_for_response(Message("test"), timeout=1)
+        self.assertEquals(response.data, {"a": 1})
+
+    def test_wait_for_response_timeout(self):
+        response = self.ws.wait_for_response(Message("test"),
+                                             ["test.reply", "test.result"],
+                                             timeout=0.1)
+        self.assertIsNone(response)
+        self.assertEquals(self.ws.requests, {})
+        self.assertEquals(self.ws.emitter.listeners("test.reply"), [])
+        self.assertEquals(self.ws.emitter.listeners("test.result"), [])
+
+
+class TestSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.ws = WebsocketClient(filtered=True)
+        self.sent = []
+        self.ws.emit = self.sent.append
+
+    def test_once_unsubscribes(self):
+        received = []
+        self.ws.once("test", received.append)
+        self.assertEquals(self.ws.subscriptions, set(["test"]))
+        self.ws.emitter.emit("test", Message("test"))
+        self.ws.emitter.emit("test", Message("test"))
+        self.assertEquals(len(received), 1)
+        self.assertEquals(self.ws.subscriptions, set())
+        self.assertEquals(self.sent[-1].type, "bus.unsubscribe")
+        self.assertEquals(self.sent[-1].data["types"], ["test"])
+
+    def test_once_keeps_other_listeners(self):
+        handled = []
+        self.ws.on("test", handled.append)
+        self.ws.once("test", handled.append)
+        self.ws.emitter.emit("test", Message("test"))
+        self.assertEquals(len(handled), 2)
+        self.assertEquals(self.ws.subscriptions, set(["test"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
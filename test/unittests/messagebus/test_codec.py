@@ -0,0 +1,27 @@
+import unittest
+
+from mycroft.messagebus.codec import CODECS, JSON_CODEC, get_codec
+from mycroft.messagebus.message import Message
+
+
+class TestCodec(unittest.TestCase):
+    def test_get_codec_fallback(self):
+        self.assertIs(get_codec(None), JSON_CODEC)
+        self.assertIs(get_codec("not_a_codec"), JSON_CODEC)
+
+    def test_round_trip(self):
+        message = Message("speak", {"utterance": u"ol\xe1", "n": [1, 2.5]},
+                          {"source": "test", "mute": False})
+        for codec in CODECS.values():
+            decoded = codec.decode(codec.encode(message))
+            self.assertEquals(decoded.type, message.type)
+            self.assertEquals(decoded.data, message.data)
+            self.assertEquals(decoded.context, message.context)
+
+    def test_json_is_message_serialization(self):
+        message = Message("speak", {"utterance": "hello"})
+        self.assertEquals(JSON_CODEC.encode(message), message.serialize())
+
+
+if __name__ == "__main__":
+    unittest.main()
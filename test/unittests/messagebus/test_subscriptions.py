@@ -0,0 +1,50 @@
+import unittest
+
+from mycroft.messagebus.service.ws import SubscriptionIndex
+
+
+class TestSubscriptionIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SubscriptionIndex()
+        self.index.add("skills")
+        self.index.add("cli")
+
+    def test_unfiltered_receives_everything(self):
+        self.assertEquals(self.index.get("speak"),
+                          frozenset(["skills", "cli"]))
+
+    def test_exact_subscription(self):
+        self.index.subscribe("skills", "recognizer_loop:utterance")
+        self.assertEquals(self.index.get("recognizer_loop:utterance"),
+                          frozenset(["skills", "cli"]))
+        self.assertEquals(self.index.get("speak"), frozenset(["cli"]))
+
+    def test_prefix_subscription(self):
+        self.index.subscribe("skills", "LILACS.node.*")
+        self.assertIn("skills", self.index.get("LILACS.node.json.load"))
+        self.assertNotIn("skills", self.index.get("LILACS.feedback"))
+
+    def test_everything_subscription(self):
+        self.index.subscribe("skills", "speak")
+        self.index.subscribe("skills", "*")
+        self.assertIn("skills", self.index.get("enclosure.eyes.blink"))
+        self.index.unsubscribe("skills", "*")
+        self.assertNotIn("skills", self.index.get("enclosure.eyes.blink"))
+        self.assertIn("skills", self.index.get("speak"))
+
+    def test_unsubscribe_invalidates_cache(self):
+        self.index.subscribe("skills", "speak")
+        self.assertIn("skills", self.index.get("speak"))
+        self.index.unsubscribe("skills", "speak")
+        self.assertNotIn("skills", self.index.get("speak"))
+
+    def test_remove(self):
+        self.index.subscribe("skills", "speak")
+        self.index.remove("skills")
+        self.index.remove("cli")
+        self.assertEquals(self.index.get("speak"), frozenset())
+        self.assertEquals(self.index.exact, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
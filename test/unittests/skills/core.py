@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import shutil
 import sys
+import tempfile
 import unittest
 
 import mock
@@ -11,8 +13,9 @@ from re import error
 from mycroft.configuration import ConfigurationManager
 from mycroft.messagebus.message import Message
 from mycroft.skills.core import load_regex_from_file, load_regex, \
-    load_vocab_from_file, load_vocabulary, MycroftSkill, \
-    load_skill, create_skill_descriptor, open_intent_envelope
+    load_vocab_from_file, load_vocabulary, load_vocabulary_batch, \
+    load_regex_batch, MycroftSkill, load_skill, create_skill_descriptor, \
+    open_intent_envelope
 
 __author__ = 'eward'
 
@@ -171,6 +174,45 @@ class MycroftSkillTest(unittest.TestCase):
         except OSError as e:
             self.assertEquals(e.strerror, 'No such file or directory')
 
+    @mock.patch('mycroft.skills.core.vocab_cache_directory')
+    def test_load_vocab_batch(self, mock_cache_dir):
+        cache_dir = tempfile.mkdtemp()
+        mock_cache_dir.return_value = cache_dir
+        try:
+            path = join(self.vocab_path, 'valid')
+            load_vocabulary_batch(path, self.emitter)
+            self.assertEquals(self.emitter.get_types(),
+                              ['register_vocab_batch'])
+            batch = self.emitter.get_results()[0]['vocab']
+            self.emitter.reset()
+            load_vocabulary(path, self.emitter)
+            self.assertEquals(sorted(batch),
+                              sorted(self.emitter.get_results()))
+            self.emitter.reset()
+
+            # Unchanged files are served from the cache without parsing
+            with mock.patch('mycroft.skills.core.read_vocab_file') as read:
+                load_vocabulary_batch(path, self.emitter)
+                self.assertFalse(read.called)
+            self.assertEquals(self.emitter.get_results()[0]['vocab'], batch)
+        finally:
+            shutil.rmtree(cache_dir)
+
+    @mock.patch('mycroft.skills.core.vocab_cache_directory')
+    def test_load_regex_batch(self, mock_cache_dir):
+        cache_dir = tempfile.mkdtemp()
+        mock_cache_dir.return_value = cache_dir
+        try:
+            load_regex_batch(join(self.regex_path, 'valid'), self.emitter)
+            self.assertEquals(self.emitter.get_types(),
+                              ['register_vocab_batch'])
+            self.assertEquals(self.emitter.get_results()[0]['vocab'],
+                              [{'regex': '(?P<MultipleTest1>.*)'},
+                               {'regex': '(?P<MultipleTest2>.*)'},
+                               {'regex': '(?P<SingleTest>.*)'}])
+        finally:
+            shutil.rmtree(cache_dir)
+
     def test_open_envelope(self):
         name = 'Jerome'
         intent = IntentBuilder(name).require('Keyword')
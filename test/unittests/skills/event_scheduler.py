@@ -0,0 +1,137 @@
+import json
+import random
+import tempfile
+import time
+import unittest
+from threading import Event
+
+import os
+
+from mycroft.skills.event_scheduler import EventScheduler
+
+__author__ = 'jarbas'
+
+
+class MockEmitter(object):
+    def __init__(self):
+        self.messages = []
+        self.expected = 0
+        self.done = Event()
+
+    def on(self, event, handler):
+        pass
+
+    def remove_all_listeners(self, event):
+        pass
+
+    def emit(self, message):
+        self.messages.append(message)
+        if len(self.messages) >= self.expected:
+            self.done.set()
+
+    def wait(self, expected, timeout=10):
+        self.expected = expected
+        self.done.clear()
+        if len(self.messages) >= expected:
+            return True
+        self.done.wait(timeout)
+        return len(self.messages) >= expected
+
+
+class EventSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MockEmitter()
+        self.scheduler = EventScheduler(self.emitter, None)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_schedule_100k_events(self):
+        n = 100000
+        # all events are due after scheduling them has finished
+        start = time.time() + 1.5
+        times = [start + random.random() for _ in range(n)]
+        for i, t in enumerate(times):
+            self.scheduler.schedule_event('event', t, data={'i': i})
+        self.assertTrue(self.emitter.wait(n, timeout=30))
+        triggered = [times[m.data['i']] for m in self.emitter.messages]
+        self.assertEquals(len(triggered), n)
+        self.assertEquals(triggered, sorted(times))
+        self.assertEquals(self.scheduler.events, {})
+        self.assertEquals(self.scheduler.heap, [])
+
+    def test_wakes_up_for_next_event(self):
+        self.scheduler.schedule_event('late', time.time() + 30)
+        start = time.time()
+        self.scheduler.schedule_event('soon', start + 0.2)
+        self.assertTrue(self.emitter.wait(1, timeout=5))
+        elapsed = time.time() - start
+        self.assertEquals(self.emitter.messages[0].type, 'soon')
+        self.assertGreaterEqual(elapsed, 0.19)
+        self.assertLess(elapsed, 0.5)
+
+    def test_remove_event(self):
+        now = time.time()
+        for i in range(10):
+            self.scheduler.schedule_event('removed', now + 0.2)
+        self.scheduler.schedule_event('kept', now + 0.3)
+        self.scheduler.remove_event('removed')
+        self.assertTrue(self.emitter.wait(1, timeout=5))
+        time.sleep(0.1)
+        self.assertEquals([m.type for m in self.emitter.messages], ['kept'])
+        self.assertEquals(len(self.scheduler.heap), 0)
+
+    def test_repeat_and_update(self):
+        self.scheduler.schedule_event('repeat', time.time(), 0.05, {'n': 1})
+        self.assertTrue(self.emitter.wait(1))
+        self.scheduler.update_event('repeat', {'n': 2})
+        self.assertTrue(self.emitter.wait(3))
+        self.scheduler.remove_event('repeat')
+        self.assertEquals(self.emitter.messages[-1].data, {'n': 2})
+
+    def test_overdue_repeat(self):
+        # the scheduler was not running for an hour
+        now = time.time()
+        self.scheduler.schedule_event('repeat', now - 3600.5, 1)
+        self.assertTrue(self.emitter.wait(1))
+        time.sleep(0.2)
+        self.assertEquals(len(self.emitter.messages), 1)
+        next_time = self.scheduler.events['repeat'].values()[0][0]
+        self.assertAlmostEqual(next_time, now + 0.5, places=5)
+
+
+class EventSchedulerStoreTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.schedule_file = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        os.remove(self.schedule_file)
+
+    def tearDown(self):
+        if os.path.exists(self.schedule_file):
+            os.remove(self.schedule_file)
+
+    def test_store_and_load(self):
+        emitter = MockEmitter()
+        scheduler = EventScheduler(emitter, self.schedule_file)
+        future = time.time() + 3600
+        scheduler.schedule_event('future', future, data={'a': 1})
+        scheduler.schedule_event('repeat', future, 60)
+        scheduler.shutdown()
+        with open(self.schedule_file) as f:
+            stored = json.load(f)
+        self.assertEquals(stored['future'], [[future, None, {'a': 1}]])
+
+        scheduler = EventScheduler(MockEmitter(), self.schedule_file)
+        self.assertEquals(sorted(scheduler.events), ['future', 'repeat'])
+        self.assertEquals(len(scheduler.heap), 2)
+        scheduler.shutdown()
+
+    def test_periodic_store(self):
+        emitter = MockEmitter()
+        scheduler = EventScheduler(emitter, self.schedule_file)
+        scheduler.STORE_INTERVAL = 0.1
+        scheduler.schedule_event('future', time.time() + 3600)
+        time.sleep(0.5)
+        self.assertTrue(os.path.exists(self.schedule_file))
+        self.assertFalse(scheduler.dirty)
+        scheduler.shutdown()
@@ -1,6 +1,12 @@
+import time
 import unittest
 
-from mycroft.skills.intent_service import ContextManager
+from adapt.engine import IntentDeterminationEngine
+from adapt.intent import IntentBuilder
+
+from mycroft.messagebus.message import Message
+from mycroft.skills.intent_service import ContextManager, IntentEngine, \
+    IntentService
 
 
 class MockEmitter(object):
@@ -17,6 +23,9 @@ class MockEmitter(object):
     def get_results(self):
         return self.results
 
+    def on(self, event, f):
+        pass
+
     def reset(self):
         self.types = []
         self.results = []
@@ -56,5 +65,163 @@ class ContextManagerTest(unittest.TestCase):
         self.assertEqual(len(self.context_manager.frame_stack), 0)
 
 
+def register_weather(engine):
+    for word in ["weather", "forecast"]:
+        engine.register_entity(word, "WeatherKeyword")
+    for word in ["lisbon", "london"]:
+        engine.register_entity(word, "Location")
+    engine.register_entity("time", "TimeKeyword")
+    engine.register_regex_entity("play (?P<Song>.*)")
+    engine.register_intent_parser(
+        IntentBuilder("1:WeatherIntent").require("WeatherKeyword")
+        .optionally("Location").build())
+    engine.register_intent_parser(
+        IntentBuilder("2:TimeIntent").require("TimeKeyword")
+        .require("Location").build())
+    engine.register_intent_parser(
+        IntentBuilder("3:PlayIntent").require("Song").build())
+    engine.register_intent_parser(
+        IntentBuilder("4:OneOfIntent").one_of("TimeKeyword",
+                                              "WeatherKeyword").build())
+
+
+class IntentEngineTest(unittest.TestCase):
+    utterances = ["what is the weather in lisbon", "time in london",
+                  "what time is it", "play some music", "hello there"]
+
+    def setUp(self):
+        self.engine = IntentEngine()
+        register_weather(self.engine)
+
+    def test_candidates(self):
+        self.engine.on('tagged_entities', self.check_candidates)
+        self.candidates = None
+        list(self.engine.determine_intent("time in london"))
+        self.assertEqual([p.name for p in self.candidates],
+                         ["2:TimeIntent", "4:OneOfIntent"])
+
+    def check_candidates(self, result):
+        self.candidates = self.engine.get_candidates(result['tags'], [])
+
+    def test_same_as_adapt(self):
+        adapt = IntentDeterminationEngine()
+        register_weather(adapt)
+        for utterance in self.utterances:
+            self.assertEqual(
+                list(self.engine.determine_intent(utterance, 100, True)),
+                list(adapt.determine_intent(utterance, 100, True)))
+
+    def test_remove_intent_parsers(self):
+        self.engine.remove_intent_parsers(lambda p: p.name.startswith("2:"))
+        intent = next(self.engine.determine_intent("time in london"))
+        self.assertEqual(intent['intent_type'], "4:OneOfIntent")
+
+
+class IntentServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.emitter = MockEmitter()
+        self.service = IntentService(self.emitter)
+        register_weather(self.service.engine)
+
+    def test_cached_intent(self):
+        intent = self.service.get_best_intent("Weather in Lisbon", "en-us")
+        self.assertEqual(intent['intent_type'], "1:WeatherIntent")
+        self.assertEqual(intent['utterance'], "Weather in Lisbon")
+        cached = self.service.get_best_intent("weather in lisbon", "en-us")
+        self.assertEqual(self.service.intent_cache.hits, 1)
+        self.assertEqual(cached['utterance'], "weather in lisbon")
+        self.assertEqual(cached['Location'], intent['Location'])
+
+    def test_cache_invalidation(self):
+        self.assertEqual(self.service.get_best_intent("hello", "en-us"),
+                         None)
+        self.service.handle_register_vocab(
+            Message("register_vocab", {"start": "hello", "end": "Hello"}))
+        self.service.engine.register_intent_parser(
+            IntentBuilder("5:HelloIntent").require("Hello").build())
+        intent = self.service.get_best_intent("hello", "en-us")
+        self.assertEqual(intent['intent_type'], "5:HelloIntent")
+        self.service.handle_detach_intent(
+            Message("detach_intent", {"intent_name": "5:HelloIntent"}))
+        self.assertEqual(self.service.get_best_intent("hello", "en-us"),
+                         None)
+
+    def test_stale_result_not_cached(self):
+        determine_intent = self.service.engine.determine_intent
+
+        def register_while_parsing(*args, **kwargs):
+            # another thread registers an intent meanwhile
+            self.service.intent_cache.clear()
+            return determine_intent(*args, **kwargs)
+
+        self.service.engine.determine_intent = register_while_parsing
+        self.service.get_best_intent("time in london", "en-us")
+        self.assertEqual(len(self.service.intent_cache), 0)
+        self.service.engine.determine_intent = determine_intent
+        self.service.get_best_intent("time in london", "en-us")
+        self.assertEqual(len(self.service.intent_cache), 1)
+
+
+class ConverseEmitter(MockEmitter):
+    """ answers converse requests with {skill_id: (delay, result)} """
+    def __init__(self, answers):
+        MockEmitter.__init__(self)
+        self.answers = answers
+        self.asked = []
+
+    def wait_for_response(self, message, reply_types=None, timeout=10):
+        skill_id = message.data["skill_id"]
+        self.asked.append(skill_id)
+        delay, result = self.answers[skill_id]
+        if delay is None or delay > timeout:
+            time.sleep(timeout)
+            return None
+        time.sleep(delay)
+        return Message("skill.converse.response", {"result": result})
+
+
+class ConverseTest(unittest.TestCase):
+    def create_service(self, answers):
+        service = IntentService(ConverseEmitter(answers))
+        service.converse_deadline = 0.5
+        service.converse_max_latency = 0.3
+        for skill_id in reversed(sorted(answers)):
+            service.add_active_skill(skill_id)
+        return service
+
+    def test_recency_order(self):
+        # skill 1 is the most recent, skill 2 is not asked once it handled
+        service = self.create_service({1: (0.1, True), 2: (0, True)})
+        self.assertEqual(service.converse([], "en-us"), 1)
+        self.assertEqual(service.emitter.asked, [1])
+        service = self.create_service({1: (0.1, False), 2: (0, True)})
+        self.assertEqual(service.converse([], "en-us"), 2)
+        self.assertEqual(service.emitter.asked, [1, 2])
+
+    def test_shared_deadline(self):
+        service = self.create_service({1: (None, True), 2: (None, True),
+                                       3: (0, False)})
+        start = time.time()
+        self.assertEqual(service.converse([], "en-us"), None)
+        self.assertTrue(time.time() - start < 0.9)
+        self.assertEqual(service.emitter.asked, [1])
+
+    def test_slow_skills_removed(self):
+        service = self.create_service({1: (None, True), 2: (0, False)})
+        self.assertEqual(service.converse([], "en-us"), None)
+        self.assertEqual([s[0] for s in service.active_skills], [2])
+        self.assertAlmostEqual(service.converse_latency[1], 0.5, places=1)
+
+    def test_latency_reset(self):
+        service = self.create_service({1: (None, True), 2: (0, False)})
+        service.converse([], "en-us")
+        # one of its intents triggered, the skill is active again
+        service.add_active_skill(1)
+        self.assertNotIn(1, service.converse_latency)
+        service.emitter.answers[1] = (0, True)
+        self.assertEqual(service.converse([], "en-us"), 1)
+        self.assertEqual(service.active_skills[0][0], 1)
+
+
 if __name__ == '__main__':
     unittest.main()
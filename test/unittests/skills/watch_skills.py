@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+import mycroft.skills.main as skills_main
+from mycroft.skills.main import WatchSkills
+
+__author__ = 'jarbas'
+
+
+class WatchSkillsTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.dir, "skill-a"))
+        patcher = mock.patch.object(skills_main, "SKILLS_DIR", self.dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.watcher = WatchSkills()
+        self.watcher.DEBOUNCE = 0.05
+        self.watcher.MAX_DEBOUNCE = 0.3
+
+    def tearDown(self):
+        if self.watcher.notifier:
+            self.watcher.notifier.stop()
+        shutil.rmtree(self.dir)
+
+    def path(self, *parts):
+        return os.path.join(self.dir, *parts)
+
+    def test_notify_change_filter(self):
+        self.watcher.notifier = object()
+        self.watcher.notify_change(self.path("skill-a", "__init__.py"))
+        self.watcher.notify_change(self.path("skill-b", "vocab", "a.voc"))
+        for ignored in [("skill-c", "__init__.pyc"),
+                        ("skill-c", "settings.json"),
+                        (".git", "HEAD"),
+                        ("skill-c", ".hidden", "x.py")]:
+            self.watcher.notify_change(self.path(*ignored))
+        self.assertEquals(self.watcher._wait_for_changes(),
+                          set(["skill-a", "skill-b"]))
+        self.watcher.notifier = None
+
+    def test_debounce(self):
+        self.watcher.notifier = object()
+        self.watcher.notify_change(self.path("skill-a", "__init__.py"))
+        start = time.time()
+        # a burst of writes is reported once, after it settled
+        for _ in range(3):
+            self.watcher.notify_change(self.path("skill-a", "x.py"))
+            time.sleep(0.02)
+        self.assertEquals(self.watcher._wait_for_changes(),
+                          set(["skill-a"]))
+        self.assertGreaterEqual(time.time() - start, 0.05)
+        self.assertLess(time.time() - start, 0.3 + 0.2)
+        self.assertFalse(self.watcher._wake_event.is_set())
+        self.watcher.notifier = None
+
+    def test_debounce_limit(self):
+        self.watcher.notifier = object()
+        self.watcher.notify_change(self.path("skill-a", "x.py"))
+        event = self.watcher._wake_event
+
+        def busy_wait(timeout):
+            # the burst never settles, a write lands in every wait
+            time.sleep(0.05)
+            event.set()
+            return True
+
+        event.wait = busy_wait
+        start = time.time()
+        self.assertEquals(self.watcher._wait_for_changes(),
+                          set(["skill-a"]))
+        self.assertLess(time.time() - start, 1)
+        self.watcher.notifier = None
+
+    def test_polling(self):
+        start = time.time()
+        self.watcher.POLL_INTERVAL = 0.05
+        self.assertIsNone(self.watcher._wait_for_changes())
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    @unittest.skipIf(skills_main.pyinotify is None, "requires pyinotify")
+    def test_inotify(self):
+        self.assertTrue(self.watcher.start_notifier())
+        with open(self.path("skill-a", "__init__.py"), "w") as f:
+            f.write("# changed")
+        self.assertEquals(self.watcher._wait_for_changes(),
+                          set(["skill-a"]))
+
+    @unittest.skipIf(skills_main.pyinotify is None, "requires pyinotify")
+    def test_failed_watch_polls(self):
+        with mock.patch.object(skills_main.pyinotify.WatchManager,
+                               "add_watch",
+                               return_value={self.dir: -1}):
+            self.assertFalse(self.watcher.start_notifier())
+        self.assertIsNone(self.watcher.notifier)
+        shutil.rmtree(self.dir)
+        self.assertFalse(self.watcher.start_notifier())
+        os.mkdir(self.dir)
@@ -155,3 +155,76 @@ class TestSTT(unittest.TestCase):
         audio = mock.MagicMock()
         stt = mycroft.stt.KaldiSTT()
         self.assertEquals(stt.execute(audio), 'text')
+
+    @mock.patch('mycroft.stt.post')
+    @mock.patch.object(ConfigurationManager, 'get')
+    def test_kaldi_stream(self, mock_get, mock_post):
+        config = {'stt': {
+            'module': 'kaldi',
+            'kaldi': {'uri': 'https://test.com'},
+        },
+            "lang": "en-US"
+        }
+        mock_get.return_value = config
+
+        uploaded = []
+
+        def post(uri, data, headers):
+            uploaded.extend(data)
+            response = mock.MagicMock()
+            response.json.return_value = {
+                'hypotheses': [{'utterance': '[noise] hello world'}]
+            }
+            return response
+
+        mock_post.side_effect = post
+        stt = mycroft.stt.KaldiSTT()
+        stt.stream_start(16000, 2)
+        self.assertIsNone(stt.stream_data('ab'))
+        self.assertIsNone(stt.stream_data('cd'))
+        self.assertEquals(stt.stream_stop().result(1), 'hello world')
+        self.assertEquals(uploaded, ['ab', 'cd'])
+        headers = mock_post.call_args[1]['headers']
+        self.assertIn('rate=(int)16000', headers['Content-Type'])
+        self.assertIn('format=(string)S16LE', headers['Content-Type'])
+
+    @mock.patch('mycroft.stt.post')
+    @mock.patch.object(ConfigurationManager, 'get')
+    def test_kaldi_stream_failure(self, mock_get, mock_post):
+        mock_get.return_value = {'stt': {
+            'module': 'kaldi',
+            'kaldi': {'uri': 'https://test.com'},
+        },
+            "lang": "en-US"
+        }
+        mock_post.side_effect = IOError
+        stt = mycroft.stt.KaldiSTT()
+        stt.stream_start(16000, 2)
+        stt.stream_data('ab')
+        self.assertRaises(IOError, stt.stream_stop().result, 1)
+
+    @mock.patch.object(ConfigurationManager, 'get')
+    def test_pocketsphinx_stream(self, mock_get):
+        mock_get.return_value = {'stt': {'module': 'pocketsphinx'},
+                                 'lang': 'en-US'}
+        pocketsphinx = mock.MagicMock()
+        decoder = pocketsphinx.pocketsphinx.Decoder.return_value
+        with mock.patch.dict('sys.modules', {'pocketsphinx': pocketsphinx}):
+            stt = mycroft.stt.PocketSphinxSTT()
+            stt.stream_start(16000, 2)
+            decoder.start_utt.assert_called_once_with()
+
+            decoder.hyp.return_value.hypstr = 'hello'
+            self.assertEquals(stt.stream_data('\0\0' * 4), 'hello')
+            decoder.process_raw.assert_called_with('\0\0' * 4, False, False)
+
+            decoder.hyp.return_value.hypstr = 'hello world'
+            self.assertEquals(stt.stream_stop().result(), 'hello world')
+            decoder.end_utt.assert_called_once_with()
+
+            # the decoder is reused and audio converted to 16 kHz
+            stt.stream_start(8000, 2)
+            stt.stream_data('\0\0' * 4)
+            self.assertGreater(len(decoder.process_raw.call_args[0][0]),
+                               2 * 4)
+            self.assertEquals(pocketsphinx.pocketsphinx.Decoder.call_count, 1)
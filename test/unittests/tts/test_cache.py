@@ -0,0 +1,103 @@
+import shutil
+import tempfile
+import time
+import unittest
+
+import os
+
+from mycroft.tts.cache import TTSCache, tts_cache_directory
+
+
+class TestTTSCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def synthesize(self, cache, sentence, size=10, voice="ap"):
+        key = TTSCache.get_key(sentence, "Mimic", voice, "en-us")
+        wav_file = cache.get_path(key, "wav")
+        with open(wav_file, "w") as f:
+            f.write("x" * size)
+        cache.put(key, wav_file, "phonemes", engine="Mimic", voice=voice,
+                  lang="en-us")
+        return key
+
+    def test_get_put(self):
+        cache = TTSCache(self.directory)
+        key = self.synthesize(cache, "hello")
+        self.assertEqual(cache.get(key),
+                         (cache.get_path(key, "wav"), "phonemes"))
+        self.assertEqual(cache.get("unknown"), None)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.index[key]["voice"], "ap")
+
+    def test_default_directory(self):
+        # get_cache_directory may be cleared, the cache must survive reboots
+        self.assertEqual(tts_cache_directory(),
+                         os.path.join(os.path.expanduser("~"), ".mycroft",
+                                      "tts_cache"))
+
+    def test_key(self):
+        key = TTSCache.get_key("hello", "Mimic", "ap", "en-us")
+        self.assertNotEqual(key, TTSCache.get_key("hello", "Mimic", "slt",
+                                                  "en-us"))
+        self.assertNotEqual(key, TTSCache.get_key("hello", "Pico", "ap",
+                                                  "en-us"))
+        self.assertNotEqual(key, TTSCache.get_key("hello", "Mimic", "ap",
+                                                  "pt-pt"))
+
+    def test_persistent(self):
+        cache = TTSCache(self.directory)
+        key = self.synthesize(cache, "hello")
+        cache.close()
+        cache = TTSCache(self.directory)
+        self.assertTrue(cache.get(key))
+        self.assertEqual(cache.total_bytes, 10)
+
+    def test_remove_orphans(self):
+        old = TTSCache.get_key("old", "Mimic", "ap", "en-us") + ".wav"
+        new = TTSCache.get_key("new", "Mimic", "ap", "en-us") + ".mp3"
+        pho = TTSCache.get_key("old", "Mimic", "ap", "en-us") + ".pho"
+        past = time.time() - 2 * TTSCache.ORPHAN_AGE
+        for filename in [old, new, pho, "notes.wav"]:
+            path = os.path.join(self.directory, filename)
+            with open(path, "w") as f:
+                f.write("x")
+            if filename != new:
+                os.utime(path, (past, past))
+        TTSCache(self.directory)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         sorted([new, pho, "notes.wav"]))
+
+    def test_batched_index_writes(self):
+        cache = TTSCache(self.directory)
+        first = self.synthesize(cache, "first")
+        second = self.synthesize(cache, "second")
+        # only the first put was written, the second waits for close
+        self.assertEqual(list(TTSCache(self.directory).index), [first])
+        cache.close()
+        self.assertEqual(sorted(TTSCache(self.directory).index),
+                         sorted([first, second]))
+
+    def test_lru_eviction(self):
+        cache = TTSCache(self.directory, max_bytes=25)
+        first = self.synthesize(cache, "first")
+        second = self.synthesize(cache, "second")
+        cache.index[first]["last_access"] -= 10
+        cache.index[second]["last_access"] -= 20
+        cache.get(first)
+        third = self.synthesize(cache, "third")
+        self.assertTrue(first in cache.index)
+        self.assertFalse(second in cache.index)
+        self.assertFalse(os.path.exists(cache.get_path(second, "wav")))
+        self.assertTrue(third in cache.index)
+        self.assertEqual(cache.total_bytes, 20)
+
+    def test_clear(self):
+        cache = TTSCache(self.directory)
+        key = self.synthesize(cache, "hello")
+        cache.clear()
+        self.assertEqual(cache.get(key), None)
+        self.assertEqual(os.listdir(self.directory), ["index.json"])
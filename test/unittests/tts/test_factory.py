@@ -0,0 +1,55 @@
+import unittest
+
+import mock
+
+import mycroft.tts
+from mycroft.tts import TTSFactory
+
+
+class MockTTS(object):
+    def __init__(self, lang, config):
+        self.lang = lang
+        self.config = config
+        self.validator = mock.Mock()
+
+
+class TestTTSFactory(unittest.TestCase):
+    def test_registry(self):
+        for path in TTSFactory.CLASSES.values():
+            module_name, class_name = path.split(":")
+            self.assertTrue(module_name.startswith("mycroft.tts."))
+
+    def test_load_class(self):
+        self.assertIs(TTSFactory.load_class("mycroft.tts:TTSValidator"),
+                      mycroft.tts.TTSValidator)
+
+    def test_plugin(self):
+        entry_point = mock.Mock()
+        entry_point.load.return_value = MockTTS
+        with mock.patch('pkg_resources.iter_entry_points',
+                        return_value=[entry_point]) as iter_entry_points:
+            self.assertIs(TTSFactory.get_class("plugin"), MockTTS)
+            iter_entry_points.assert_called_with("mycroft.plugin.tts",
+                                                 "plugin")
+        with mock.patch('pkg_resources.iter_entry_points', return_value=[]):
+            self.assertIsNone(TTSFactory.get_class("missing"))
+
+    @mock.patch('mycroft.tts.ConfigurationManager')
+    def test_create(self, config_manager):
+        config_manager.get.return_value = {
+            "lang": "en-us",
+            "tts": {"module": "mock", "mock": {"lang": "en-gb"}}
+        }
+        # the runner decides the module name, e.g. tts.test_factory
+        with mock.patch.dict(TTSFactory.CLASSES,
+                             {"mock": __name__ + ":MockTTS"}):
+            tts = TTSFactory.create()
+        self.assertIsInstance(tts, MockTTS)
+        self.assertEqual(tts.lang, "en-gb")
+        tts.validator.validate.assert_called_once_with()
+
+    @mock.patch('mycroft.tts.ConfigurationManager')
+    def test_create_unknown(self, config_manager):
+        config_manager.get.return_value = {"tts": {"module": "missing"}}
+        with mock.patch.object(TTSFactory, 'find_plugin', return_value=None):
+            self.assertRaises(ValueError, TTSFactory.create)
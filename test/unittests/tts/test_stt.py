@@ -1,5 +1,12 @@
+import shutil
+import tempfile
 import unittest
+from threading import Timer
+
+import mock
+
 import mycroft.tts
+from mycroft.tts.cache import TTSCache
 
 
 class TestSTT(unittest.TestCase):
@@ -66,3 +73,48 @@ class TestSTT(unittest.TestCase):
 
         self.assertEqual(tts.validate_ssml(sentence_bad_ssml),
                          sentence_no_ssml)
+
+    @mock.patch('mycroft.tts.PlaybackThread.join')
+    @mock.patch('mycroft.tts.PlaybackThread.start')
+    def test_queue_audio(self, mock_start, mock_join):
+        class TestTTS(mycroft.tts.TTS):
+            pass
+
+        tts = TestTTS("en-US", {}, None)
+        self.assertEqual(tts.queue.maxsize, 2)
+        generation = tts.playback.generation
+        self.assertTrue(tts.queue_audio("wav", "1.wav", None, generation))
+        self.assertTrue(tts.queue_audio("wav", "2.wav", None, generation))
+        # stop drops the pending audio and the blocked synthesis result
+        Timer(0.1, tts.playback.clear_queue).start()
+        self.assertFalse(tts.queue_audio("wav", "3.wav", None, generation))
+        self.assertEqual(tts.queue.qsize(), 1)
+        self.assertNotEqual(tts.queue.get()[3], tts.playback.generation)
+
+    @mock.patch('mycroft.tts.PlaybackThread.join')
+    @mock.patch('mycroft.tts.PlaybackThread.start')
+    def test_execute_batch(self, mock_start, mock_join):
+        class TestTTS(mycroft.tts.TTS):
+            batch_size = 2
+            type = "wav"
+            batches = []
+
+            def get_tts_batch(self, sentences, wav_files):
+                self.batches.append(sentences)
+                return [(None, None)] * len(sentences)
+
+        directory = tempfile.mkdtemp()
+        try:
+            tts = TestTTS("en-US", {}, None)
+            tts.cache = TTSCache(directory)
+            key = TTSCache.get_key("b", "TestTTS", None, "en-US")
+            with open(tts.cache.get_path(key, "wav"), "w") as f:
+                f.write("wav")
+            tts.cache.put(key, tts.cache.get_path(key, "wav"))
+
+            tts.execute_batch(["a", "b", "c", "d", "e"])
+            self.assertEqual(TestTTS.batches, [["a"], ["c", "d"], ["e"]])
+            self.assertEqual(tts.queue.get()[1],
+                             tts.cache.get_path(key, "wav"))
+        finally:
+            shutil.rmtree(directory)
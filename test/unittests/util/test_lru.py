@@ -0,0 +1,39 @@
+import unittest
+
+from mycroft.util.lru import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = LRUCache(2)
+        self.assertEqual(cache.get("a"), None)
+        self.assertEqual(cache.get("a", 1), 1)
+        cache.put("a", 2)
+        self.assertEqual(cache.get("a"), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertTrue("a" in cache)
+        self.assertFalse("b" in cache)
+        self.assertTrue("c" in cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.put("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_put_after_clear_dropped(self):
+        cache = LRUCache()
+        generation = cache.generation
+        cache.clear()
+        self.assertFalse(cache.put("a", 1, generation))
+        self.assertFalse("a" in cache)
+        self.assertTrue(cache.put("a", 1, cache.generation))
+        self.assertEqual(cache.get("a"), 1)
@@ -1,15 +1,23 @@
+import shutil
+import tempfile
 import unittest
 from shutil import rmtree
 
-from os.path import exists, isfile
+import mock
+from os.path import exists, isfile, join
 
 from mycroft.util import create_signal, check_for_signal
+from mycroft.util.signal import FileSignalBackend, SharedMemorySignalBackend
 
 
 class TestSignals(unittest.TestCase):
     def setUp(self):
         if exists('/tmp/mycroft'):
             rmtree('/tmp/mycroft')
+        patcher = mock.patch('mycroft.util.signal._backend',
+                             FileSignalBackend('/tmp/mycroft/ipc/signal'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_create_signal(self):
         create_signal('test_signal')
@@ -28,5 +36,73 @@ class TestSignals(unittest.TestCase):
         self.assertFalse(isfile('/tmp/mycroft/ipc/signal/test_signal'))
 
 
+class TestSharedMemorySignals(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.fallback = FileSignalBackend(join(self.tmp_dir, "signal"))
+        self.backend = self.create_backend()
+        patcher = mock.patch('mycroft.util.signal._backend', self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def create_backend(self):
+        return SharedMemorySignalBackend(join(self.tmp_dir, "signals"),
+                                         self.fallback)
+
+    def test_check_signal(self):
+        self.assertFalse(check_for_signal('test_signal'))
+        create_signal('test_signal')
+        self.assertTrue(check_for_signal('test_signal', -1))
+        self.assertTrue(check_for_signal('test_signal'))
+        # single use signal was consumed
+        self.assertFalse(check_for_signal('test_signal'))
+
+    def test_lifetime(self):
+        create_signal('test_signal')
+        self.assertTrue(check_for_signal('test_signal', 10))
+        with mock.patch('time.time', return_value=self.backend.get(
+                'test_signal') + 20):
+            self.assertFalse(check_for_signal('test_signal', 10))
+        self.assertIsNone(self.backend.get('test_signal'))
+
+    def test_shared_between_instances(self):
+        other = self.create_backend()
+        create_signal('buttonPress')
+        self.assertIsNotNone(other.get('buttonPress'))
+        other.remove('buttonPress')
+        self.assertFalse(check_for_signal('buttonPress'))
+
+    def test_fallback(self):
+        long_name = 'x' * 100
+        create_signal(long_name)
+        self.assertTrue(isfile(join(self.tmp_dir, "signal", long_name)))
+        self.assertTrue(check_for_signal(long_name))
+
+        with mock.patch.object(SharedMemorySignalBackend, 'SLOTS', 2):
+            backend = SharedMemorySignalBackend(join(self.tmp_dir, "small"),
+                                                self.fallback)
+            for name in ['one', 'two', 'three']:
+                self.assertTrue(backend.create(name))
+            self.assertTrue(isfile(join(self.tmp_dir, "signal", "three")))
+            self.assertIsNotNone(backend.get('one'))
+            self.assertIsNotNone(backend.get('three'))
+            backend.remove('three')
+            self.assertFalse(isfile(join(self.tmp_dir, "signal", "three")))
+
+    def test_unset_signal_skips_fallback(self):
+        self.fallback = mock.Mock()
+        backend = self.create_backend()
+        self.assertIsNone(backend.get('test_signal'))
+        backend.remove('test_signal')
+        self.assertFalse(self.fallback.get.called)
+        self.assertFalse(self.fallback.remove.called)
+        # only names too long for the table are looked up in the fallback
+        backend.get('x' * 100)
+        self.fallback.get.assert_called_once_with('x' * 100)
+
+
 if __name__ == "__main__":
     unittest.main()